@@ -1,28 +1,174 @@
 #src/api/route.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Header
+from fastapi.responses import JSONResponse
 import requests
 from ..models.schemas import (
     CreatePolicyRequest, ActivatePolicyRequest, ClimateDataRequest,
     AddCapitalRequest, CreateProposalRequest, VoteProposalRequest,
-    AddRegionRequest, AddCropRequest, SetOracleRequest
+    AddRegionRequest, AddCropRequest, SetOracleRequest, BulkWeatherRequest, ClaimBatchRequest
 )
-from ..services.blockchain import send_transaction, get_event_data
-from ..services.openweather import fetch_climate_data
-from ..utils.config import insurance_contract, oracle_contract, treasury_contract, governance_contract, token_contract, nft_contract
+from ..services.blockchain import (
+    send_transaction, get_event_data, batch_call, policy_id_range, send_idempotent, register_outbox_operation,
+    transaction_outbox, IdempotencyConflict, fee_oracle, signer_pool
+)
+from ..services.tx_outbox import IN_FLIGHT_STATUSES
+from ..services.openweather import (
+    fetch_windowed_climate_data, fetch_detailed_climate_data, fetch_bulk_climate_data, OpenWeatherError,
+    weather_cache, weather_flights, weather_quota, climate_store, rolling_aggregates, validate_parameter_types,
+    WEATHER_BULK_MAX_REGIONS, WEATHER_INCLUDE_RAW_DATA
+)
+from ..services.transaction_tracker import transaction_tracker
+from ..services.indexer import get_indexed_store
+from ..services.policy_cache import policy_cache
+from ..services.claim_engine import claim_evaluation_job
+from ..services.claim_submitter import claim_submitter
+from ..services.receipt_poller import receipt_poller
+from ..utils.config import (
+    async_insurance_contract as insurance_contract,
+    async_oracle_contract as oracle_contract,
+    async_treasury_contract as treasury_contract,
+    async_governance_contract as governance_contract,
+    async_token_contract as token_contract,
+    async_nft_contract as nft_contract,
+    abi_registry
+)
+from ..utils.lazy import LazyObject
+from ..utils.startup import startup_timer
+from ..utils.http_encoding import EncodedResponseCache
 from web3 import Web3
 from ..services.blockchain import send_transaction, get_event_data, insurance_contract
 
 from fastapi import APIRouter
 from ..models.schemas import CreatePolicyRequest
 from ..services.blockchain import send_transaction, insurance_contract
+import hashlib
 import logging
+import time
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Funções e eventos do contrato de seguro, extraídos do ABI no primeiro uso
+insurance_abi = LazyObject(lambda: abi_registry["insurance"])
+
+def _transaction_result(receipt):
+    """Resultado padrão das rotas de escrita"""
+    return {"success": True, "transactionHash": receipt["transactionHash"].hex()}
+
+async def _submit_and_track(contract_function, result_builder, value=0, events=(), urgency="standard"):
+    """Transmite a transação sem esperar o recibo e responde 202 com o trackingId"""
+    record = await transaction_tracker.submit(
+        contract_function, value=value, result_builder=result_builder, events=events, urgency=urgency
+    )
+    return JSONResponse(status_code=202, content=record)
+
+def _outbox_record(record):
+    """Registro do outbox no mesmo formato do acompanhamento assíncrono (trackingId = Idempotency-Key)"""
+    return {
+        "trackingId": record["idempotency_key"],
+        "transactionHash": record["transaction_hash"],
+        "status": "pending" if record["status"] in IN_FLIGHT_STATUSES else record["status"],
+        "submittedAt": record["created_at"],
+        "blockNumber": record["block_number"],
+        "gasUsed": record["gas_used"],
+        "events": [],
+        "result": record["result"],
+        "error": record["error"]
+    }
+
+async def _send_idempotent(idempotency_key, operation, params, contract_function, value=0, wait=True):
+    """Envia a escrita pelo outbox: repetições com a mesma Idempotency-Key não transmitem de novo"""
+    try:
+        record = await send_idempotent(idempotency_key, operation, params, contract_function, value, wait)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if record["status"] == "reserved":
+        # Outra requisição com a mesma chave (possivelmente em outro worker) ainda está assinando
+        raise HTTPException(
+            status_code=409,
+            detail=f"A request with Idempotency-Key {idempotency_key} is still being processed; retry with the same Idempotency-Key",
+            headers={"Retry-After": "1"}
+        )
+    if not wait:
+        return JSONResponse(status_code=202, content=_outbox_record(record))
+    if record["status"] == "failed":
+        raise HTTPException(status_code=409, detail=f"{record['error']}; retry with a new Idempotency-Key")
+    if record["status"] in IN_FLIGHT_STATUSES:
+        raise HTTPException(
+            status_code=504,
+            detail=f"Transaction {record['transaction_hash']} is still pending; retry with the same Idempotency-Key"
+        )
+    return record["result"]
+
+async def _build_create_policy_result(receipt, farmer):
+    """Extrai o ID da apólice criada a partir do recibo da transação createPolicy"""
+    import json
+    
+    logger.debug(f"Transaction receipt: {json.dumps({k: str(v) for k, v in receipt.items() if k != 'logs'})}")
+    
+    # Analisar o recibo em detalhes
+    # analyze_transaction_receipt(receipt)  # Descomente para análise detalhada do recibo
+    
+    if len(receipt.get('logs', [])) == 0:
+        logger.warning("No logs found in transaction receipt")
+    
+    # 1. Obter o ID a partir do evento PolicyCreated emitido pelo contrato de seguro
+    policy_id = None
+    created_events = get_event_data(insurance_contract, "PolicyCreated", receipt)
+    if created_events:
+        policy_id = created_events[0]["args"]["policyId"]
+        logger.info(f"Extracted policy ID from PolicyCreated event: {policy_id}")
+    elif nft_contract:
+        # O NFT da apólice é emitido com tokenId igual ao ID da apólice
+        transfers = get_event_data(nft_contract, "Transfer", receipt)
+        if transfers and "tokenId" in transfers[0]["args"]:
+            policy_id = transfers[0]["args"]["tokenId"]
+            logger.info(f"Extracted policy ID from NFT Transfer event: {policy_id}")
+    
+    # 2. Método alternativo: tentar chamar getActivePolicies (se existir)
+    if policy_id is None:
+        try:
+            # Verificar se getActivePolicies existe
+            if insurance_abi.has_function('getActivePolicies'):
+                active_policies = await insurance_contract.functions.getActivePolicies().call()
+                logger.info(f"Active policies: {active_policies}")
+                if active_policies and len(active_policies) > 0:
+                    policy_id = active_policies[-1]  # Assume a mais recente
+                    logger.info(f"Using latest active policy ID: {policy_id}")
+            # Verificar se getUserPolicies existe
+            elif insurance_abi.has_function('getUserPolicies'):
+                user_policies = await insurance_contract.functions.getUserPolicies(farmer).call()
+                logger.info(f"User policies: {user_policies}")
+                if user_policies and len(user_policies) > 0:
+                    policy_id = user_policies[-1]  # Assume a mais recente
+                    logger.info(f"Using latest user policy ID: {policy_id}")
+        except Exception as e:
+            logger.error(f"Error trying alternative methods: {str(e)}")
+    
+    # 3. Por último recurso, assume o ID 0 (se for a primeira política)
+    if policy_id is None:
+        policy_id = 0
+        logger.warning(f"Could not extract policy ID from logs. Using default ID: {policy_id}")
+        
+    # 4. Retornar o resultado
+    success_msg = {
+        "policyId": policy_id,
+        "transactionHash": receipt["transactionHash"].hex(),
+        "blockNumber": receipt["blockNumber"]
+    }
+    
+    if policy_id is None:
+        success_msg["warning"] = "Could not extract policy ID from transaction. Please check contract implementation."
+        
+    return success_msg
+
+
+register_outbox_operation("createPolicy", lambda receipt, params: _build_create_policy_result(receipt, params["farmer"]))
+register_outbox_operation("activatePolicy", lambda receipt, params: _transaction_result(receipt))
+
 # 1. Criar apólice
 @router.post("/policies")
-async def create_policy(request: CreatePolicyRequest):
+async def create_policy(request: CreatePolicyRequest, wait: bool = True, idempotency_key: str = Header(None)):
     from ..services.diagnostics import diagnose_contracts, analyze_transaction_receipt, list_contract_abi
     import json
     import time
@@ -55,18 +201,12 @@ async def create_policy(request: CreatePolicyRequest):
     logger.info(f"End date timestamp: {request.endDate}")
 
     try:
-        # Listar métodos disponíveis no contrato
-        available_functions = [fn for fn in dir(insurance_contract.functions) 
-                             if callable(getattr(insurance_contract.functions, fn)) 
-                             and not fn.startswith('__')]
-        logger.debug(f"Available contract functions: {available_functions}")
-        
         # Verificar se a função createPolicy existe
-        if 'createPolicy' not in available_functions:
+        if not insurance_abi.has_function('createPolicy'):
             logger.error("Function 'createPolicy' not found in contract ABI")
             raise HTTPException(status_code=500, 
                                detail="Function 'createPolicy' not found in contract. Available functions: " + 
-                                     ", ".join(available_functions[:10]))
+                                     ", ".join(insurance_abi.function_names[:10]))
         
         # Obter a função do contrato
         contract_function = insurance_contract.functions.createPolicy(
@@ -79,110 +219,24 @@ async def create_policy(request: CreatePolicyRequest):
             parameters
         )
         
-        # Enviar a transação
-        receipt = send_transaction(contract_function)
-        logger.debug(f"Transaction receipt: {json.dumps({k: str(v) for k, v in receipt.items() if k != 'logs'})}")
-        
-        # Analisar o recibo em detalhes
-        # analyze_transaction_receipt(receipt)  # Descomente para análise detalhada do recibo
-        
-        # Verificar se há logs no recibo
-        if len(receipt.get('logs', [])) == 0:
-            logger.warning("No logs found in transaction receipt")
-        else:
-            logger.info(f"Found {len(receipt.get('logs', []))} logs in transaction receipt")
-            
-            # Verificar endereços de contratos nos logs
-            contract_addresses = {
-                "insurance": insurance_contract.address.lower(),
-                "token": token_contract.address.lower() if token_contract else None,
-                "nft": nft_contract.address.lower() if nft_contract else None
-            }
-            
-            # Verificar qual contrato emitiu os logs
-            for i, log in enumerate(receipt.get('logs', [])):
-                log_address = log.get('address', '').lower()
-                for contract_name, addr in contract_addresses.items():
-                    if addr and log_address == addr:
-                        logger.info(f"Log #{i+1} is from {contract_name} contract")
-                        
-                # Tópico 0 é o hash do evento
-                if log.get('topics') and len(log.get('topics')) > 0:
-                    event_hash = log.get('topics')[0].hex()
-                    logger.info(f"Log #{i+1} event signature hash: {event_hash}")
-        
-        # Vamos tentar uma abordagem alternativa para obter o ID da política
-        
-        # 1. Tentar obter o ID a partir dos logs brutos
-        policy_id = None
-        for log in receipt.get('logs', []):
-            # Se o log vem do contrato de seguro ou do NFT
-            if (log.get('address', '').lower() == insurance_contract.address.lower() or
-                (nft_contract and log.get('address', '').lower() == nft_contract.address.lower())):
-                
-                # Para os eventos do NFT Transfer (NFTs são geralmente emitidos para novas políticas)
-                if len(log.get('topics', [])) >= 4:  # Transfer normalmente tem 4 tópicos
-                    # O último tópico geralmente contém o tokenId/policyId
-                    try:
-                        # Decodifica o valor do tópico (assumindo que é um uint256)
-                        policy_id = int(log.get('topics')[-1].hex(), 16)
-                        logger.info(f"Extracted policy ID from Transfer event: {policy_id}")
-                        break
-                    except Exception as e:
-                        logger.error(f"Error extracting policy ID from topics: {str(e)}")
-                
-                # Para dados na parte de data do log
-                elif log.get('data') and len(log.get('data')) > 2:  # Mais que apenas '0x'
-                    try:
-                        # Tenta interpretar os primeiros 32 bytes como uint256
-                        data = log.get('data')
-                        if data.startswith('0x'):
-                            data = data[2:]  # Remove o prefixo '0x'
-                        if len(data) >= 64:  # Pelo menos 32 bytes (64 caracteres hex)
-                            policy_id_hex = data[:64]
-                            policy_id = int(policy_id_hex, 16)
-                            logger.info(f"Extracted potential policy ID from log data: {policy_id}")
-                            break
-                    except Exception as e:
-                        logger.error(f"Error extracting policy ID from data: {str(e)}")
-        
-        # 2. Método alternativo: tentar chamar getActivePolicies (se existir)
-        if policy_id is None:
-            try:
-                # Verificar se getActivePolicies existe
-                if 'getActivePolicies' in available_functions:
-                    active_policies = insurance_contract.functions.getActivePolicies().call()
-                    logger.info(f"Active policies: {active_policies}")
-                    if active_policies and len(active_policies) > 0:
-                        policy_id = active_policies[-1]  # Assume a mais recente
-                        logger.info(f"Using latest active policy ID: {policy_id}")
-                # Verificar se getUserPolicies existe
-                elif 'getUserPolicies' in available_functions:
-                    user_policies = insurance_contract.functions.getUserPolicies(request.farmer).call()
-                    logger.info(f"User policies: {user_policies}")
-                    if user_policies and len(user_policies) > 0:
-                        policy_id = user_policies[-1]  # Assume a mais recente
-                        logger.info(f"Using latest user policy ID: {policy_id}")
-            except Exception as e:
-                logger.error(f"Error trying alternative methods: {str(e)}")
-        
-        # 3. Por último recurso, assume o ID 0 (se for a primeira política)
-        if policy_id is None:
-            policy_id = 0
-            logger.warning(f"Could not extract policy ID from logs. Using default ID: {policy_id}")
-            
-        # 4. Retornar o resultado
-        success_msg = {
-            "policyId": policy_id,
-            "transactionHash": receipt["transactionHash"].hex(),
-            "blockNumber": receipt["blockNumber"]
-        }
+        # Com Idempotency-Key, uma repetição devolve a transação já enviada
+        if idempotency_key:
+            return await _send_idempotent(idempotency_key, "createPolicy", request.model_dump(), contract_function, wait=wait)
+
+        # Modo assíncrono: retorna logo após a transmissão, com um trackingId para consulta
+        if not wait:
+            return await _submit_and_track(
+                contract_function,
+                lambda receipt: _build_create_policy_result(receipt, request.farmer),
+                events=[(insurance_contract, "PolicyCreated")]
+            )
         
-        if policy_id is None:
-            success_msg["warning"] = "Could not extract policy ID from transaction. Please check contract implementation."
-            
-        return success_msg
+        # Enviar a transação
+        receipt = await send_transaction(contract_function)
+        return await _build_create_policy_result(receipt, request.farmer)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in create_policy: {str(e)}", exc_info=True)
         
@@ -191,18 +245,9 @@ async def create_policy(request: CreatePolicyRequest):
         if "not found in this contract" in str(e):
             # Listar funções e eventos disponíveis
             try:
-                available_functions = [fn for fn in dir(insurance_contract.functions) 
-                                     if callable(getattr(insurance_contract.functions, fn)) 
-                                     and not fn.startswith('__')]
-                
-                available_events = []
-                for event in dir(insurance_contract.events):
-                    if not event.startswith('_'):
-                        available_events.append(event)
-                
                 error_detail = f"Failed to create policy: {str(e)}\n\n"
-                error_detail += f"Available functions in contract: {', '.join(available_functions[:10])}\n"
-                error_detail += f"Available events in contract: {', '.join(available_events)}"
+                error_detail += f"Available functions in contract: {', '.join(insurance_abi.function_names[:10])}\n"
+                error_detail += f"Available events in contract: {', '.join(insurance_abi.event_names)}"
                 
                 raise HTTPException(status_code=500, detail=error_detail)
             except Exception:
@@ -213,16 +258,35 @@ async def create_policy(request: CreatePolicyRequest):
 
 # 2. Ativar apólice
 @router.post("/policies/{policy_id}/activate")
-async def activate_policy(policy_id: int, request: ActivatePolicyRequest):
+async def activate_policy(policy_id: int, request: ActivatePolicyRequest, wait: bool = True,
+                          idempotency_key: str = Header(None)):
     contract_function = insurance_contract.functions.activatePolicy(policy_id)
-    receipt = send_transaction(contract_function, value=request.premium)
-    return {"success": True, "transactionHash": receipt["transactionHash"].hex()}
+    if idempotency_key:
+        return await _send_idempotent(idempotency_key, "activatePolicy", {"policyId": policy_id, "premium": request.premium},
+                                      contract_function, value=request.premium, wait=wait)
+    if not wait:
+        return await _submit_and_track(contract_function, _transaction_result, value=request.premium,
+                                       events=[(insurance_contract, "PolicyActivated")])
+    receipt = await send_transaction(contract_function, value=request.premium)
+    return _transaction_result(receipt)
 
 # 3. Consultar detalhes da apólice
+async def _cached_policy_details(policy_id):
+    """Lê getPolicyDetails através do cache de apólices"""
+    return await policy_cache.get(
+        "details", policy_id, insurance_contract.functions.getPolicyDetails(policy_id).call
+    )
+
+async def _cached_policy_status(policy_id):
+    """Lê getPolicyStatus através do cache de apólices"""
+    return await policy_cache.get(
+        "status", policy_id, insurance_contract.functions.getPolicyStatus(policy_id).call
+    )
+
 @router.get("/policies/{policy_id}")
 async def get_policy_details(policy_id: int):
     try:
-        policy, parameters = insurance_contract.functions.getPolicyDetails(policy_id).call()
+        policy, parameters = await _cached_policy_details(policy_id)
         
         # Converter os parâmetros para um formato mais legível
         formatted_parameters = [
@@ -256,11 +320,8 @@ async def get_policy_details(policy_id: int):
         raise HTTPException(status_code=404, detail=f"Policy not found or could not be retrieved: {str(e)}")
 
 # 4. Cancelar apólice
-@router.post("/policies/{policy_id}/cancel")
-async def cancel_policy(policy_id: int):
-    contract_function = insurance_contract.functions.cancelPolicy(policy_id)
-    receipt = send_transaction(contract_function)
-    
+def _cancel_policy_result(receipt):
+    """Monta a resposta de cancelamento a partir do evento PolicyCancelled"""
     # Verificar se há eventos relevantes
     events = get_event_data(insurance_contract, "PolicyCancelled", receipt)
     if events and len(events) > 0:
@@ -269,13 +330,22 @@ async def cancel_policy(policy_id: int):
     
     return {"success": True, "warning": "No refund event found", "transactionHash": receipt["transactionHash"].hex()}
 
+@router.post("/policies/{policy_id}/cancel")
+async def cancel_policy(policy_id: int, wait: bool = True):
+    contract_function = insurance_contract.functions.cancelPolicy(policy_id)
+    if not wait:
+        return await _submit_and_track(contract_function, _cancel_policy_result,
+                                       events=[(insurance_contract, "PolicyCancelled")])
+    receipt = await send_transaction(contract_function)
+    return _cancel_policy_result(receipt)
+
 # 5. Buscar dados climáticos (OpenWeather)
 @router.post("/policies/{policy_id}/openweather-data")
 async def fetch_openweather_data(policy_id: int, request: ClimateDataRequest):
     try:
         # Buscar detalhes da apólice primeiro para verificar se ela existe
         try:
-            policy, parameters = insurance_contract.functions.getPolicyDetails(policy_id).call()
+            policy, parameters = await insurance_contract.functions.getPolicyDetails(policy_id).call()
             logger.info(f"Fetching climate data for policy {policy_id}, region: {request.region}, parameter: {request.parameterType}")
         except Exception as e:
             logger.error(f"Error fetching policy details: {str(e)}")
@@ -292,17 +362,26 @@ async def fetch_openweather_data(policy_id: int, request: ClimateDataRequest):
             logger.warning(f"Parameter type {request.parameterType} not found in policy parameters: {parameter_types}")
             # Continuar mesmo com parâmetro não encontrado, mas registrar aviso
         
+        # Como no contrato, vale o primeiro parâmetro da apólice com o tipo solicitado; com
+        # periodInDays a comparação usa o agregado do período em vez da leitura instantânea
+        matched_param = next((param for param in parameters if param[0] == request.parameterType), None)
+        period_days = matched_param[2] if matched_param else 0
+        
         # Buscar dados climáticos da API OpenWeather
         try:
-            value = fetch_climate_data(request.region, request.parameterType)
-            logger.info(f"Fetched climate data value: {value}")
+            climate = await fetch_windowed_climate_data(request.region, request.parameterType, period_days)
+            value = climate["value"]
+            logger.info(f"Fetched climate data value: {value} ({climate['aggregation']} over {period_days} days)")
         except ValueError as e:
             # Se o parâmetro não for suportado, retornar erro 400
             if "Unsupported parameter type" in str(e):
                 raise HTTPException(status_code=400, detail=str(e))
             # Para outros erros de valor, também retornar 400
             raise HTTPException(status_code=400, detail=f"Error fetching climate data: {str(e)}")
-        except requests.exceptions.RequestException as e:
+        except OpenWeatherError as e:
+            if e.status == 429:
+                # Cota da OpenWeather esgotada: o cliente pode tentar novamente mais tarde
+                raise HTTPException(status_code=503, detail=f"OpenWeather quota exhausted: {str(e)}")
             # Erros de requisição HTTP (problemas com a API OpenWeather)
             raise HTTPException(status_code=502, detail=f"Error contacting OpenWeather API: {str(e)}")
         except Exception as e:
@@ -310,53 +389,63 @@ async def fetch_openweather_data(policy_id: int, request: ClimateDataRequest):
             logger.error(f"Unexpected error fetching climate data: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
         
-        # Verificar cada parâmetro da apólice para determinar se um sinistro é acionado
+        window = {
+            "currentValue": climate["currentValue"],
+            "evaluatedValue": value,
+            "aggregation": climate["aggregation"],
+            "periodInDays": period_days,
+            "observations": climate["observations"],
+            "coverage": climate["coverage"],
+            "partial": climate["partial"]
+        }
+        
+        # Verificar o parâmetro da apólice para determinar se um sinistro é acionado
         claim_triggered = False
         payout_amount = 0
-        matched_param = None
-        
-        for param in parameters:
-            if param[0] == request.parameterType:
-                matched_param = param
-                threshold = param[1]
-                trigger_above = param[3]
-                payout_percentage = param[4]
-                
-                # Determinar se o sinistro deve ser acionado
-                should_trigger = (value < threshold and not trigger_above) or (value > threshold and trigger_above)
+        
+        if matched_param is not None:
+            threshold = matched_param[1]
+            trigger_above = matched_param[3]
+            payout_percentage = matched_param[4]
+            
+            # Determinar se o sinistro deve ser acionado
+            should_trigger = (value < threshold and not trigger_above) or (value > threshold and trigger_above)
+            
+            if should_trigger and climate["partial"]:
+                # Janela sem leituras suficientes no período: a leitura atual não representa o agregado
+                logger.warning(f"Not triggering claim for policy {policy_id}: {request.parameterType} window over {period_days} days is partial (coverage {climate['coverage']:.2f})")
+            elif should_trigger:
+                claim_triggered = True
+                payout_amount = int(policy[2] * payout_percentage / 10000)
+                logger.info(f"Claim triggered for policy {policy_id}. Value: {value}, Threshold: {threshold}, Trigger above: {trigger_above}")
                 
-                if should_trigger:
-                    claim_triggered = True
-                    payout_amount = int(policy[2] * payout_percentage / 10000)
-                    logger.info(f"Claim triggered for policy {policy_id}. Value: {value}, Threshold: {threshold}, Trigger above: {trigger_above}")
+                try:
+                    # Processar o sinistro no contrato inteligente
+                    contract_function = insurance_contract.functions.processClaim(policy_id, payout_amount)
+                    receipt = await send_transaction(contract_function, urgency="urgent")
                     
-                    try:
-                        # Processar o sinistro no contrato inteligente
-                        contract_function = insurance_contract.functions.processClaim(policy_id, payout_amount)
-                        receipt = send_transaction(contract_function)
-                        
-                        return {
-                            "policyId": policy_id,
-                            "region": request.region,
-                            "parameterType": request.parameterType,
-                            "currentValue": value,
-                            "threshold": threshold,
-                            "triggerAbove": trigger_above,
-                            "claimTriggered": True,
-                            "payoutAmount": payout_amount,
-                            "payoutPercentage": payout_percentage / 100.0,  # Converter para porcentagem legível
-                            "transactionHash": receipt["transactionHash"].hex()
-                        }
-                    except Exception as e:
-                        logger.error(f"Error processing claim: {str(e)}", exc_info=True)
-                        raise HTTPException(status_code=500, detail=f"Error processing claim: {str(e)}")
+                    return {
+                        "policyId": policy_id,
+                        "region": request.region,
+                        "parameterType": request.parameterType,
+                        **window,
+                        "threshold": threshold,
+                        "triggerAbove": trigger_above,
+                        "claimTriggered": True,
+                        "payoutAmount": payout_amount,
+                        "payoutPercentage": payout_percentage / 100.0,  # Converter para porcentagem legível
+                        "transactionHash": receipt["transactionHash"].hex()
+                    }
+                except Exception as e:
+                    logger.error(f"Error processing claim: {str(e)}", exc_info=True)
+                    raise HTTPException(status_code=500, detail=f"Error processing claim: {str(e)}")
         
         # Se nenhum sinistro foi acionado ou não encontramos o parâmetro na apólice
         return {
             "policyId": policy_id,
             "region": request.region,
             "parameterType": request.parameterType,
-            "currentValue": value,
+            **window,
             "threshold": matched_param[1] if matched_param else None,
             "triggerAbove": matched_param[3] if matched_param else None,
             "claimTriggered": False,
@@ -383,7 +472,7 @@ async def get_nft_metadata(policy_id: int):
         "metadata": f"Metadata for NFT {policy_id}"
     }
     try:
-        metadata = nft_contract.functions.getMetadata(policy_id).call()
+        metadata = await nft_contract.functions.getMetadata(policy_id).call()
         return {
             "policyId": policy_id,
             "metadata": metadata
@@ -396,7 +485,7 @@ async def get_nft_metadata(policy_id: int):
 @router.get("/policies/{policy_id}/nft/token-uri")
 async def get_nft_token_uri(policy_id: int):
     try:
-        token_uri = nft_contract.functions.tokenURI(policy_id).call()
+        token_uri = await nft_contract.functions.tokenURI(policy_id).call()
         return {
             "policyId": policy_id,
             "tokenUri": token_uri
@@ -410,7 +499,7 @@ async def get_nft_token_uri(policy_id: int):
 @router.get("/treasury/balance")
 async def get_treasury_balance():
     try:
-        balance = treasury_contract.functions.getTreasuryBalance().call()
+        balance = await treasury_contract.functions.getTreasuryBalance().call()
         return {
             "balance": balance,
             "balanceInEther": Web3.from_wei(balance, 'ether')
@@ -423,7 +512,7 @@ async def get_treasury_balance():
 @router.get("/treasury/health")
 async def get_treasury_health():
     try:
-        health = treasury_contract.functions.getFinancialHealth().call()
+        health = await treasury_contract.functions.getFinancialHealth().call()
         return {
             "reserveRatio": health[0],
             "reserveRatioPercentage": health[0] / 100.0,  # Converter para porcentagem legível
@@ -438,19 +527,17 @@ async def get_treasury_health():
  
 # 10. Adicionar capital à tesouraria
 @router.post("/treasury/capital")
-async def add_capital(request: AddCapitalRequest):
+async def add_capital(request: AddCapitalRequest, wait: bool = True):
     contract_function = treasury_contract.functions.addCapital()
-    receipt = send_transaction(contract_function, value=request.amount)
-    return {"success": True, "transactionHash": receipt["transactionHash"].hex()}
+    if not wait:
+        return await _submit_and_track(contract_function, _transaction_result, value=request.amount,
+                                       events=[(treasury_contract, "CapitalAdded")], urgency="economy")
+    receipt = await send_transaction(contract_function, value=request.amount, urgency="economy")
+    return _transaction_result(receipt)
 
 # 11. Criar proposta de governança
-@router.post("/governance/proposals")
-async def create_proposal(request: CreateProposalRequest):
-    contract_function = governance_contract.functions.createProposal(
-        request.description, request.targetContract, request.callData
-    )
-    receipt = send_transaction(contract_function)
-    
+def _create_proposal_result(receipt):
+    """Monta a resposta de criação de proposta a partir do evento ProposalCreated"""
     events = get_event_data(governance_contract, "ProposalCreated", receipt)
     if events and len(events) > 0:
         proposal_id = events[0].args.proposalId  # Ajuste conforme a estrutura real do evento
@@ -459,18 +546,32 @@ async def create_proposal(request: CreateProposalRequest):
     # Fallback se o evento não for encontrado
     return {"success": True, "warning": "ProposalCreated event not found", "transactionHash": receipt["transactionHash"].hex()}
 
+@router.post("/governance/proposals")
+async def create_proposal(request: CreateProposalRequest, wait: bool = True):
+    contract_function = governance_contract.functions.createProposal(
+        request.description, request.targetContract, request.callData
+    )
+    if not wait:
+        return await _submit_and_track(contract_function, _create_proposal_result,
+                                       events=[(governance_contract, "ProposalCreated")], urgency="economy")
+    receipt = await send_transaction(contract_function, urgency="economy")
+    return _create_proposal_result(receipt)
+
 # 12. Votar em proposta
 @router.post("/governance/proposals/{proposal_id}/vote")
-async def vote_proposal(proposal_id: int, request: VoteProposalRequest):
+async def vote_proposal(proposal_id: int, request: VoteProposalRequest, wait: bool = True):
     contract_function = governance_contract.functions.castVote(proposal_id, request.support)
-    receipt = send_transaction(contract_function)
-    return {"success": True, "transactionHash": receipt["transactionHash"].hex()}
+    if not wait:
+        return await _submit_and_track(contract_function, _transaction_result,
+                                       events=[(governance_contract, "VoteCast")], urgency="economy")
+    receipt = await send_transaction(contract_function, urgency="economy")
+    return _transaction_result(receipt)
 
 # 13. Consultar proposta
 @router.get("/governance/proposals/{proposal_id}")
 async def get_proposal_details(proposal_id: int):
     try:
-        proposal = governance_contract.functions.getProposalDetails(proposal_id).call()
+        proposal = await governance_contract.functions.getProposalDetails(proposal_id).call()
         
         # Formato mais amigável para o usuário
         return {
@@ -495,10 +596,13 @@ async def get_proposal_details(proposal_id: int):
     
 # 14. Executar proposta
 @router.post("/governance/proposals/{proposal_id}/execute")
-async def execute_proposal(proposal_id: int):
+async def execute_proposal(proposal_id: int, wait: bool = True):
     contract_function = governance_contract.functions.executeProposal(proposal_id)
-    receipt = send_transaction(contract_function)
-    return {"success": True, "transactionHash": receipt["transactionHash"].hex()}
+    if not wait:
+        return await _submit_and_track(contract_function, _transaction_result,
+                                       events=[(governance_contract, "ProposalExecuted")], urgency="economy")
+    receipt = await send_transaction(contract_function, urgency="economy")
+    return _transaction_result(receipt)
 
 # 15. Consultar saldo de tokens
 @router.get("/users/{address}/tokens")
@@ -510,12 +614,12 @@ async def get_token_balance(address: str):
         if not Web3.is_address(address):
             raise HTTPException(status_code=400, detail="Invalid address")
         
-        balance = token_contract.functions.balanceOf(address).call()
+        balance = await token_contract.functions.balanceOf(address).call()
         
         # Obter informações adicionais sobre o token
-        token_name = token_contract.functions.name().call()
-        token_symbol = token_contract.functions.symbol().call()
-        token_decimals = token_contract.functions.decimals().call()
+        token_name = await token_contract.functions.name().call()
+        token_symbol = await token_contract.functions.symbol().call()
+        token_decimals = await token_contract.functions.decimals().call()
         
         # Calcular o saldo formatado com o número correto de casas decimais
         formatted_balance = balance / (10 ** token_decimals)
@@ -536,14 +640,14 @@ async def get_token_balance(address: str):
 @router.post("/admin/regions")
 async def add_region(request: AddRegionRequest):
     contract_function = insurance_contract.functions.addSupportedRegion(request.region)
-    receipt = send_transaction(contract_function)
+    receipt = await send_transaction(contract_function, urgency="economy")
     return {"success": True, "transactionHash": receipt["transactionHash"].hex()}
 
 # 17. Adicionar cultura suportada
 @router.post("/admin/crops")
 async def add_crop(request: AddCropRequest):
     contract_function = insurance_contract.functions.addSupportedCrop(request.crop)
-    receipt = send_transaction(contract_function)
+    receipt = await send_transaction(contract_function, urgency="economy")
     return {"success": True, "transactionHash": receipt["transactionHash"].hex()}
 
 # 18. Configurar oráculos regionais
@@ -552,18 +656,37 @@ async def set_regional_oracle(request: SetOracleRequest):
     if not Web3.is_address(request.oracleAddress):
         raise HTTPException(status_code=400, detail="Invalid oracle address")
     contract_function = insurance_contract.functions.setRegionalOracles(request.region, [request.oracleAddress])
-    receipt = send_transaction(contract_function)
+    receipt = await send_transaction(contract_function, urgency="economy")
     return {"success": True, "transactionHash": receipt["transactionHash"].hex()}
 
 # 19. Consultar status da apólice
 @router.get("/policies/{policy_id}/status")
 async def get_policy_status(policy_id: int):
+    # Leitura a partir do índice local, quando sincronizado
+    store = get_indexed_store()
+    if store is not None:
+        policy = store.get_policy(policy_id)
+        if policy is not None:
+            return {
+                "policyId": policy_id,
+                "active": policy["active"],
+                "claimed": policy["claimed"],
+                "claimPaid": policy["claimPaid"],
+                "farmer": policy["farmer"],
+                "coverageAmount": policy["coverageAmount"],
+                "premium": policy["premium"],
+                "startDate": policy["startDate"],
+                "endDate": policy["endDate"],
+                "region": policy["region"],
+                "cropType": policy["cropType"]
+            }
+    
     try:
-        status = insurance_contract.functions.getPolicyStatus(policy_id).call()
+        status = await _cached_policy_status(policy_id)
         
         # Obter detalhes adicionais para enriquecer a resposta
         try:
-            policy, _ = insurance_contract.functions.getPolicyDetails(policy_id).call()
+            policy, _ = await _cached_policy_details(policy_id)
             
             return {
                 "policyId": policy_id,
@@ -600,7 +723,7 @@ async def transfer_tokens(address: str, request: TransferTokensRequest):
     if not Web3.is_address(address):
         raise HTTPException(status_code=400, detail="Invalid address")
     contract_function = token_contract.functions.transfer(address, request.amount)
-    receipt = send_transaction(contract_function)
+    receipt = await send_transaction(contract_function)
     return {"success": True, "transactionHash": receipt["transactionHash"].hex()}
 
 # ----- Endpoints Adicionais -----
@@ -616,65 +739,72 @@ async def get_farmer_policies(address: str):
         if not Web3.is_address(address):
             raise HTTPException(status_code=400, detail="Invalid address")
         
-        # Verificar se existe uma função para listar as apólices de um usuário
-        available_functions = [fn for fn in dir(insurance_contract.functions) 
-                             if callable(getattr(insurance_contract.functions, fn)) 
-                             and not fn.startswith('__')]
+        # Leitura a partir do índice local, quando sincronizado
+        store = get_indexed_store()
+        if store is not None:
+            fields = ("id", "coverageAmount", "premium", "startDate", "endDate", "active", "claimed", "region", "cropType")
+            policies = [{field: policy[field] for field in fields} for policy in store.get_farmer_policies(address)]
+            return {"address": address, "policies": policies}
         
         policies = []
         
         # Tentar diferentes métodos para obter as apólices do fazendeiro
-        if 'getUserPolicies' in available_functions:
+        if insurance_abi.has_function('getUserPolicies'):
             # Se o contrato tiver uma função específica para isso
-            policy_ids = insurance_contract.functions.getUserPolicies(address).call()
+            policy_ids = await insurance_contract.functions.getUserPolicies(address).call()
             
-            # Obter detalhes de cada apólice
-            for policy_id in policy_ids:
-                try:
-                    policy, parameters = insurance_contract.functions.getPolicyDetails(policy_id).call()
-                    policies.append({
-                        "id": policy_id,
-                        "coverageAmount": policy[2],
-                        "premium": policy[3],
-                        "startDate": policy[4],
-                        "endDate": policy[5],
-                        "active": policy[6],
-                        "claimed": policy[7],
-                        "region": policy[11],
-                        "cropType": policy[12]
-                    })
-                except Exception as e:
-                    logger.error(f"Error fetching details for policy {policy_id}: {str(e)}")
+            # Obter detalhes de todas as apólices numa única leitura em lote
+            results = await batch_call(
+                insurance_contract.functions.getPolicyDetails(policy_id) for policy_id in policy_ids
+            )
+            for policy_id, result in zip(policy_ids, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error fetching details for policy {policy_id}: {str(result)}")
+                    continue
+                policy, parameters = result
+                policies.append({
+                    "id": policy_id,
+                    "coverageAmount": policy[2],
+                    "premium": policy[3],
+                    "startDate": policy[4],
+                    "endDate": policy[5],
+                    "active": policy[6],
+                    "claimed": policy[7],
+                    "region": policy[11],
+                    "cropType": policy[12]
+                })
         else:
             # Método alternativo: buscar o total de apólices e verificar cada uma
             # Este método é menos eficiente, mas serve como fallback
             try:
                 # Tentar obter o total de apólices
-                if 'getTotalPolicies' in available_functions:
-                    total_policies = insurance_contract.functions.getTotalPolicies().call()
+                if insurance_abi.has_function('getTotalPolicies'):
+                    total_policies = await insurance_contract.functions.getTotalPolicies().call()
                 else:
                     # Estimar um valor máximo (ajustar conforme necessário)
                     total_policies = 100
                 
-                # Verificar cada política
-                for i in range(total_policies):
-                    try:
-                        policy, _ = insurance_contract.functions.getPolicyDetails(i).call()
-                        if policy[1].lower() == address.lower():  # Se o fazendeiro é o endereço procurado
-                            policies.append({
-                                "id": i,
-                                "coverageAmount": policy[2],
-                                "premium": policy[3],
-                                "startDate": policy[4],
-                                "endDate": policy[5],
-                                "active": policy[6],
-                                "claimed": policy[7],
-                                "region": policy[11],
-                                "cropType": policy[12]
-                            })
-                    except:
-                        # Se der erro em uma apólice, continua para a próxima
+                # Verificar cada política (lidas em lote)
+                results = await batch_call(
+                    insurance_contract.functions.getPolicyDetails(i) for i in policy_id_range(total_policies)
+                )
+                for i, result in zip(policy_id_range(total_policies), results):
+                    # Se der erro em uma apólice, continua para a próxima
+                    if isinstance(result, Exception):
                         continue
+                    policy, _ = result
+                    if policy[1].lower() == address.lower():  # Se o fazendeiro é o endereço procurado
+                        policies.append({
+                            "id": i,
+                            "coverageAmount": policy[2],
+                            "premium": policy[3],
+                            "startDate": policy[4],
+                            "endDate": policy[5],
+                            "active": policy[6],
+                            "claimed": policy[7],
+                            "region": policy[11],
+                            "cropType": policy[12]
+                        })
             except Exception as e:
                 logger.error(f"Error in alternate method to list policies: {str(e)}")
         
@@ -688,26 +818,21 @@ async def get_farmer_policies(address: str):
 @router.get("/regions")
 async def get_supported_regions():
     try:
-        # Verificar se existe uma função para listar regiões
-        available_functions = [fn for fn in dir(insurance_contract.functions) 
-                             if callable(getattr(insurance_contract.functions, fn)) 
-                             and not fn.startswith('__')]
-        
         regions = []
         
-        if 'getSupportedRegions' in available_functions:
-            regions = insurance_contract.functions.getSupportedRegions().call()
-        elif 'supportedRegions' in available_functions:
+        if insurance_abi.has_function('getSupportedRegions'):
+            regions = await insurance_contract.functions.getSupportedRegions().call()
+        elif insurance_abi.has_function('supportedRegions'):
             # Tenta obter o contador de regiões primeiro
             try:
-                if 'getSupportedRegionsCount' in available_functions:
-                    count = insurance_contract.functions.getSupportedRegionsCount().call()
+                if insurance_abi.has_function('getSupportedRegionsCount'):
+                    count = await insurance_contract.functions.getSupportedRegionsCount().call()
                 else:
                     count = 100  # Valor máximo estimado
                 
                 for i in range(count):
                     try:
-                        region = insurance_contract.functions.supportedRegions(i).call()
+                        region = await insurance_contract.functions.supportedRegions(i).call()
                         regions.append(region)
                     except:
                         break
@@ -724,26 +849,21 @@ async def get_supported_regions():
 @router.get("/crops")
 async def get_supported_crops():
     try:
-        # Verificar se existe uma função para listar culturas
-        available_functions = [fn for fn in dir(insurance_contract.functions) 
-                             if callable(getattr(insurance_contract.functions, fn)) 
-                             and not fn.startswith('__')]
-        
         crops = []
         
-        if 'getSupportedCrops' in available_functions:
-            crops = insurance_contract.functions.getSupportedCrops().call()
-        elif 'supportedCrops' in available_functions:
+        if insurance_abi.has_function('getSupportedCrops'):
+            crops = await insurance_contract.functions.getSupportedCrops().call()
+        elif insurance_abi.has_function('supportedCrops'):
             # Tenta obter o contador de culturas primeiro
             try:
-                if 'getSupportedCropsCount' in available_functions:
-                    count = insurance_contract.functions.getSupportedCropsCount().call()
+                if insurance_abi.has_function('getSupportedCropsCount'):
+                    count = await insurance_contract.functions.getSupportedCropsCount().call()
                 else:
                     count = 100  # Valor máximo estimado
                 
                 for i in range(count):
                     try:
-                        crop = insurance_contract.functions.supportedCrops(i).call()
+                        crop = await insurance_contract.functions.supportedCrops(i).call()
                         crops.append(crop)
                     except:
                         break
@@ -775,72 +895,87 @@ async def get_system_stats():
         # Obter estatísticas disponíveis
         try:
             # Saldo da tesouraria
-            stats["treasuryBalance"] = treasury_contract.functions.getTreasuryBalance().call()
+            stats["treasuryBalance"] = await treasury_contract.functions.getTreasuryBalance().call()
             
             # Saúde financeira
-            health = treasury_contract.functions.getFinancialHealth().call()
+            health = await treasury_contract.functions.getFinancialHealth().call()
             stats["reserveRatio"] = health[0]
             
-            # Funções específicas para estatísticas
-            available_functions = [fn for fn in dir(insurance_contract.functions) 
-                                if callable(getattr(insurance_contract.functions, fn)) 
-                                and not fn.startswith('__')]
-            
-            if 'getTotalPolicies' in available_functions:
-                stats["totalPolicies"] = insurance_contract.functions.getTotalPolicies().call()
+            # Estatísticas das apólices a partir do índice local, quando sincronizado
+            store = get_indexed_store()
+            if store is not None:
+                counters = store.get_counters()
+                stats["totalPolicies"] = counters["total_policies"]
+                stats["activePolicies"] = counters["active_policies"]
+                stats["totalClaims"] = counters["total_claims"]
+                stats["totalPremiums"] = counters["total_premiums"]
+                stats["totalPayouts"] = counters["total_payouts"]
+                stats["topRegions"] = store.top_values("region")
+                stats["topCrops"] = store.top_values("crop_type")
+            else:
+                # Funções específicas para estatísticas
+                if insurance_abi.has_function('getTotalPolicies'):
+                    stats["totalPolicies"] = await insurance_contract.functions.getTotalPolicies().call()
             
-            if 'getActivePolicies' in available_functions:
-                active_policies = insurance_contract.functions.getActivePolicies().call()
-                stats["activePolicies"] = len(active_policies)
+                if insurance_abi.has_function('getActivePolicies'):
+                    active_policies = await insurance_contract.functions.getActivePolicies().call()
+                    stats["activePolicies"] = len(active_policies)
             
-            if 'getTotalPremiums' in available_functions:
-                stats["totalPremiums"] = insurance_contract.functions.getTotalPremiums().call()
+                if insurance_abi.has_function('getTotalPremiums'):
+                    stats["totalPremiums"] = await insurance_contract.functions.getTotalPremiums().call()
             
-            if 'getTotalPayouts' in available_functions:
-                stats["totalPayouts"] = insurance_contract.functions.getTotalPayouts().call()
+                if insurance_abi.has_function('getTotalPayouts'):
+                    stats["totalPayouts"] = await insurance_contract.functions.getTotalPayouts().call()
             
-            if 'getTotalClaims' in available_functions:
-                stats["totalClaims"] = insurance_contract.functions.getTotalClaims().call()
+                if insurance_abi.has_function('getTotalClaims'):
+                    stats["totalClaims"] = await insurance_contract.functions.getTotalClaims().call()
             
-            # Alternativa: calcular estatísticas a partir das apólices individuais
-            if stats["totalPolicies"] == 0 and 'getPolicyDetails' in available_functions:
-                # Estimar máximo de apólices
-                max_policies = 100
+                # Alternativa: calcular estatísticas a partir das apólices individuais
+                if stats["totalPolicies"] == 0 and insurance_abi.has_function('getPolicyDetails'):
+                    # Estimar máximo de apólices
+                    max_policies = 100
                 
-                # Contadores para estatísticas
-                total_policies = 0
-                active_policies = 0
-                total_claims = 0
-                total_premiums = 0
-                total_payouts = 0
+                    # Contadores para estatísticas
+                    total_policies = 0
+                    active_policies = 0
+                    total_claims = 0
+                    total_premiums = 0
+                    total_payouts = 0
                 
-                # Dicionários para contagem
-                regions_count = {}
-                crops_count = {}
+                    # Dicionários para contagem
+                    regions_count = {}
+                    crops_count = {}
                 
-                # Iterar sobre possíveis IDs de apólice
-                for i in range(max_policies):
-                    try:
-                        policy, _ = insurance_contract.functions.getPolicyDetails(i).call()
-                        
+                    # Ler todos os possíveis IDs de apólice em lote
+                    results = await batch_call(
+                        insurance_contract.functions.getPolicyDetails(i) for i in policy_id_range(max_policies)
+                    )
+                
+                    # Iterar sobre possíveis IDs de apólice
+                    for result in results:
+                        # Se não conseguir obter mais apólices, para a iteração
+                        if isinstance(result, Exception):
+                            break
+                        policy, _ = result
+                    
                         # Encontrou uma apólice válida
                         total_policies += 1
-                        
+                    
                         # Verificar se está ativa
                         if policy[6]:  # policy.active
                             active_policies += 1
-                        
+                    
                         # Verificar se teve sinistro
                         if policy[7]:  # policy.claimed
                             total_claims += 1
-                        
+                    
                         # Adicionar prêmio
                         total_premiums += policy[3]  # policy.premium
-                        
+                    
                         # Adicionar pagamento de sinistro
                         if policy[8]:  # policy.claimPaid
                             total_payouts += policy[8]  # Assume que o valor está em policy.claimPaid
-                        
+                    
                         # Contagem de regiões
                         region = policy[11]
                         if region:
@@ -848,7 +983,7 @@ async def get_system_stats():
                                 regions_count[region] += 1
                             else:
                                 regions_count[region] = 1
-                        
+                    
                         # Contagem de culturas
                         crop = policy[12]
                         if crop:
@@ -856,23 +991,19 @@ async def get_system_stats():
                                 crops_count[crop] += 1
                             else:
                                 crops_count[crop] = 1
-                    
-                    except:
-                        # Se não conseguir obter mais apólices, para a iteração
-                        break
                 
-                # Atualizar estatísticas
-                stats["totalPolicies"] = total_policies
-                stats["activePolicies"] = active_policies
-                stats["totalClaims"] = total_claims
-                stats["totalPremiums"] = total_premiums
-                stats["totalPayouts"] = total_payouts
+                    # Atualizar estatísticas
+                    stats["totalPolicies"] = total_policies
+                    stats["activePolicies"] = active_policies
+                    stats["totalClaims"] = total_claims
+                    stats["totalPremiums"] = total_premiums
+                    stats["totalPayouts"] = total_payouts
                 
-                # Top regiões
-                stats["topRegions"] = sorted(regions_count.items(), key=lambda x: x[1], reverse=True)[:5]
+                    # Top regiões
+                    stats["topRegions"] = sorted(regions_count.items(), key=lambda x: x[1], reverse=True)[:5]
                 
-                # Top culturas
-                stats["topCrops"] = sorted(crops_count.items(), key=lambda x: x[1], reverse=True)[:5]
+                    # Top culturas
+                    stats["topCrops"] = sorted(crops_count.items(), key=lambda x: x[1], reverse=True)[:5]
         
         except Exception as e:
             logger.error(f"Error calculating system statistics: {str(e)}")
@@ -888,35 +1019,58 @@ async def get_system_stats():
         logger.error(f"Error fetching system statistics: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Could not retrieve system statistics: {str(e)}")
 
+# Campos de GET /weather/{region} extraídos do payload da OpenWeather
+WEATHER_FIELDS = {
+    "temperature": lambda data: data.get("main", {}).get("temp"),
+    "humidity": lambda data: data.get("main", {}).get("humidity"),
+    "pressure": lambda data: data.get("main", {}).get("pressure"),
+    "windSpeed": lambda data: data.get("wind", {}).get("speed"),
+    "clouds": lambda data: data.get("clouds", {}).get("all"),
+    "weather": lambda data: data.get("weather", [{}])[0].get("main"),
+    "description": lambda data: data.get("weather", [{}])[0].get("description"),
+    "icon": lambda data: data.get("weather", [{}])[0].get("icon"),
+    "rainfall": lambda data: data.get("rain", {}).get("1h", 0),
+    "timestamp": lambda data: data.get("dt"),
+    "rawData": lambda data: data
+}
+DEFAULT_WEATHER_FIELDS = [name for name in WEATHER_FIELDS if name != "rawData" or WEATHER_INCLUDE_RAW_DATA]
+
+# Corpos já serializados e comprimidos de GET /weather/{region}, por versão (ETag)
+weather_responses = EncodedResponseCache()
+
 # 25. Obter clima atual para uma região
 @router.get("/weather/{region}")
-async def get_current_weather(region: str):
+async def get_current_weather(region: str, request: Request, fields: str = None):
+    if fields:
+        selected = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in selected if name not in WEATHER_FIELDS]
+        if unknown or not selected:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown) or fields}. Available fields are: {', '.join(WEATHER_FIELDS)}"
+            )
+    else:
+        selected = DEFAULT_WEATHER_FIELDS
+
     try:
-        from ..services.openweather import fetch_detailed_climate_data
-        
         # Obter dados climáticos detalhados
-        weather_data = fetch_detailed_climate_data(region)
-        
-        # Processar e retornar os dados em formato amigável
-        return {
-            "region": region,
-            "temperature": weather_data.get("main", {}).get("temp"),
-            "humidity": weather_data.get("main", {}).get("humidity"),
-            "pressure": weather_data.get("main", {}).get("pressure"),
-            "windSpeed": weather_data.get("wind", {}).get("speed"),
-            "clouds": weather_data.get("clouds", {}).get("all"),
-            "weather": weather_data.get("weather", [{}])[0].get("main"),
-            "description": weather_data.get("weather", [{}])[0].get("description"),
-            "icon": weather_data.get("weather", [{}])[0].get("icon"),
-            "rainfall": weather_data.get("rain", {}).get("1h", 0),
-            "timestamp": weather_data.get("dt"),
-            "rawData": weather_data
-        }
-    
+        weather_data = await fetch_detailed_climate_data(region)
     except Exception as e:
         logger.error(f"Error fetching current weather: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Could not retrieve weather data: {str(e)}")
 
+    # A versão muda só quando a OpenWeather publica uma nova leitura (dt) para a região
+    etag = None
+    if weather_data.get("dt") is not None:
+        digest = hashlib.sha1(f"{region}|{','.join(selected)}".encode()).hexdigest()[:16]
+        etag = f'W/"{weather_data["dt"]}-{digest}"'
+
+    # Processar e retornar os dados em formato amigável
+    return weather_responses.respond(request, etag, lambda: {
+        "region": region,
+        **{name: WEATHER_FIELDS[name](weather_data) for name in selected}
+    })
+
 # 26. tatus geral da API e contratos
 @router.get("/status")
 async def get_api_status():
@@ -943,10 +1097,10 @@ async def get_api_status():
         
         # Verificar conexão com a blockchain
         try:
-            from ..utils.config import w3
-            status["blockchain"]["connected"] = w3.is_connected()
-            status["blockchain"]["networkId"] = w3.eth.chain_id
-            status["blockchain"]["blockNumber"] = w3.eth.block_number
+            from ..utils.config import async_w3
+            status["blockchain"]["connected"] = await async_w3.is_connected()
+            status["blockchain"]["networkId"] = await async_w3.eth.chain_id
+            status["blockchain"]["blockNumber"] = await async_w3.eth.block_number
         except Exception as e:
             logger.error(f"Error checking blockchain connection: {str(e)}")
         
@@ -963,28 +1117,26 @@ async def get_api_status():
         for name, contract in contracts:
             try:
                 # Tentar chamar alguma função view do contrato para verificar a conexão
-                methods = dir(contract.functions)
+                capabilities = abi_registry[name]
                 
                 # Funções comuns para testar
                 test_functions = ["owner", "getOwner", "name", "symbol", "balanceOf"]
                 
                 for func in test_functions:
-                    if func in methods:
-                        getattr(contract.functions, func)().call()
+                    if capabilities.has_function(func):
+                        await getattr(contract.functions, func)().call()
                         status["contracts"][name]["connected"] = True
                         break
                 
-                # Se não conseguiu testar com as funções comuns, tenta qualquer função view
+                # Se não conseguiu testar com as funções comuns, tenta qualquer função view sem argumentos
                 if not status["contracts"][name]["connected"]:
-                    for method in methods:
-                        if not method.startswith("__") and method not in ["address", "abi"]:
-                            # Tentar chamar sem argumentos
-                            try:
-                                getattr(contract.functions, method)().call()
-                                status["contracts"][name]["connected"] = True
-                                break
-                            except:
-                                pass
+                    for method in capabilities.view_functions:
+                        try:
+                            await getattr(contract.functions, method)().call()
+                            status["contracts"][name]["connected"] = True
+                            break
+                        except:
+                            pass
             
             except Exception as e:
                 logger.error(f"Error checking {name} contract connection: {str(e)}")
@@ -994,4 +1146,110 @@ async def get_api_status():
     except Exception as e:
         logger.error(f"Error fetching API status: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Could not retrieve API status: {str(e)}")
-    
\ No newline at end of file
+
+# 27. Acompanhar transação submetida no modo assíncrono (?wait=false)
+@router.get("/transactions/{tracking_id}")
+async def get_transaction_status(tracking_id: str):
+    # O transaction_tracker guarda os registros na memória do worker que recebeu a escrita:
+    # em outro worker ou após uma reinicialização o trackingId não é encontrado. Só as escritas
+    # com Idempotency-Key (outbox em SQLite) podem ser consultadas de qualquer worker
+    record = transaction_tracker.get(tracking_id)
+    if record is None:
+        # Escritas com Idempotency-Key são acompanhadas pelo outbox, com a chave como trackingId
+        outbox_record = transaction_outbox.get(tracking_id)
+        if outbox_record is not None:
+            return _outbox_record(outbox_record)
+        raise HTTPException(status_code=404, detail=f"Transaction {tracking_id} not found")
+    return record
+
+# 28. Métricas internas (caches e inicialização do worker)
+@router.get("/metrics")
+async def get_metrics():
+    return {
+        "policyCache": policy_cache.stats(),
+        "weatherCache": weather_cache.stats(),
+        "weatherCoalescing": weather_flights.stats(),
+        "weatherQuota": weather_quota.stats(),
+        "weatherResponses": weather_responses.stats(),
+        "claimEvaluation": claim_evaluation_job.stats(),
+        "claimSubmission": claim_submitter.stats(),
+        "receiptPoller": receipt_poller.stats(),
+        "feeOracle": fee_oracle.stats(),
+        "signerPool": signer_pool.stats(),
+        "climateStore": climate_store.stats() if climate_store is not None else None,
+        "rollingWindows": rolling_aggregates.stats(),
+        "startup": startup_timer.summary()
+    }
+
+# 29. Clima de várias regiões numa única requisição
+@router.post("/weather/bulk")
+async def get_bulk_weather(request: BulkWeatherRequest):
+    if not request.regions:
+        raise HTTPException(status_code=400, detail="At least one region is required")
+    if len(request.regions) > WEATHER_BULK_MAX_REGIONS:
+        raise HTTPException(status_code=400, detail=f"At most {WEATHER_BULK_MAX_REGIONS} regions per request")
+    
+    try:
+        results = await fetch_bulk_climate_data(request.regions, request.parameterTypes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "results": results,
+        "succeeded": sum(1 for result in results if result["values"] is not None),
+        "failed": sum(1 for result in results if result["values"] is None)
+    }
+
+# 30. Avaliar agora os sinistros de toda a carteira
+@router.post("/claims/evaluate")
+async def evaluate_claims():
+    try:
+        return await claim_evaluation_job.run_once()
+    except Exception as e:
+        logger.error(f"Error evaluating claims: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error evaluating claims: {str(e)}")
+
+# 31. Resultado da última avaliação de sinistros
+@router.get("/claims/evaluation")
+async def get_last_claim_evaluation():
+    if claim_evaluation_job.last_report is None:
+        raise HTTPException(status_code=404, detail="No claim evaluation has run yet")
+    return claim_evaluation_job.last_report
+
+# 32. Histórico local de um parâmetro climático de uma região
+@router.get("/weather/{region}/history")
+async def get_weather_history(region: str, parameterType: str, days: float = 7, points: bool = False):
+    if climate_store is None:
+        raise HTTPException(status_code=404, detail="Climate history is disabled (CLIMATE_STORE_ENABLED)")
+    try:
+        validate_parameter_types([parameterType])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if days <= 0:
+        raise HTTPException(status_code=400, detail="days must be positive")
+
+    end = int(time.time())
+    start = end - int(days * 86400)
+    result = {
+        "region": region,
+        "parameterType": parameterType,
+        "from": start,
+        "to": end,
+        **climate_store.aggregate(region, parameterType, start, end)
+    }
+    if points:
+        timestamps, values = climate_store.query(region, parameterType, start, end)
+        result["points"] = [[t, v] for t, v in zip(timestamps.tolist(), values.tolist())]
+    return result
+
+# 33. Pagar sinistros em lote (transações em sequência, recibos acompanhados em paralelo)
+@router.post("/claims/submit")
+async def submit_claims(request: ClaimBatchRequest):
+    # processClaim(uint256, ClimateData) é onlyOracle: só o contrato oráculo o chama, ao fechar o
+    # consenso de uma requisição aberta por requestClimateData, e nenhuma chave do backend é o
+    # oráculo. O lote é recusado antes de assinar qualquer transação que o contrato reverteria
+    raise HTTPException(
+        status_code=501,
+        detail="processClaim can only be called by the insurance contract's oracle; "
+               "claims are paid by the oracle network after requestClimateData"
+    )
@@ -1,14 +1,50 @@
 #src/main.py
+from .utils.startup import startup_timer
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api.routes import router
+from .services.indexer import policy_indexer
+from .services.policy_cache import policy_cache_watcher
+from .services.openweather import openweather_client
+from .services.claim_engine import claim_evaluation_job
+from .services.receipt_poller import receipt_poller
+from .services.blockchain import resume_outbox
+from .utils.config import check_connection, initialize_contracts
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # A conexão com o nó e os ABIs são preparados aqui, e não na importação dos módulos
+    await check_connection()
+    initialize_contracts()
+
+    # Tarefas em segundo plano iniciadas com a aplicação
+    if policy_indexer is not None:
+        policy_indexer.start()
+    if policy_cache_watcher is not None:
+        policy_cache_watcher.start()
+    claim_evaluation_job.start()
+    receipt_poller.start()
+    # Transações do outbox transmitidas antes de uma reinicialização voltam a ser acompanhadas
+    await resume_outbox()
+    startup_timer.mark("ready")
+    startup_timer.log_summary()
+    yield
+    await claim_evaluation_job.stop()
+    await receipt_poller.stop()
+    if policy_cache_watcher is not None:
+        await policy_cache_watcher.stop()
+    if policy_indexer is not None:
+        await policy_indexer.stop()
+    await openweather_client.close()
 
 app = FastAPI(
     title="AgroChain API",
     description="API para o sistema AgroChain de seguros agrícolas baseados em blockchain.",
     version="1.0.0",
     docs_url="/api/docs",  # Swagger UI
-    redoc_url="/api/redoc"  # ReDoc
+    redoc_url="/api/redoc",  # ReDoc
+    lifespan=lifespan
 )
 
 # Configurar CORS para Angular
@@ -22,6 +58,8 @@ app.add_middleware(
 
 app.include_router(router, prefix="/api")
 
+startup_timer.mark("import")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.1", port=8000, reload=True)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class ClimateParameter(BaseModel):
     parameterType: str
@@ -43,4 +43,15 @@ class AddCropRequest(BaseModel):
 
 class SetOracleRequest(BaseModel):
     region: str
-    oracleAddress: str
\ No newline at end of file
+    oracleAddress: str
+class BulkWeatherRequest(BaseModel):
+    regions: List[str]
+    parameterTypes: Optional[List[str]] = None
+
+class ClaimPayout(BaseModel):
+    policyId: int
+    payoutAmount: int
+
+class ClaimBatchRequest(BaseModel):
+    claims: Optional[List[ClaimPayout]] = None
+    fromEvaluation: bool = False
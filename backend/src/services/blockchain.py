@@ -1,43 +1,219 @@
-from ..utils.config import w3, admin_address, admin_private_key, insurance_contract, oracle_contract, treasury_contract, governance_contract, token_contract, nft_contract
+import asyncio
+import inspect
+import hashlib
+import json
+import os
+import time
+from web3 import Web3
+from web3.exceptions import ContractLogicError, TimeExhausted, TransactionNotFound
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3._utils.request import async_make_post_request
+from ..utils.config import (
+    async_w3, admin_account, MULTICALL3_ADDRESS, BATCH_CALL_CHUNK_SIZE,
+    FEE_CACHE_TTL, GAS_ESTIMATE_TTL, GAS_ESTIMATE_MARGIN, DEFAULT_GAS_LIMIT, TX_OUTBOX_DB_PATH,
+    FEE_HISTORY_BLOCKS, FEE_MIN_PRIORITY_FEE, FEE_TIERS, RECEIPT_TIMEOUT, TX_OUTBOX_CHECK_INTERVAL,
+    signer_accounts, SIGNER_POOL_STRATEGY, SIGNER_MAX_PENDING, SIGNER_POOL_FUNCTIONS,
+    async_insurance_contract as insurance_contract,
+    async_oracle_contract as oracle_contract,
+    async_treasury_contract as treasury_contract,
+    async_governance_contract as governance_contract,
+    async_token_contract as token_contract,
+    async_nft_contract as nft_contract,
+    abi_registry
+)
+from .nonce_manager import NonceManager, is_nonce_error
+from .chain_params import ChainParameters, GasEstimator, FeeOracle
+from .log_decoder import LogDecoder
+from .receipt_poller import receipt_poller
+from .tx_outbox import TransactionOutbox, IN_FLIGHT_STATUSES
+from .signer_pool import SignerPool
+from ..utils.lazy import LazyObject
 import logging
 
 logger = logging.getLogger(__name__)
 
-def send_transaction(contract_function, value=0, sender_address=None, private_key=None):
+# Alocador de nonces compartilhado por todas as transações do processo
+nonce_manager = NonceManager(async_w3)
+NONCE_RETRY_ATTEMPTS = 3
+
+# Caches de chain_id, gas price e estimativas de gas
+chain_params = ChainParameters(async_w3, FEE_CACHE_TTL)
+gas_estimator = GasEstimator(GAS_ESTIMATE_MARGIN, GAS_ESTIMATE_TTL, DEFAULT_GAS_LIMIT)
+
+# Taxas EIP-1559 por urgência, um eth_feeHistory por bloco; os blocos e recibos vistos pelo
+# acompanhamento de recibos renovam o cache e alimentam a comparação estimado x pago
+fee_oracle = FeeOracle(async_w3, FEE_TIERS, FEE_HISTORY_BLOCKS, FEE_MIN_PRIORITY_FEE, FEE_CACHE_TTL)
+receipt_poller.add_block_listener(fee_oracle.on_new_block)
+receipt_poller.add_block_listener(chain_params.on_new_block)
+receipt_poller.add_listener(fee_oracle.observe_receipt)
+
+# Remetentes das escritas: as funções liberadas se dividem entre as chaves do pool (vaga liberada
+# pelo recibo); as que exigem o owner continuam fixas no admin
+signer_pool = LazyObject(lambda: SignerPool(
+    signer_accounts, (admin_account.address, admin_account.key), SIGNER_POOL_FUNCTIONS,
+    SIGNER_POOL_STRATEGY, SIGNER_MAX_PENDING, RECEIPT_TIMEOUT
+))
+
+def _release_signer_slot(receipt):
+    # O pool só existe depois da primeira escrita; antes disso não há vaga a liberar
+    if signer_pool.is_initialized:
+        signer_pool.observe_receipt(receipt)
+
+receipt_poller.add_listener(_release_signer_slot)
+
+def _build_log_decoder():
+    decoder = LogDecoder(async_w3.codec)
+    for name, contract in (
+        ("insurance", insurance_contract), ("oracle", oracle_contract), ("treasury", treasury_contract),
+        ("governance", governance_contract), ("token", token_contract), ("nft", nft_contract)
+    ):
+        decoder.register(name, contract.address, abi_registry[name])
+    return decoder
+
+# Decodificador de logs por (endereço, topic0) para todos os contratos da aplicação,
+# montado no primeiro uso junto com os ABIs
+log_decoder = LazyObject(_build_log_decoder)
+
+# ABI mínimo do Multicall3 (apenas aggregate3)
+MULTICALL3_ABI = [{
+    "type": "function",
+    "name": "aggregate3",
+    "stateMutability": "payable",
+    "inputs": [{
+        "name": "calls",
+        "type": "tuple[]",
+        "components": [
+            {"name": "target", "type": "address"},
+            {"name": "allowFailure", "type": "bool"},
+            {"name": "callData", "type": "bytes"}
+        ]
+    }],
+    "outputs": [{
+        "name": "returnData",
+        "type": "tuple[]",
+        "components": [
+            {"name": "success", "type": "bool"},
+            {"name": "returnData", "type": "bytes"}
+        ]
+    }]
+}]
+
+def is_rejected_by_node(error):
+    """
+    Verifica se uma falha de envio é uma recusa explícita do nó (resposta de erro JSON-RPC).
+
+    Nesse caso a transação certamente não foi aceita; timeouts e conexões perdidas são
+    ambíguos, pois o nó pode ter recebido a transação antes da falha.
+    """
+    if isinstance(error, json.JSONDecodeError):
+        return False
+    return isinstance(error, (ValueError, ContractLogicError)) or is_nonce_error(error)
+
+async def broadcast_transaction(contract_function, value=0, sender_address=None, private_key=None, on_signed=None,
+                                urgency="standard"):
     """
-    Envia uma transação para a blockchain.
+    Assina e transmite uma transação sem esperar pelo recibo.
+    
+    O nonce vem do nonce_manager, então várias transações do mesmo remetente podem ser
+    transmitidas em sequência. Se o nó rejeitar o nonce ("nonce too low", etc.), o contador
+    é realinhado e o envio é repetido até NONCE_RETRY_ATTEMPTS vezes. Sem remetente
+    informado, o signer_pool escolhe a chave (o admin para funções que exigem o owner).
     
     Args:
-        contract_function: A função do contrato a ser chamada
+        contract_function: A função do contrato (AsyncContract) a ser chamada
         value: O valor em wei a ser enviado com a transação (opcional)
-        sender_address: O endereço do remetente (opcional, padrão: admin_address)
-        private_key: A chave privada do remetente (opcional, padrão: admin_private_key)
+        sender_address: O endereço do remetente (opcional, padrão: escolhido pelo signer_pool)
+        private_key: A chave privada do remetente (opcional, padrão: a do remetente escolhido)
+        on_signed: Função chamada com (remetente, nonce, transação assinada) antes de cada envio (opcional)
+        urgency: Nível de taxa do fee_oracle: "economy", "standard" ou "urgent" (opcional)
     
     Returns:
-        O recibo da transação
+        O hash da transação
     """
+    lease = None
+    if sender_address is None:
+        lease = await signer_pool.acquire(contract_function.fn_name, value)
+        sender_address, private_key = lease.address, lease.private_key
+    elif private_key is None:
+        private_key = admin_account.key
+
+    logger.debug(f"Sending transaction with value: {value}")
+
     try:
-        if sender_address is None:
-            sender_address = admin_address
-        if private_key is None:
-            private_key = admin_private_key
+        for attempt in range(1, NONCE_RETRY_ATTEMPTS + 1):
+            gas_limit = await gas_estimator.gas_limit(contract_function, sender_address, value)
+            # Sem suporte a EIP-1559 na rede, a transação continua legada (gasPrice)
+            fees = await fee_oracle.fees(urgency) or {"gasPrice": await chain_params.gas_price()}
+            nonce = await nonce_manager.allocate(sender_address)
+            sent = False
+            try:
+                tx = await contract_function.build_transaction({
+                    "from": sender_address,
+                    "nonce": nonce,
+                    "gas": gas_limit,
+                    **fees,
+                    "chainId": await chain_params.chain_id(),
+                    "value": value
+                })
+                
+                signed_tx = async_w3.eth.account.sign_transaction(tx, private_key)
+                logger.debug(f"Signed transaction: {signed_tx}")
+                if on_signed is not None:
+                    on_signed(sender_address, nonce, signed_tx)
+                
+                sent = True
+                tx_hash = await async_w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                logger.debug(f"Transaction broadcast with nonce {nonce}: {tx_hash.hex()}")
+                if "maxFeePerGas" in fees:
+                    fee_oracle.track(tx_hash, urgency, fees)
+                if lease is not None:
+                    signer_pool.bind(lease, tx_hash)
+                return tx_hash
+            except Exception as e:
+                if is_nonce_error(e) and attempt < NONCE_RETRY_ATTEMPTS:
+                    logger.warning(f"Nonce {nonce} rejected for {sender_address} ({str(e)}), retrying")
+                    await nonce_manager.resync(sender_address)
+                    continue
+                if sent and not is_rejected_by_node(e):
+                    # A transação pode ter chegado ao nó: o nonce não é devolvido e o próximo
+                    # allocate consulta o nonce pendente no nó
+                    nonce_manager.reset(sender_address)
+                else:
+                    nonce_manager.release(sender_address, nonce)
+                raise
+    except BaseException:
+        if lease is not None:
+            # Nada foi transmitido: a vaga da chave volta ao pool
+            signer_pool.cancel(lease)
+        raise
 
-        logger.debug(f"Sending transaction with value: {value}")
-        
-        tx = contract_function.build_transaction({
-            "from": sender_address,
-            "nonce": w3.eth.get_transaction_count(sender_address),
-            "gas": 2000000,
-            "gasPrice": w3.eth.gas_price,
-            "chainId": w3.eth.chain_id,
-            "value": value
-        })
-        
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        logger.debug(f"Signed transaction: {signed_tx}")
+async def send_transaction(contract_function, value=0, sender_address=None, private_key=None, urgency="standard"):
+    """
+    Envia uma transação para a blockchain usando o cliente assíncrono.
+    
+    Args:
+        contract_function: A função do contrato (AsyncContract) a ser chamada
+        value: O valor em wei a ser enviado com a transação (opcional)
+        sender_address: O endereço do remetente (opcional, padrão: escolhido pelo signer_pool)
+        private_key: A chave privada do remetente (opcional)
+        urgency: Nível de taxa do fee_oracle (opcional, padrão: "standard")
+    
+    Returns:
+        O recibo da transação
+    """
+    try:
+        tx_hash = await broadcast_transaction(contract_function, value, sender_address, private_key, urgency=urgency)
+        try:
+            receipt = await receipt_poller.wait(tx_hash)
+        except TimeExhausted:
+            # A transação pode ter sido descartada do mempool; realinhar o nonce com o nó
+            await nonce_manager.resync(sender_address or signer_pool.sender_of(tx_hash) or admin_account.address)
+            raise
         
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        if receipt["status"] != 1:
+            # A estimativa em cache pode ter ficado curta; a próxima chamada volta a estimar
+            gas_estimator.invalidate(contract_function)
         
         logger.debug(f"Transaction successful: {tx_hash.hex()}")
         return receipt
@@ -45,22 +221,313 @@ def send_transaction(contract_function, value=0, sender_address=None, private_ke
         logger.error(f"Error in send_transaction: {str(e)}", exc_info=True)
         raise Exception(f"Transaction failed: {str(e)}")
 
-def send_transaction_with_args(contract, function_name, *args, value=0, sender_address=None, private_key=None):
+# Outbox durável das escritas com Idempotency-Key, aberto no primeiro uso
+transaction_outbox = LazyObject(lambda: TransactionOutbox(TX_OUTBOX_DB_PATH))
+_outbox_builders = {}
+_outbox_locks = {}
+_outbox_tasks = {}
+
+class IdempotencyConflict(Exception):
+    """A Idempotency-Key já foi usada com uma requisição diferente"""
+
+def register_outbox_operation(operation, result_builder):
+    """
+    Registra como montar o resultado de uma operação do outbox a partir do recibo.
+
+    O registro é por nome, e não por envio, para que o acompanhamento retomado após uma
+    reinicialização monte o mesmo resultado que a requisição original.
+
+    Args:
+        operation: Nome da operação (ex.: "createPolicy")
+        result_builder: Função (síncrona ou assíncrona) que recebe (recibo, params)
+    """
+    _outbox_builders[operation] = result_builder
+
+def _fingerprint(operation, params, value):
+    return hashlib.sha256(json.dumps([operation, params, value], sort_keys=True).encode()).hexdigest()
+
+async def send_idempotent(idempotency_key, operation, params, contract_function, value=0, wait=True):
+    """
+    Envia uma transação no máximo uma vez por Idempotency-Key.
+
+    Na primeira chamada a transação é assinada, gravada no outbox e transmitida; repetições
+    com a mesma chave devolvem o registro existente (aguardando o recibo se ainda estiver
+    em andamento) em vez de transmitir de novo. A chave só é liberada se o nó recusar a
+    transação; após uma falha ambígua a transação assinada é retransmitida, nunca substituída.
+
+    Args:
+        idempotency_key: Chave enviada pelo cliente
+        operation: Nome da operação registrada com register_outbox_operation
+        params: Parâmetros da requisição (JSON), usados para detectar reuso da chave e pelo result_builder
+        contract_function: A função do contrato a ser chamada
+        value: O valor em wei a ser enviado com a transação (opcional)
+        wait: Se True, aguarda o recibo antes de retornar
+
+    Returns:
+        O registro do outbox; com wait=True e a transação minerada, status "mined" ou "reverted" e o result
+
+    Raises:
+        IdempotencyConflict: Se a chave já foi usada com outra operação, parâmetros ou valor
+    """
+    fingerprint = _fingerprint(operation, params, value)
+    entry = _outbox_locks.setdefault(idempotency_key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            # O lock só vale dentro do processo: entre o get e o INSERT outro worker pode ter
+            # reservado a mesma chave, e então esta requisição segue como repetição
+            record = transaction_outbox.get(idempotency_key)
+            while record is None and not transaction_outbox.reserve(idempotency_key, operation, fingerprint, params):
+                record = transaction_outbox.get(idempotency_key)
+            if record is not None and record["fingerprint"] != fingerprint:
+                raise IdempotencyConflict(f"Idempotency-Key {idempotency_key} was already used with a different request")
+
+            just_broadcast = record is None
+            if record is None:
+                def on_signed(sender, nonce, signed_tx):
+                    transaction_outbox.mark_signed(
+                        idempotency_key, sender, nonce, Web3.to_hex(signed_tx.raw_transaction), Web3.to_hex(signed_tx.hash)
+                    )
+                try:
+                    await broadcast_transaction(contract_function, value, on_signed=on_signed)
+                except Exception as e:
+                    if transaction_outbox.get(idempotency_key)["status"] != "signed" or is_rejected_by_node(e):
+                        # Nada chegou ao nó: a chave fica livre para uma nova tentativa
+                        transaction_outbox.release(idempotency_key, rejected=True)
+                        raise
+                    # O nó pode ter aceitado a transação: ela fica gravada e o acompanhamento
+                    # retransmite a mesma transação assinada
+                    logger.warning(f"Ambiguous broadcast failure for Idempotency-Key {idempotency_key}: {str(e)}")
+                    just_broadcast = False
+                else:
+                    transaction_outbox.mark_broadcast(idempotency_key)
+            else:
+                logger.info(f"Idempotency-Key {idempotency_key} replayed ({record['status']})")
+            task = _track_outbox_entry(idempotency_key, contract_function, rebroadcast=not just_broadcast)
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _outbox_locks[idempotency_key]
+
+    if wait and task is not None:
+        await asyncio.shield(task)
+    return transaction_outbox.get(idempotency_key)
+
+def _track_outbox_entry(idempotency_key, contract_function=None, rebroadcast=True):
+    """Garante uma tarefa acompanhando o recibo de um registro em andamento"""
+    task = _outbox_tasks.get(idempotency_key)
+    if task is not None and not task.done():
+        return task
+    if transaction_outbox.get(idempotency_key)["status"] not in IN_FLIGHT_STATUSES:
+        return None
+    task = asyncio.create_task(_track_outbox(idempotency_key, contract_function, rebroadcast))
+    _outbox_tasks[idempotency_key] = task
+    task.add_done_callback(lambda _: _outbox_tasks.pop(idempotency_key, None))
+    return task
+
+async def _track_outbox(idempotency_key, contract_function, rebroadcast):
+    record = transaction_outbox.get(idempotency_key)
+    try:
+        if rebroadcast or record["status"] == "signed":
+            # Retransmite a mesma transação assinada; o nó recusa se já a conhece ou se já foi minerada
+            try:
+                await async_w3.eth.send_raw_transaction(record["raw_transaction"])
+            except Exception as e:
+                if not is_nonce_error(e):
+                    logger.warning(f"Rebroadcast of {record['transaction_hash']} failed: {str(e)}")
+            transaction_outbox.mark_broadcast(idempotency_key)
+
+        deadline = time.monotonic() + RECEIPT_TIMEOUT
+        while True:
+            try:
+                receipt = await receipt_poller.wait(
+                    record["transaction_hash"], timeout=min(TX_OUTBOX_CHECK_INTERVAL, max(deadline - time.monotonic(), 0))
+                )
+                break
+            except TimeExhausted:
+                if await _nonce_taken_without_receipt(record):
+                    error = (f"Transaction {record['transaction_hash']} was dropped: nonce {record['nonce']} "
+                             f"of {record['sender']} was used by another transaction")
+                    logger.warning(f"Outbox entry {idempotency_key}: {error}")
+                    transaction_outbox.fail(idempotency_key, error)
+                    return
+                if time.monotonic() >= deadline:
+                    raise
+
+        if receipt["status"] != 1 and contract_function is not None:
+            gas_estimator.invalidate(contract_function)
+
+        result = None
+        builder = _outbox_builders.get(record["operation"])
+        if builder is not None:
+            result = builder(receipt, record["params"])
+            if inspect.isawaitable(result):
+                result = await result
+        transaction_outbox.complete(
+            idempotency_key, "mined" if receipt["status"] == 1 else "reverted",
+            receipt["blockNumber"], receipt["gasUsed"], result
+        )
+    except TimeExhausted as e:
+        # Continua em andamento: a próxima repetição da chave retransmite e volta a acompanhar
+        transaction_outbox.mark_broadcast(idempotency_key, error=str(e))
+        await nonce_manager.resync(record["sender"])
+    except Exception as e:
+        logger.error(f"Error tracking outbox entry {idempotency_key}: {str(e)}", exc_info=True)
+        transaction_outbox.mark_broadcast(idempotency_key, error=str(e))
+
+async def _nonce_taken_without_receipt(record):
+    """A conta já usou o nonce da transação e ela não tem recibo: foi descartada ou substituída"""
+    if await async_w3.eth.get_transaction_count(record["sender"], "latest") <= record["nonce"]:
+        return False
+    try:
+        await async_w3.eth.get_transaction_receipt(record["transaction_hash"])
+        return False
+    except TransactionNotFound:
+        return True
+
+async def resume_outbox():
+    """
+    Retoma, na inicialização, as transações do outbox que ainda não têm recibo.
+
+    Returns:
+        Quantidade de transações retomadas
+    """
+    if not os.path.exists(TX_OUTBOX_DB_PATH):
+        return 0
+    abandoned = transaction_outbox.release_abandoned()
+    records = transaction_outbox.in_flight()
+    for record in records:
+        _track_outbox_entry(record["idempotency_key"])
+    if records or abandoned:
+        logger.info(f"Outbox: resumed {len(records)} in-flight transactions, released {abandoned} unsent keys")
+    return len(records)
+
+async def send_transaction_with_args(contract, function_name, *args, value=0, sender_address=None, private_key=None):
     """
     Versão alternativa que aceita o contrato, nome da função e argumentos separadamente.
     Útil para chamadas dinâmicas de funções.
     """
     try:
         function = getattr(contract.functions, function_name)(*args)
-        return send_transaction(function, value, sender_address, private_key)
+        return await send_transaction(function, value, sender_address, private_key)
     except Exception as e:
         logger.error(f"Error in send_transaction_with_args: {str(e)}", exc_info=True)
         raise Exception(f"Transaction with args failed: {str(e)}")
 
+def _decode_call_result(contract_function, data):
+    """Decodifica o retorno de uma chamada da mesma forma que ContractFunction.call()"""
+    output_types = get_abi_output_types(contract_function.abi)
+    decoded = async_w3.codec.decode(output_types, bytes(data))
+    normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+    return normalized[0] if len(normalized) == 1 else normalized
+
+async def _json_rpc_batch_call(contract_functions, block_identifier):
+    """Envia várias chamadas eth_call num único batch JSON-RPC"""
+    if isinstance(block_identifier, int):
+        block_identifier = hex(block_identifier)
+
+    payload = [
+        {
+            "jsonrpc": "2.0",
+            "id": i,
+            "method": "eth_call",
+            "params": [{"to": fn.address, "data": fn._encode_transaction_data()}, block_identifier]
+        }
+        for i, fn in enumerate(contract_functions)
+    ]
+
+    provider = async_w3.provider
+    raw_response = await async_make_post_request(
+        provider.endpoint_uri, json.dumps(payload).encode(), **provider.get_request_kwargs()
+    )
+    responses = {response.get("id"): response for response in json.loads(raw_response)}
+
+    results = []
+    for i, fn in enumerate(contract_functions):
+        response = responses.get(i, {})
+        if "result" not in response:
+            message = response.get("error", {}).get("message", "No response for call in batch")
+            results.append(ContractLogicError(f"{fn.fn_name} failed: {message}"))
+            continue
+        try:
+            results.append(_decode_call_result(fn, bytes.fromhex(response["result"][2:])))
+        except Exception as e:
+            results.append(e)
+    return results
+
+async def _multicall_batch_call(contract_functions, block_identifier):
+    """Agrega várias chamadas numa única chamada aggregate3 do Multicall3"""
+    multicall = async_w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+    calls = [(fn.address, True, fn._encode_transaction_data()) for fn in contract_functions]
+    responses = await multicall.functions.aggregate3(calls).call(block_identifier=block_identifier)
+
+    results = []
+    for fn, (success, data) in zip(contract_functions, responses):
+        if not success:
+            results.append(ContractLogicError(f"{fn.fn_name} reverted in multicall"))
+            continue
+        try:
+            results.append(_decode_call_result(fn, data))
+        except Exception as e:
+            results.append(e)
+    return results
+
+async def batch_call(contract_functions, block_identifier="latest"):
+    """
+    Executa várias chamadas de leitura (view) em poucas idas ao nó.
+    
+    Usa Multicall3 (aggregate3) quando MULTICALL3_ADDRESS está configurado; caso contrário
+    agrupa as chamadas num batch JSON-RPC. As chamadas são divididas em blocos de
+    BATCH_CALL_CHUNK_SIZE, enviados em paralelo.
+    
+    Args:
+        contract_functions: Lista de funções de contrato já com argumentos (ex.: fn(policy_id))
+        block_identifier: O bloco em que as chamadas são avaliadas (opcional, padrão: "latest")
+    
+    Returns:
+        Uma lista alinhada com a entrada; cada item é o valor decodificado ou a exceção
+        da chamada que falhou
+    """
+    contract_functions = list(contract_functions)
+    if not contract_functions:
+        return []
+
+    batch_fn = _multicall_batch_call if MULTICALL3_ADDRESS else _json_rpc_batch_call
+    chunks = [
+        contract_functions[i:i + BATCH_CALL_CHUNK_SIZE]
+        for i in range(0, len(contract_functions), BATCH_CALL_CHUNK_SIZE)
+    ]
+    try:
+        chunk_results = await asyncio.gather(*(batch_fn(chunk, block_identifier) for chunk in chunks))
+    except Exception as e:
+        logger.error(f"Error in batch_call: {str(e)}", exc_info=True)
+        raise Exception(f"Batch call failed: {str(e)}")
+
+    logger.debug(f"Batch call of {len(contract_functions)} functions in {len(chunks)} request(s)")
+    return [result for chunk in chunk_results for result in chunk]
+
+# O contrato numera as apólices a partir de 1 (++policyCounter); o ID 0 nunca existe
+FIRST_POLICY_ID = 1
+
+def policy_id_range(count):
+    """
+    IDs das `count` primeiras apólices.
+    
+    Args:
+        count: Total de apólices (getTotalPolicies / getSystemStats) ou limite da varredura
+    
+    Returns:
+        range com os IDs, na ordem de criação
+    """
+    return range(FIRST_POLICY_ID, FIRST_POLICY_ID + count)
+
 def get_event_data(contract, event_name, receipt):
     """
     Obtém dados de eventos de um recibo de transação.
     
+    Só são considerados os logs emitidos pelo endereço do contrato cujo topic0 é o do
+    evento pedido, decodificados pelo log_decoder.
+    
     Args:
         contract: O contrato que emite o evento
         event_name: O nome do evento a ser buscado
@@ -70,8 +537,10 @@ def get_event_data(contract, event_name, receipt):
         Uma lista de eventos processados
     """
     try:
-        event = getattr(contract.events, event_name)
-        events = event().process_receipt(receipt)
+        if log_decoder.contract_name(contract.address) is None:
+            # Contrato fora do registro: decodifica pelo próprio objeto do contrato
+            return getattr(contract.events, event_name)().process_receipt(receipt)
+        events = log_decoder.decode_receipt(receipt, contract.address, event_name)
         logger.debug(f"Events found: {events}")
         return events  # Retorna uma lista de eventos
     except Exception as e:
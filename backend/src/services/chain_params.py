@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from hexbytes import HexBytes
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+class ChainParameters:
+    """
+    Cache dos parâmetros da rede usados na montagem das transações.
+
+    O chain_id é consultado uma única vez; o gas price é reaproveitado até expirar o TTL
+    ou até que um novo bloco seja informado via on_new_block.
+    """
+
+    def __init__(self, w3, fee_ttl):
+        self.w3 = w3
+        self.fee_ttl = fee_ttl
+        self._chain_id = None
+        self._gas_price = None
+        self._gas_price_fetched_at = 0.0
+        self._gas_price_block = None
+        self._lock = asyncio.Lock()
+
+    async def chain_id(self):
+        if self._chain_id is None:
+            self._chain_id = await self.w3.eth.chain_id
+        return self._chain_id
+
+    async def gas_price(self):
+        async with self._lock:
+            if self._gas_price is None or time.monotonic() - self._gas_price_fetched_at > self.fee_ttl:
+                self._gas_price = await self.w3.eth.gas_price
+                self._gas_price_fetched_at = time.monotonic()
+            return self._gas_price
+
+    def on_new_block(self, block_number):
+        """Invalida os dados de taxa quando a rede avança para um novo bloco"""
+        if self._gas_price_block != block_number:
+            self._gas_price_block = block_number
+            self._gas_price = None
+
+class GasEstimator:
+    """
+    Cache de estimativas de gas por (endereço do contrato, seletor da função, tamanho do calldata).
+
+    A primeira chamada de cada função é estimada no nó; as seguintes com calldata do mesmo
+    tamanho reutilizam essa estimativa, acrescida da margem de segurança, até o TTL expirar.
+    O tamanho entra na chave porque argumentos dinâmicos (strings, arrays) mudam o custo:
+    uma estimativa feita com uma região curta não serve para uma lista longa de parâmetros.
+    """
+
+    def __init__(self, margin, ttl, default_gas):
+        self.margin = margin
+        self.ttl = ttl
+        self.default_gas = default_gas
+        self._estimates = {}
+
+    @staticmethod
+    def _key(contract_function):
+        calldata = contract_function._encode_transaction_data()
+        return (contract_function.address, contract_function.selector, len(calldata))
+
+    async def gas_limit(self, contract_function, sender_address, value=0):
+        """
+        Retorna o limite de gas para a chamada.
+
+        Se a estimativa falhar (ex.: a chamada reverteria), usa default_gas, mantendo o
+        comportamento anterior de transmitir a transação e deixar a rede decidir.
+        """
+        key = self._key(contract_function)
+        cached = self._estimates.get(key)
+        if cached is not None and time.monotonic() - cached[1] <= self.ttl:
+            return int(cached[0] * self.margin)
+
+        try:
+            estimate = await contract_function.estimate_gas({"from": sender_address, "value": value})
+        except Exception as e:
+            logger.warning(f"Gas estimation failed for {contract_function.fn_name}, using default: {str(e)}")
+            return self.default_gas
+
+        self._estimates[key] = (estimate, time.monotonic())
+        return int(estimate * self.margin)
+
+    def invalidate(self, contract_function):
+        """Descarta as estimativas de uma função, de qualquer tamanho (ex.: após uma transação revertida)"""
+        function = (contract_function.address, contract_function.selector)
+        for key in [key for key in self._estimates if key[:2] == function]:
+            del self._estimates[key]
+
+class FeeOracle:
+    """
+    Taxas EIP-1559 (maxFeePerGas / maxPriorityFeePerGas) por nível de urgência.
+
+    Um único eth_feeHistory por bloco alimenta todas as transações montadas naquele bloco:
+    o resultado é reaproveitado até on_new_block informar um bloco mais novo ou até o TTL
+    expirar. Cada nível usa um percentil das gorjetas dos últimos blocos e uma folga sobre a
+    base fee do próximo bloco. Em redes sem base fee, fees() devolve None e quem chama
+    continua usando gasPrice.
+    """
+
+    def __init__(self, w3, tiers, history_blocks, min_priority_fee, ttl, max_tracked=10000):
+        self.w3 = w3
+        self.tiers = tiers
+        self.history_blocks = history_blocks
+        self.min_priority_fee = min_priority_fee
+        self.ttl = ttl
+        self.max_tracked = max_tracked
+        self.percentiles = sorted({percentile for percentile, _ in tiers.values()})
+        self._cached = None
+        self._cached_block = None
+        self._fetched_at = 0.0
+        self._latest_block = None
+        self._lock = asyncio.Lock()
+        self._tracked = OrderedDict()
+        self.refreshes = 0
+        self.legacy = False
+        self._paid = {name: {"transactions": 0, "confirmed": 0, "maxFee": 0, "priorityFee": 0, "expected": 0, "paid": 0}
+                      for name in tiers}
+
+    def on_new_block(self, block_number):
+        """Registra o bloco mais recente; um bloco mais novo que o do cache força nova consulta"""
+        if self._latest_block is None or block_number > self._latest_block:
+            self._latest_block = block_number
+
+    def _is_fresh(self):
+        if self._cached_block is None or time.monotonic() - self._fetched_at > self.ttl:
+            return False
+        return self._latest_block is None or self._latest_block <= self._cached_block
+
+    async def _refresh(self):
+        self.refreshes += 1
+        self._fetched_at = time.monotonic()
+        try:
+            history = await self.w3.eth.fee_history(self.history_blocks, "latest", self.percentiles)
+        except Exception as e:
+            logger.warning(f"eth_feeHistory failed, using legacy gas price: {str(e)}")
+            self._cached_block = self._latest_block or 0
+            self._cached = None
+            self.legacy = True
+            return
+
+        base_fees = history.get("baseFeePerGas") or []
+        rewards = history.get("reward") or []
+        self._cached_block = history["oldestBlock"] + max(len(history["gasUsedRatio"]) - 1, 0)
+        self.legacy = not base_fees or not base_fees[-1]
+        if self.legacy:
+            self._cached = None
+            return
+
+        # O último item de baseFeePerGas é a base fee do próximo bloco
+        next_base_fee = base_fees[-1]
+        self._cached = {"baseFeePerGas": next_base_fee, "block": self._cached_block, "tiers": {}}
+        for name, (percentile, base_fee_multiplier) in self.tiers.items():
+            index = self.percentiles.index(percentile)
+            # Blocos vazios informam gorjeta 0 e não dizem nada sobre a disputa por espaço
+            tips = sorted(block_rewards[index] for block_rewards in rewards if block_rewards[index] > 0)
+            tip = max(tips[len(tips) // 2] if tips else 0, self.min_priority_fee)
+            self._cached["tiers"][name] = {
+                "maxFeePerGas": int(next_base_fee * base_fee_multiplier) + tip,
+                "maxPriorityFeePerGas": tip
+            }
+
+    async def fees(self, urgency="standard"):
+        """
+        Retorna os campos de taxa da transação para o nível de urgência.
+
+        Args:
+            urgency: Nome do nível (ex.: "economy", "standard", "urgent")
+
+        Returns:
+            {"maxFeePerGas", "maxPriorityFeePerGas"} ou None se a rede não suporta EIP-1559
+        """
+        if urgency not in self.tiers:
+            raise ValueError(f"Unknown fee urgency: {urgency}. Available: {', '.join(self.tiers)}")
+        async with self._lock:
+            if not self._is_fresh():
+                await self._refresh()
+            if self._cached is None:
+                return None
+            return dict(self._cached["tiers"][urgency])
+
+    def track(self, tx_hash, urgency, fees):
+        """Guarda as taxas de uma transação transmitida para comparar com o que ela pagou"""
+        self._paid[urgency]["transactions"] += 1
+        expected = min(fees["maxFeePerGas"], self._cached["baseFeePerGas"] + fees["maxPriorityFeePerGas"]) \
+            if self._cached else fees["maxFeePerGas"]
+        self._tracked[Web3.to_hex(HexBytes(tx_hash))] = (urgency, fees, expected)
+        while len(self._tracked) > self.max_tracked:
+            self._tracked.popitem(last=False)
+
+    def observe_receipt(self, receipt):
+        """Compara as taxas estimadas com a effectiveGasPrice do recibo (listener do ReceiptPoller)"""
+        tracked = self._tracked.pop(Web3.to_hex(HexBytes(receipt["transactionHash"])), None)
+        if tracked is None or receipt.get("effectiveGasPrice") is None:
+            return
+        urgency, fees, expected = tracked
+        totals = self._paid[urgency]
+        totals["confirmed"] += 1
+        totals["maxFee"] += fees["maxFeePerGas"]
+        totals["priorityFee"] += fees["maxPriorityFeePerGas"]
+        totals["expected"] += expected
+        totals["paid"] += receipt["effectiveGasPrice"]
+
+    def stats(self):
+        tiers = {}
+        for name, totals in self._paid.items():
+            confirmed = totals["confirmed"]
+            tiers[name] = {
+                "percentile": self.tiers[name][0],
+                "baseFeeMultiplier": self.tiers[name][1],
+                "current": (self._cached or {}).get("tiers", {}).get(name),
+                "transactions": totals["transactions"],
+                "confirmed": confirmed,
+                "avgMaxFeePerGas": totals["maxFee"] // confirmed if confirmed else None,
+                "avgExpectedGasPrice": totals["expected"] // confirmed if confirmed else None,
+                "avgEffectiveGasPrice": totals["paid"] // confirmed if confirmed else None,
+                "paidToMaxFeeRatio": round(totals["paid"] / totals["maxFee"], 4) if confirmed else None,
+                "paidToExpectedRatio": round(totals["paid"] / totals["expected"], 4) if confirmed else None
+            }
+        return {
+            "legacy": self.legacy,
+            "block": self._cached_block,
+            "baseFeePerGas": (self._cached or {}).get("baseFeePerGas"),
+            "refreshes": self.refreshes,
+            "tiers": tiers
+        }
@@ -0,0 +1,385 @@
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from ..utils.config import CLAIM_EVALUATION_INTERVAL, BATCH_CALL_CHUNK_SIZE, abi_registry
+from ..utils.startup import StartupTimer
+from .blockchain import batch_call, insurance_contract, policy_id_range, FIRST_POLICY_ID
+from .indexer import get_indexed_store
+from .openweather import (
+    PARAMETER_MAPPINGS, OpenWeatherError, get_weather_snapshot, windowed_value, weather_quota,
+    update_region_priorities, retain_rolling_windows, WEATHER_BULK_CONCURRENCY
+)
+from .weather_cache import normalize_region
+
+logger = logging.getLogger(__name__)
+
+# Limiares são uint256 no contrato; acima disto nenhuma leitura convertida os ultrapassa
+INT64_MAX = np.iinfo(np.int64).max
+
+class ClaimRuleTable:
+    """
+    Regras de acionamento de todas as apólices elegíveis, em arrays NumPy alinhados.
+
+    Cada linha é um parâmetro climático de uma apólice. As linhas apontam para um grupo
+    (região normalizada, tipo de parâmetro, periodInDays), que recebe um único valor: a
+    leitura atual ou o agregado da janela do período. Como o
+    contrato usa o primeiro parâmetro de cada tipo, os tipos repetidos de uma apólice são
+    ignorados. Apólices inativas, fora da vigência ou com a cobertura esgotada ficam de fora.
+    """
+
+    def __init__(self, policies, now=None):
+        """
+        Args:
+            policies: Pares (policy, parameters) como retornados por getPolicyDetails
+            now: Horário de referência para a vigência (opcional, padrão: agora)
+        """
+        now = int(time.time()) if now is None else now
+        self.policy_ids = []
+        self.coverage = []
+        self.claim_paid = []
+        self.groups = []
+        self.regions = {}
+        self.skipped_rules = 0
+        group_index = {}
+        rule_policy, rule_group, threshold, trigger_above, payout_percentage = [], [], [], [], []
+
+        for policy, parameters in policies:
+            # policy: (id, farmer, coverageAmount, premium, startDate, endDate, active, claimed, claimPaid, ...)
+            if not policy[6] or not policy[4] <= now <= policy[5] or policy[8] >= policy[2]:
+                continue
+            region_key = normalize_region(policy[11])
+            policy_index = len(self.policy_ids)
+            seen_types = set()
+            for param in parameters:
+                parameter_type = param[0]
+                if parameter_type in seen_types:
+                    continue
+                seen_types.add(parameter_type)
+                if parameter_type not in PARAMETER_MAPPINGS:
+                    self.skipped_rules += 1
+                    continue
+                key = (region_key, parameter_type, param[2])
+                if key not in group_index:
+                    group_index[key] = len(self.groups)
+                    self.groups.append(key)
+                    self.regions.setdefault(region_key, policy[11])
+                rule_policy.append(policy_index)
+                rule_group.append(group_index[key])
+                threshold.append(min(param[1], INT64_MAX))
+                trigger_above.append(param[3])
+                payout_percentage.append(min(param[4], INT64_MAX))
+            self.policy_ids.append(policy[0])
+            self.coverage.append(policy[2])
+            self.claim_paid.append(policy[8])
+
+        self._region_index = {region_key: i for i, region_key in enumerate(self.regions)}
+        self.rule_policy = np.array(rule_policy, dtype=np.int64)
+        self.rule_group = np.array(rule_group, dtype=np.int64)
+        self.threshold = np.array(threshold, dtype=np.int64)
+        self.trigger_above = np.array(trigger_above, dtype=bool)
+        self.payout_percentage = np.array(payout_percentage, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.rule_policy)
+
+    def window_groups(self):
+        """Trios (região, tipo de parâmetro, periodInDays) dos grupos lidos numa janela móvel"""
+        return [(self.regions[region_key], parameter_type, period_days)
+                for region_key, parameter_type, period_days in self.groups if period_days]
+
+    def group_values(self, snapshots, window_reader=None, now=None):
+        """
+        Monta os arrays de leitura por grupo a partir dos snapshots de clima por região.
+
+        Args:
+            snapshots: Dicionário região normalizada -> snapshot (ou None se a consulta falhou)
+            window_reader: Função (região, parâmetro, dias, now) -> (valor, agregados) que lê a
+                janela móvel dos grupos com periodInDays; sem ela vale a leitura atual, e um
+                grupo cuja janela é parcial (agregados com partial) fica sem leitura
+            now: Horário de referência das janelas (opcional, padrão: agora)
+
+        Returns:
+            (values, valid): leituras convertidas e a máscara dos grupos com leitura disponível
+        """
+        values = np.zeros(len(self.groups), dtype=np.int64)
+        valid = np.zeros(len(self.groups), dtype=bool)
+        for i, (region_key, parameter_type, period_days) in enumerate(self.groups):
+            snapshot = snapshots.get(region_key)
+            value = snapshot["values"].get(parameter_type) if snapshot else None
+            if value is not None and period_days and window_reader is not None:
+                windowed, stats = window_reader(self.regions[region_key], parameter_type, period_days, now)
+                if windowed is not None:
+                    value = windowed
+                elif stats.get("partial"):
+                    # Poucas leituras no período: a leitura atual não substitui o agregado
+                    value = None
+            if value is not None:
+                values[i] = value
+                valid[i] = True
+        return values, valid
+
+    def region_margins(self, values, valid):
+        """
+        Distância relativa entre o valor de cada regra e o seu limiar, mínima por região.
+
+        Returns:
+            Dicionário região normalizada -> |valor - limiar| / limiar da regra mais perto de disparar
+        """
+        if len(self) == 0:
+            return {}
+        group_region = np.array([self._region_index[group[0]] for group in self.groups], dtype=np.int64)
+        rule_valid = valid[self.rule_group]
+        margins = np.abs(values[self.rule_group] - self.threshold) / np.maximum(self.threshold, 1)
+        closest = np.full(len(self._region_index), np.inf)
+        np.minimum.at(closest, group_region[self.rule_group][rule_valid], margins[rule_valid])
+        return {
+            region_key: float(closest[index])
+            for region_key, index in self._region_index.items() if np.isfinite(closest[index])
+        }
+
+    def evaluate(self, values, valid):
+        """
+        Avalia todas as regras numa única passada vetorizada.
+
+        Segue processClaim: acima do limiar quando triggerAbove, abaixo caso contrário; o
+        pagamento é coverageAmount * payoutPercentage / 10000, limitado à cobertura restante.
+        Quando vários parâmetros de uma apólice disparam, vale o de maior percentual.
+
+        Args:
+            values: Leitura convertida de cada grupo
+            valid: Máscara dos grupos com leitura disponível
+
+        Returns:
+            Lista de dicionários com a apólice acionada, o pagamento e a regra que disparou
+        """
+        current = values[self.rule_group]
+        triggered = valid[self.rule_group] & np.where(
+            self.trigger_above, current > self.threshold, current < self.threshold
+        )
+        rules = np.flatnonzero(triggered & (self.payout_percentage > 0))
+        if rules.size == 0:
+            return []
+
+        # Ordena por apólice e percentual decrescente; a primeira regra de cada apólice vence
+        order = np.lexsort((-self.payout_percentage[rules], self.rule_policy[rules]))
+        rules = rules[order]
+        _, first = np.unique(self.rule_policy[rules], return_index=True)
+        rules = rules[first]
+
+        claims = []
+        for rule in rules.tolist():
+            policy_index = int(self.rule_policy[rule])
+            coverage = self.coverage[policy_index]
+            percentage = int(self.payout_percentage[rule])
+            payout = min(coverage * percentage // 10000, coverage - self.claim_paid[policy_index])
+            if payout <= 0:
+                continue
+            region_key, parameter_type, period_days = self.groups[self.rule_group[rule]]
+            claims.append({
+                "policyId": self.policy_ids[policy_index],
+                "payoutAmount": payout,
+                "region": self.regions[region_key],
+                "parameterType": parameter_type,
+                "periodInDays": period_days,
+                "evaluatedValue": int(current[rule]),
+                "threshold": int(self.threshold[rule]),
+                "triggerAbove": bool(self.trigger_above[rule]),
+                "payoutPercentage": percentage / 100.0
+            })
+        return claims
+
+async def load_active_policies():
+    """
+    Lê getPolicyDetails das apólices candidatas em lote.
+
+    Com o indexador sincronizado lê só as apólices ativas do store; caso contrário lê
+    todas as apólices de 1 até o contador do contrato (getSystemStats ou getTotalPolicies)
+    ou, sem contador no ABI, até o primeiro ID inexistente.
+
+    Returns:
+        Lista de pares (policy, parameters); apólices cuja leitura falhou são ignoradas
+    """
+    store = get_indexed_store()
+    capabilities = abi_registry["insurance"]
+    if store is not None:
+        policy_ids = store.get_active_policy_ids()
+    elif capabilities.has_function("getSystemStats"):
+        policy_ids = policy_id_range((await insurance_contract.functions.getSystemStats().call())[0])
+    elif capabilities.has_function("getTotalPolicies"):
+        policy_ids = policy_id_range(await insurance_contract.functions.getTotalPolicies().call())
+    else:
+        return await _scan_policies()
+
+    results = await batch_call(insurance_contract.functions.getPolicyDetails(policy_id) for policy_id in policy_ids)
+    failed = sum(1 for result in results if isinstance(result, Exception))
+    if failed:
+        logger.warning(f"Claim evaluation: could not read {failed} of {len(results)} policies")
+    return [result for result in results if not isinstance(result, Exception)]
+
+async def _scan_policies():
+    """Sem contador no ABI: lê os IDs sequenciais em blocos até a primeira apólice inexistente"""
+    policies = []
+    next_id = FIRST_POLICY_ID
+    while True:
+        policy_ids = range(next_id, next_id + BATCH_CALL_CHUNK_SIZE)
+        results = await batch_call(insurance_contract.functions.getPolicyDetails(policy_id) for policy_id in policy_ids)
+        for result in results:
+            if isinstance(result, Exception):
+                return policies
+            policies.append(result)
+        next_id += BATCH_CALL_CHUNK_SIZE
+
+async def fetch_region_snapshots(regions, concurrency=WEATHER_BULK_CONCURRENCY):
+    """
+    Consulta o clima de cada região uma única vez, com concorrência limitada. As regiões mais
+    perto de disparar um sinistro são consultadas primeiro, para que cheguem antes à cota.
+
+    Args:
+        regions: Dicionário região normalizada -> nome da região como está na apólice
+
+    Returns:
+        (snapshots, errors): snapshot por região normalizada (None se falhou) e os erros por região
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = {}
+
+    async def fetch(region_key, region):
+        try:
+            async with semaphore:
+                return region_key, await get_weather_snapshot(region)
+        except (OpenWeatherError, ValueError) as e:
+            errors[region] = str(e)
+            return region_key, None
+
+    ordered = sorted(regions.items(), key=lambda item: weather_quota.priority(item[0]))
+    results = await asyncio.gather(*(fetch(key, region) for key, region in ordered))
+    return dict(results), errors
+
+class ClaimEvaluationJob:
+    """
+    Avaliação periódica de sinistros de toda a carteira de apólices.
+
+    Cada execução lê as apólices ativas, agrupa as regras por região e tipo de parâmetro,
+    consulta o clima uma vez por região e avalia todas as regras numa passada NumPy. Os
+    sinistros acionados são entregues aos listeners registrados; o tempo de cada etapa
+    fica no relatório.
+    """
+
+    def __init__(self, interval=0.0, policy_loader=load_active_policies, weather_loader=fetch_region_snapshots,
+                 window_reader=windowed_value, priority_sink=update_region_priorities,
+                 window_sink=retain_rolling_windows):
+        self.interval = interval
+        self.policy_loader = policy_loader
+        self.weather_loader = weather_loader
+        self.window_reader = window_reader
+        self.priority_sink = priority_sink
+        self.window_sink = window_sink
+        self.last_report = None
+        self.runs = 0
+        self.failures = 0
+        self.claims_triggered = 0
+        self._listeners = []
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    def add_listener(self, listener):
+        """Registra uma função chamada com a lista de sinistros acionados de cada execução"""
+        self._listeners.append(listener)
+
+    async def run_once(self):
+        """
+        Executa uma avaliação completa; execuções simultâneas aguardam a que está em andamento.
+
+        Returns:
+            O relatório com os sinistros acionados e o tempo de cada etapa
+        """
+        async with self._lock:
+            timer = StartupTimer()
+            started_at = time.time()
+
+            with timer.stage("loadPolicies"):
+                policies = await self.policy_loader()
+            with timer.stage("buildRules"):
+                table = ClaimRuleTable(policies, now=int(started_at))
+                if self.window_reader is not None and self.window_sink is not None:
+                    # Janelas de apólices encerradas ou de consultas avulsas deixam de ser mantidas
+                    self.window_sink(table.window_groups())
+            with timer.stage("fetchWeather"):
+                snapshots, region_errors = await self.weather_loader(table.regions)
+            with timer.stage("evaluate"):
+                values, valid = table.group_values(snapshots, self.window_reader, int(started_at))
+                claims = table.evaluate(values, valid)
+                if self.priority_sink is not None:
+                    self.priority_sink(table.region_margins(values, valid))
+
+            report = {
+                "startedAt": int(started_at),
+                "policies": len(policies),
+                "eligiblePolicies": len(table.policy_ids),
+                "rules": len(table),
+                "skippedRules": table.skipped_rules,
+                "regions": len(table.regions),
+                "regionErrors": region_errors,
+                "triggered": claims,
+                "stagesMs": timer.summary()["stagesMs"],
+                "totalMs": round((time.perf_counter() - timer.started_at) * 1000, 2)
+            }
+            self.runs += 1
+            self.claims_triggered += len(claims)
+            self.last_report = report
+            logger.info(
+                f"Claim evaluation: {len(claims)} claims triggered across {report['eligiblePolicies']} policies "
+                f"and {report['regions']} regions in {report['totalMs']}ms ({report['stagesMs']})"
+            )
+
+        for listener in self._listeners:
+            try:
+                result = listener(claims)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error in claim evaluation listener: {str(e)}", exc_info=True)
+        return report
+
+    async def run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Error in claim evaluation: {str(e)}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        last = self.last_report or {}
+        return {
+            "interval": self.interval,
+            "scheduled": self._task is not None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "claimsTriggered": self.claims_triggered,
+            "lastRunAt": last.get("startedAt"),
+            "lastStagesMs": last.get("stagesMs")
+        }
+
+# Avaliação compartilhada; só roda periodicamente quando CLAIM_EVALUATION_INTERVAL > 0
+claim_evaluation_job = ClaimEvaluationJob(CLAIM_EVALUATION_INTERVAL)
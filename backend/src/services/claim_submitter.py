@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from web3.exceptions import TimeExhausted
+from ..utils.config import admin_account, CLAIM_SUBMIT_WINDOW, CLAIM_RECEIPT_TIMEOUT
+from .blockchain import broadcast_transaction, nonce_manager, gas_estimator, insurance_contract
+from .receipt_poller import receipt_poller
+
+logger = logging.getLogger(__name__)
+
+# Campos de IAgroChainInsurance.ClimateData, na ordem do struct
+CLIMATE_DATA_FIELDS = ("requestId", "parameterType", "measuredValue", "timestamp", "dataSource", "signature")
+
+def climate_data_tuple(climate_data):
+    """Converte um dicionário com os campos de ClimateData na tupla passada ao contrato"""
+    return tuple(climate_data[field] for field in CLIMATE_DATA_FIELDS)
+
+def _process_claim(policy_id, climate_data):
+    return insurance_contract.functions.processClaim(policy_id, climate_data_tuple(climate_data))
+
+async def _wait_for_receipt(tx_hash):
+    return await receipt_poller.wait(tx_hash, timeout=CLAIM_RECEIPT_TIMEOUT)
+
+class ClaimBatchSubmitter:
+    """
+    Paga vários sinistros sem esperar o recibo de um para transmitir o próximo.
+
+    As transações processClaim são transmitidas em sequência (o nonce_manager entrega nonces
+    consecutivos) e os recibos são acompanhados em paralelo. No máximo window transações ficam
+    aguardando recibo ao mesmo tempo; a próxima só é transmitida quando uma delas confirma.
+    Sinistros pagam a taxa do nível urgency do fee_oracle ("urgent" por padrão).
+
+    processClaim(uint256, ClimateData) é onlyOracle: no contrato, só o oráculo configurado
+    na apólice consegue chamá-lo, com o requestId de uma requisição de requestClimateData.
+    O broadcaster precisa, portanto, transmitir como o oráculo; as chaves do backend
+    (admin e pool) são recusadas pelo contrato.
+    """
+
+    def __init__(self, window=CLAIM_SUBMIT_WINDOW, claim_function=_process_claim,
+                 broadcaster=broadcast_transaction, receipt_waiter=_wait_for_receipt, urgency="urgent"):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.claim_function = claim_function
+        self.broadcaster = broadcaster
+        self.receipt_waiter = receipt_waiter
+        self.urgency = urgency
+        self.last_report = None
+        self.batches = 0
+        self.claims_submitted = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+
+    async def submit(self, claims):
+        """
+        Transmite processClaim para cada sinistro e aguarda os recibos.
+
+        Args:
+            claims: Lista de (policy_id, payout_amount, climate_data), na ordem de transmissão;
+                climate_data tem os campos de CLIMATE_DATA_FIELDS e payout_amount é o valor
+                esperado, usado só no relatório (o contrato calcula o pagamento)
+
+        Returns:
+            Relatório com os totais por status e o resultado de cada apólice, na ordem de claims
+        """
+        results = [
+            {
+                "policyId": int(policy_id),
+                "payoutAmount": int(payout_amount),
+                "status": "queued",
+                "transactionHash": None,
+                "blockNumber": None,
+                "gasUsed": None,
+                "error": None
+            }
+            for policy_id, payout_amount, _ in claims
+        ]
+        start = time.perf_counter()
+        slots = asyncio.Semaphore(self.window)
+        trackers = []
+
+        for result, (_, _, climate_data) in zip(results, claims):
+            await slots.acquire()
+            contract_function = self.claim_function(result["policyId"], climate_data)
+            try:
+                tx_hash = await self.broadcaster(contract_function, urgency=self.urgency)
+            except Exception as e:
+                logger.error(f"Error broadcasting claim for policy {result['policyId']}: {str(e)}")
+                result["status"] = "failed"
+                result["error"] = str(e)
+                slots.release()
+                continue
+            result["status"] = "pending"
+            result["transactionHash"] = tx_hash.hex()
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            trackers.append(asyncio.create_task(self._track(result, tx_hash, contract_function, slots)))
+
+        await asyncio.gather(*trackers)
+        if any(result["status"] == "timeout" for result in results):
+            # Transações podem ter sido descartadas do mempool; realinhar o nonce com o nó
+            await nonce_manager.resync(admin_account.address)
+
+        counts = {status: 0 for status in ("mined", "reverted", "failed", "timeout")}
+        for result in results:
+            counts[result["status"]] += 1
+        report = {
+            "claims": len(results),
+            **counts,
+            "window": self.window,
+            "totalPayout": sum(result["payoutAmount"] for result in results if result["status"] == "mined"),
+            "elapsedMs": round((time.perf_counter() - start) * 1000, 2),
+            "results": results
+        }
+        self.batches += 1
+        self.claims_submitted += len(results)
+        self.last_report = report
+        logger.info(
+            f"Claim batch: {counts['mined']}/{len(results)} mined, {counts['reverted']} reverted, "
+            f"{counts['failed']} failed, {counts['timeout']} timed out in {report['elapsedMs']}ms"
+        )
+        return report
+
+    async def _track(self, result, tx_hash, contract_function, slots):
+        try:
+            receipt = await self.receipt_waiter(tx_hash)
+            result["blockNumber"] = receipt["blockNumber"]
+            result["gasUsed"] = receipt["gasUsed"]
+            if receipt["status"] == 1:
+                result["status"] = "mined"
+            else:
+                gas_estimator.invalidate(contract_function)
+                result["status"] = "reverted"
+        except TimeExhausted as e:
+            result["status"] = "timeout"
+            result["error"] = str(e)
+        except Exception as e:
+            logger.error(f"Error tracking claim for policy {result['policyId']}: {str(e)}")
+            result["status"] = "failed"
+            result["error"] = str(e)
+        finally:
+            self._in_flight -= 1
+            slots.release()
+
+    def stats(self):
+        last = self.last_report or {}
+        return {
+            "window": self.window,
+            "inFlight": self._in_flight,
+            "maxInFlight": self.max_in_flight,
+            "batches": self.batches,
+            "claimsSubmitted": self.claims_submitted,
+            "lastBatch": {key: last[key] for key in ("claims", "mined", "reverted", "failed", "timeout", "elapsedMs")}
+            if last else None
+        }
+
+# Instância compartilhada usada pelas rotas
+claim_submitter = ClaimBatchSubmitter()
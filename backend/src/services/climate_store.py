@@ -0,0 +1,203 @@
+import bisect
+import logging
+import os
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from .weather_cache import normalize_region
+
+logger = logging.getLogger(__name__)
+
+# Cada observação ocupa 16 bytes: horário (dt da OpenWeather) e valor convertido
+RECORD_DTYPE = np.dtype([("t", "<i8"), ("v", "<i8")])
+SERIES_SUFFIX = ".ts"
+
+class ClimateSeries:
+    """
+    Série de observações de uma (região, parâmetro) num arquivo só de acréscimos.
+
+    As leituras usam um mapeamento em memória (np.memmap) do arquivo, refeito apenas quando
+    ele cresce; como os horários são crescentes, um intervalo é localizado por busca binária
+    e só as páginas desse trecho são lidas do disco.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self._repair()
+
+    def _repair(self):
+        # Uma gravação interrompida pode deixar um registro incompleto no fim do arquivo
+        if os.path.exists(self.path):
+            size = os.path.getsize(self.path)
+            if size % RECORD_DTYPE.itemsize:
+                logger.warning(f"Truncating partial record at the end of {self.path}")
+                os.truncate(self.path, size - size % RECORD_DTYPE.itemsize)
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self.path) // RECORD_DTYPE.itemsize
+        except FileNotFoundError:
+            return 0
+
+    def records(self):
+        """Retorna todos os registros como um array mapeado do arquivo (somente leitura)"""
+        count = len(self)
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        if self._map is None or len(self._map) != count:
+            self._map = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+        return self._map
+
+    def last_timestamp(self):
+        count = len(self)
+        if count == 0:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek((count - 1) * RECORD_DTYPE.itemsize)
+            return int(np.frombuffer(f.read(RECORD_DTYPE.itemsize), dtype=RECORD_DTYPE)["t"][0])
+
+    def append(self, timestamps, values):
+        """
+        Acrescenta observações em ordem crescente de horário.
+
+        Observações com horário igual ou anterior ao último gravado são descartadas, então
+        reler o mesmo snapshot (a OpenWeather repete o dt até a próxima atualização) não
+        duplica a série.
+
+        Returns:
+            O número de observações gravadas
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+        last = self.last_timestamp()
+        if last is not None:
+            keep = timestamps > last
+            timestamps, values = timestamps[keep], values[keep]
+        if timestamps.size == 0:
+            return 0
+        if timestamps.size > 1 and np.any(np.diff(timestamps) <= 0):
+            raise ValueError("Observations must be appended in strictly increasing time order")
+
+        records = np.empty(timestamps.size, dtype=RECORD_DTYPE)
+        records["t"] = timestamps
+        records["v"] = values
+        # O_APPEND com uma única escrita: workers concorrentes não intercalam registros
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, records.tobytes())
+        finally:
+            os.close(fd)
+        return int(timestamps.size)
+
+    def window(self, start=None, end=None):
+        """Retorna a fatia mapeada dos registros com start <= t <= end"""
+        records = self.records()
+        # bisect lê só ~log2(n) registros; np.searchsorted copiaria a coluna "t" inteira,
+        # que não é contígua no array estruturado
+        timestamps = records["t"]
+        lo = 0 if start is None else bisect.bisect_left(timestamps, start)
+        hi = len(records) if end is None else bisect.bisect_right(timestamps, end)
+        return records[lo:hi]
+
+class ClimateSeriesStore:
+    """
+    Histórico local das observações de clima, um arquivo por (região normalizada, parâmetro).
+
+    Sobrevive a reinicializações: o estado é só o conteúdo dos arquivos. Cinco anos de dados
+    horários ocupam cerca de 700 KB por série.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._series = {}
+        self.appended = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _series_for(self, region, parameter_type):
+        key = (normalize_region(region), parameter_type)
+        series = self._series.get(key)
+        if series is None:
+            filename = f"{quote(key[0], safe='')}.{parameter_type}{SERIES_SUFFIX}"
+            series = ClimateSeries(os.path.join(self.root, filename))
+            self._series[key] = series
+        return series
+
+    def append(self, region, parameter_type, timestamp, value):
+        """Grava uma observação; retorna False se ela já estava na série"""
+        return self.append_many(region, parameter_type, [timestamp], [value]) > 0
+
+    def append_many(self, region, parameter_type, timestamps, values):
+        """Grava várias observações em ordem crescente de horário; retorna quantas foram gravadas"""
+        appended = self._series_for(region, parameter_type).append(timestamps, values)
+        self.appended += appended
+        return appended
+
+    def record_snapshot(self, snapshot):
+        """
+        Grava todos os parâmetros disponíveis de um snapshot de clima no horário dt.
+
+        Returns:
+            O número de observações gravadas
+        """
+        if not isinstance(snapshot.get("dt"), (int, float)):
+            return 0
+        appended = 0
+        for parameter_type, value in snapshot["values"].items():
+            if value is not None:
+                appended += self.append(snapshot["region"], parameter_type, int(snapshot["dt"]), value)
+        return appended
+
+    def query(self, region, parameter_type, start=None, end=None):
+        """
+        Retorna as observações com start <= t <= end.
+
+        Returns:
+            (timestamps, values): cópias em arrays int64
+        """
+        records = self._series_for(region, parameter_type).window(start, end)
+        return np.array(records["t"]), np.array(records["v"])
+
+    def aggregate(self, region, parameter_type, start=None, end=None):
+        """
+        Soma, mínimo, máximo e média das observações com start <= t <= end.
+
+        Returns:
+            Um dicionário com count, sum, min, max, mean e o horário da primeira e da última
+            observação; sem observações no intervalo, count é 0 e os demais valores são None
+        """
+        values = self._series_for(region, parameter_type).window(start, end)
+        if len(values) == 0:
+            return {"count": 0, "sum": None, "min": None, "max": None, "mean": None, "first": None, "last": None}
+        column = values["v"]
+        total = int(column.sum())
+        return {
+            "count": len(values),
+            "sum": total,
+            "min": int(column.min()),
+            "max": int(column.max()),
+            "mean": total / len(values),
+            "first": int(values["t"][0]),
+            "last": int(values["t"][-1])
+        }
+
+    def series_keys(self):
+        """Lista as (região normalizada, parâmetro) gravadas em disco"""
+        keys = []
+        for filename in os.listdir(self.root):
+            if filename.endswith(SERIES_SUFFIX):
+                region, _, parameter_type = filename[:-len(SERIES_SUFFIX)].rpartition(".")
+                keys.append((unquote(region), parameter_type))
+        return sorted(keys)
+
+    def stats(self):
+        files = [os.path.join(self.root, f) for f in os.listdir(self.root) if f.endswith(SERIES_SUFFIX)]
+        size = sum(os.path.getsize(path) for path in files)
+        return {
+            "root": self.root,
+            "series": len(files),
+            "observations": size // RECORD_DTYPE.itemsize,
+            "bytes": size,
+            "appended": self.appended
+        }
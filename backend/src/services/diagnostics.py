@@ -4,6 +4,7 @@ from web3 import Web3
 
 # Importar configurações do seu projeto
 from ..utils.config import w3, insurance_contract, oracle_contract, treasury_contract, governance_contract, token_contract, nft_contract
+from .blockchain import log_decoder
 
 def diagnose_contracts():
     """Função para diagnóstico dos contratos e seus ABIs"""
@@ -56,31 +57,16 @@ def analyze_transaction_receipt(receipt):
             print(f"  Tópicos: {[t.hex() for t in log.get('topics', [])]}")
             print(f"  Dados: {log.get('data')}")
             
-            # Tentar decodificar eventos conhecidos
-            try:
-                # Tentar cada contrato para ver se algum pode decodificar esse log
-                for name, contract in {
-                    "insurance": insurance_contract,
-                    "oracle": oracle_contract,
-                    "treasury": treasury_contract,
-                    "governance": governance_contract,
-                    "token": token_contract,
-                    "nft": nft_contract
-                }.items():
-                    if log.get('address').lower() == contract.address.lower():
-                        print(f"  Log é do contrato: {name}")
-                        # Tentar decodificar com cada evento do contrato
-                        for event_name in [e for e in dir(contract.events) if not e.startswith('_')]:
-                            try:
-                                event = getattr(contract.events, event_name)
-                                decoded = event().process_log(log)
-                                print(f"  Decodificado como evento {event_name}:")
-                                print(f"  Argumentos: {decoded['args']}")
-                                break
-                            except Exception:
-                                continue
-            except Exception as e:
-                print(f"  Erro ao tentar decodificar: {str(e)}")
+            # Decodificar pelo par (endereço, topic0) registrado no log_decoder
+            contract_name = log_decoder.contract_name(log.get('address'))
+            if contract_name is not None:
+                print(f"  Log é do contrato: {contract_name}")
+            decoded = log_decoder.decode_log(log)
+            if decoded is not None:
+                print(f"  Decodificado como evento {decoded['event']}:")
+                print(f"  Argumentos: {decoded['args']}")
+            else:
+                print("  Evento não reconhecido")
 
 def list_contract_abi(contract_name):
     """Lista o ABI completo de um contrato para debug"""
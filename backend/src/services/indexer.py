@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import time
+
+from eth_utils import event_abi_to_log_topic
+
+from ..utils.config import (
+    async_w3, INDEXER_ENABLED, INDEXER_DB_PATH, INDEXER_START_BLOCK, INDEXER_BLOCK_CHUNK,
+    INDEXER_CONFIRMATIONS, INDEXER_POLL_INTERVAL, INDEXER_MAX_LAG, INDEXER_STALE_POLLS
+)
+from ..utils.lazy import LazyObject
+from .blockchain import batch_call, insurance_contract, treasury_contract
+from .policy_store import PolicyStore
+
+logger = logging.getLogger(__name__)
+
+# Eventos acompanhados por contrato
+INSURANCE_EVENTS = ("PolicyCreated", "PolicyActivated", "ClaimTriggered", "PolicyCancelled", "PolicyExpired")
+TREASURY_EVENTS = ("PremiumDeposited", "ClaimPaid", "RefundProcessed")
+
+class EventIndexer:
+    """
+    Acompanha os eventos dos contratos em segundo plano e os grava no PolicyStore.
+
+    A cada ciclo busca os logs do intervalo [checkpoint + 1, head - confirmations] com uma
+    única chamada eth_getLogs por bloco de INDEXER_BLOCK_CHUNK blocos, completa as apólices
+    recém-criadas com uma leitura em lote de getPolicyDetails e grava tudo junto com o
+    novo checkpoint. Apólices cuja leitura falhou ficam gravadas sem região e datas e são
+    completadas nos ciclos seguintes.
+
+    A cabeça da cadeia só é atualizada quando o ciclo consegue falar com o nó; se ela fica
+    mais de stale_polls intervalos sem atualização (nó fora do ar, laço travado), o store
+    deixa de ser considerado sincronizado.
+    """
+
+    def __init__(self, w3, store, sources, start_block=0, block_chunk=2000, confirmations=0,
+                 poll_interval=2.0, max_lag=5, stale_polls=5):
+        self.w3 = w3
+        self.store = store
+        self.start_block = start_block
+        self.block_chunk = block_chunk
+        self.confirmations = confirmations
+        self.poll_interval = poll_interval
+        self.max_lag = max_lag
+        self.stale_polls = stale_polls
+        self.head = None
+        self.head_updated_at = None
+        self.backfilled = 0
+        self._task = None
+        self._listeners = []
+        self._sources = sources
+        self._events_by_topic = None
+        self._addresses = None
+
+    def _prepare(self):
+        # Mapeia topic0 -> evento do contrato, para decodificar cada log com uma consulta;
+        # calculado no primeiro ciclo para não carregar os ABIs na importação
+        if self._events_by_topic is not None:
+            return
+        self._events_by_topic = {}
+        self._addresses = []
+        for contract, event_names in self._sources:
+            self._addresses.append(contract.address)
+            for event_name in event_names:
+                event = getattr(contract.events, event_name, None)
+                if event is None:
+                    logger.warning(f"Event {event_name} not found in contract {contract.address}, skipping")
+                    continue
+                self._events_by_topic[event_abi_to_log_topic(event._get_event_abi())] = event()
+
+    def add_listener(self, listener):
+        """Registra uma função chamada com a lista de eventos de cada intervalo indexado"""
+        self._listeners.append(listener)
+
+    @property
+    def is_synced(self):
+        """Indica se o store está próximo o suficiente da cabeça da cadeia para ser usado"""
+        if self.head is None:
+            return False
+        checkpoint = self.store.get_checkpoint()
+        if checkpoint is None:
+            return False
+        if time.monotonic() - self.head_updated_at > self.poll_interval * self.stale_polls:
+            # Cabeça antiga: a distância até o checkpoint não diz mais nada sobre o atraso
+            return False
+        return self.head - checkpoint <= self.confirmations + self.max_lag
+
+    def _decode(self, log):
+        event = self._events_by_topic.get(bytes(log["topics"][0])) if log["topics"] else None
+        if event is None:
+            return None
+        try:
+            return event.process_log(log)
+        except Exception as e:
+            logger.error(f"Error decoding log {log.get('transactionHash')}: {str(e)}")
+            return None
+
+    async def _policy_details(self, policy_ids):
+        """Lê getPolicyDetails em lote; as apólices cuja leitura falhou ficam de fora"""
+        results = await batch_call(
+            insurance_contract.functions.getPolicyDetails(policy_id) for policy_id in policy_ids
+        )
+        details = {}
+        for policy_id, result in zip(policy_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not read details of policy {policy_id}, will retry: {str(result)}")
+            else:
+                details[policy_id] = result
+        return details
+
+    async def _backfill_details(self):
+        """Completa as apólices gravadas sem os dados de getPolicyDetails"""
+        policy_ids = self.store.get_policies_missing_details(limit=self.block_chunk)
+        if not policy_ids:
+            return
+        try:
+            details = await self._policy_details(policy_ids)
+        except Exception as e:
+            logger.warning(f"Policy details backfill failed: {str(e)}")
+            return
+        self.store.fill_details(details)
+        self.backfilled += len(details)
+
+    async def sync_once(self):
+        """Indexa todos os blocos confirmados ainda não processados"""
+        self._prepare()
+        self.head = await self.w3.eth.block_number
+        self.head_updated_at = time.monotonic()
+        await self._backfill_details()
+        target = self.head - self.confirmations
+        checkpoint = self.store.get_checkpoint()
+        from_block = self.start_block if checkpoint is None else checkpoint + 1
+
+        while from_block <= target:
+            to_block = min(from_block + self.block_chunk - 1, target)
+            logs = await self.w3.eth.get_logs({
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "address": self._addresses,
+                "topics": [list(self._events_by_topic.keys())]
+            })
+            events = [event for event in (self._decode(log) for log in logs) if event is not None]
+
+            # PolicyCreated não traz região nem datas; completa com uma leitura em lote
+            created_ids = [event["args"]["policyId"] for event in events if event["event"] == "PolicyCreated"]
+            details = await self._policy_details(created_ids) if created_ids else {}
+
+            self.store.apply_events(events, to_block, details)
+            for listener in self._listeners:
+                listener(events)
+            logger.debug(f"Indexed blocks {from_block}-{to_block}: {len(events)} events")
+            from_block = to_block + 1
+
+    async def run(self):
+        while True:
+            try:
+                await self.sync_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in event indexer: {str(e)}", exc_info=True)
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Indexador compartilhado; só existe quando INDEXER_ENABLED está ativo. O SQLite é aberto e os
+# ABIs carregados no primeiro uso, não na importação
+policy_indexer = None
+if INDEXER_ENABLED:
+    policy_indexer = EventIndexer(
+        async_w3,
+        LazyObject(lambda: PolicyStore(INDEXER_DB_PATH)),
+        [(insurance_contract, INSURANCE_EVENTS), (treasury_contract, TREASURY_EVENTS)],
+        start_block=INDEXER_START_BLOCK,
+        block_chunk=INDEXER_BLOCK_CHUNK,
+        confirmations=INDEXER_CONFIRMATIONS,
+        poll_interval=INDEXER_POLL_INTERVAL,
+        max_lag=INDEXER_MAX_LAG,
+        stale_polls=INDEXER_STALE_POLLS
+    )
+
+def get_indexed_store():
+    """Retorna o PolicyStore se o indexador estiver ativo e sincronizado, senão None"""
+    if policy_indexer is not None and policy_indexer.is_synced:
+        return policy_indexer.store
+    return None
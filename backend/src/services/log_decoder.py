@@ -0,0 +1,80 @@
+import logging
+
+from web3._utils.events import get_event_data as decode_event_log
+
+logger = logging.getLogger(__name__)
+
+class LogDecoder:
+    """
+    Decodificador de logs indexado por (endereço do contrato, topic0).
+
+    Os ABIs dos eventos são registrados uma única vez; cada log é decodificado com uma
+    única consulta ao dicionário, sem testar os eventos de cada contrato um a um.
+    """
+
+    def __init__(self, abi_codec):
+        self.abi_codec = abi_codec
+        self._events = {}
+        self._contract_names = {}
+
+    def register(self, contract_name, address, capabilities):
+        """
+        Registra os eventos de um contrato.
+
+        Args:
+            contract_name: O nome do contrato (ex.: "insurance")
+            address: O endereço do contrato
+            capabilities: O ContractCapabilities do contrato (de abi_registry)
+        """
+        address = address.lower()
+        self._contract_names[address] = contract_name
+        for topic, event_abi in capabilities.events_by_topic.items():
+            if not event_abi.get("anonymous"):
+                self._events[(address, topic)] = event_abi
+
+    def contract_name(self, address):
+        """Retorna o nome do contrato registrado no endereço, ou None"""
+        return self._contract_names.get(address.lower())
+
+    def event_abi(self, log):
+        """Retorna o ABI do evento que emitiu o log, ou None se não for conhecido"""
+        topics = log.get("topics")
+        if not topics:
+            return None
+        return self._events.get((log["address"].lower(), bytes(topics[0])))
+
+    def decode_log(self, log):
+        """Decodifica um log; retorna None se o evento não for conhecido ou não decodificar"""
+        event_abi = self.event_abi(log)
+        if event_abi is None:
+            return None
+        try:
+            return decode_event_log(self.abi_codec, event_abi, log)
+        except Exception as e:
+            logger.warning(f"Could not decode {event_abi['name']} log from {log['address']}: {str(e)}")
+            return None
+
+    def decode_receipt(self, receipt, address=None, event_name=None):
+        """
+        Decodifica os logs de um recibo, opcionalmente filtrando por contrato e evento.
+
+        Args:
+            receipt: O recibo da transação
+            address: Só considera logs emitidos por este endereço (opcional)
+            event_name: Só considera logs deste evento (opcional)
+
+        Returns:
+            Lista de eventos decodificados, na ordem dos logs
+        """
+        address = address.lower() if address else None
+        events = []
+        for log in receipt.get("logs", []):
+            if address is not None and log["address"].lower() != address:
+                continue
+            event_abi = self.event_abi(log)
+            if event_abi is None or (event_name is not None and event_abi["name"] != event_name):
+                continue
+            event = self.decode_log(log)
+            if event is not None:
+                events.append(event)
+        return events
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Trechos de mensagens de erro dos nós que indicam nonce dessincronizado
+NONCE_ERROR_MARKERS = (
+    "nonce too low",
+    "nonce too high",
+    "already known",
+    "known transaction",
+    "replacement transaction underpriced",
+    "invalid nonce",
+)
+
+def is_nonce_error(error):
+    """Verifica se um erro de envio foi causado por um nonce dessincronizado"""
+    message = str(error).lower()
+    return any(marker in message for marker in NONCE_ERROR_MARKERS)
+
+class NonceManager:
+    """
+    Distribui nonces sequenciais por remetente sem consultar o nó a cada transação.
+
+    O primeiro nonce de cada remetente vem de get_transaction_count(sender, "pending");
+    os seguintes são incrementados localmente, permitindo transmitir várias transações
+    em sequência sem esperar pelos recibos.
+    """
+
+    def __init__(self, w3):
+        self.w3 = w3
+        self._next_nonce = {}
+        self._locks = {}
+
+    def _lock(self, sender):
+        if sender not in self._locks:
+            self._locks[sender] = asyncio.Lock()
+        return self._locks[sender]
+
+    async def _fetch(self, sender):
+        return await self.w3.eth.get_transaction_count(sender, "pending")
+
+    async def allocate(self, sender):
+        """
+        Reserva o próximo nonce do remetente.
+
+        Args:
+            sender: O endereço do remetente
+
+        Returns:
+            O nonce a ser usado na transação
+        """
+        async with self._lock(sender):
+            if sender not in self._next_nonce:
+                self._next_nonce[sender] = await self._fetch(sender)
+            nonce = self._next_nonce[sender]
+            self._next_nonce[sender] = nonce + 1
+            return nonce
+
+    async def resync(self, sender):
+        """Realinha o contador local com o nonce pendente informado pelo nó"""
+        async with self._lock(sender):
+            self._next_nonce[sender] = await self._fetch(sender)
+            logger.warning(f"Nonce for {sender} resynced to {self._next_nonce[sender]}")
+
+    def release(self, sender, nonce):
+        """
+        Devolve um nonce que não chegou a ser transmitido.
+
+        Se era o último reservado, o contador apenas recua; caso contrário existe uma
+        lacuna e o próximo allocate volta a consultar o nó.
+        """
+        if self._next_nonce.get(sender) == nonce + 1:
+            self._next_nonce[sender] = nonce
+        else:
+            self._next_nonce.pop(sender, None)
+
+    def reset(self, sender=None):
+        """Descarta o estado local (de um remetente ou de todos), forçando nova consulta ao nó"""
+        if sender is None:
+            self._next_nonce.clear()
+        else:
+            self._next_nonce.pop(sender, None)
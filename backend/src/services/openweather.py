@@ -1,27 +1,278 @@
-import requests
+import asyncio
 import os
 from dotenv import load_dotenv
 import logging
 
+import aiohttp
+
+from .weather_cache import WeatherCache, SingleFlight, normalize_region
+from .climate_store import ClimateSeriesStore
+from .rolling_window import RollingAggregates
+from .weather_quota import SlidingWindowLimit, QuotaScheduler, QuotaExceeded
+from ..utils.lazy import LazyObject
+
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 # Carregar variáveis de ambiente
 load_dotenv()
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
-OPENWEATHER_BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
+# Pode apontar para o servidor local de src/tools/openweather_standin.py em testes e benchmarks
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5/weather")
+
+# Cliente HTTP: pool de conexões compartilhado, timeouts (segundos) e limite de requisições simultâneas
+OPENWEATHER_CONNECT_TIMEOUT = float(os.getenv("OPENWEATHER_CONNECT_TIMEOUT", "3"))
+OPENWEATHER_READ_TIMEOUT = float(os.getenv("OPENWEATHER_READ_TIMEOUT", "10"))
+OPENWEATHER_MAX_CONNECTIONS = int(os.getenv("OPENWEATHER_MAX_CONNECTIONS", "20"))
+OPENWEATHER_MAX_CONCURRENCY = int(os.getenv("OPENWEATHER_MAX_CONCURRENCY", "20"))
+
+# Cache de snapshots por região: intervalo de atualização do provedor (10 min na OpenWeather),
+# TTL mínimo quando a próxima atualização já está atrasada e número máximo de regiões
+OPENWEATHER_UPDATE_INTERVAL = int(os.getenv("OPENWEATHER_UPDATE_INTERVAL", "600"))
+WEATHER_CACHE_MIN_TTL = int(os.getenv("WEATHER_CACHE_MIN_TTL", "60"))
+WEATHER_CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "1000"))
+
+# Cota do plano da OpenWeather (0 desliga o limite) e espera máxima de uma consulta na fila.
+# A cota é contada por processo: com N workers, configure aqui a cota do plano dividida por N
+OPENWEATHER_CALLS_PER_MINUTE = int(os.getenv("OPENWEATHER_CALLS_PER_MINUTE", "60"))
+OPENWEATHER_CALLS_PER_DAY = int(os.getenv("OPENWEATHER_CALLS_PER_DAY", "0"))
+WEATHER_QUOTA_MAX_WAIT = float(os.getenv("WEATHER_QUOTA_MAX_WAIT", "30"))
+
+# Consulta de várias regiões: regiões buscadas ao mesmo tempo e máximo por requisição
+WEATHER_BULK_CONCURRENCY = int(os.getenv("WEATHER_BULK_CONCURRENCY", "10"))
+WEATHER_BULK_MAX_REGIONS = int(os.getenv("WEATHER_BULK_MAX_REGIONS", "100"))
+
+# GET /weather/{region} devolve o payload bruto da OpenWeather (rawData) só quando pedido em fields=;
+# true restaura o comportamento antigo de sempre incluí-lo
+WEATHER_INCLUDE_RAW_DATA = os.getenv("WEATHER_INCLUDE_RAW_DATA", "false").lower() in ("1", "true", "yes")
+
+# Histórico local das observações buscadas (séries por região e parâmetro em disco)
+CLIMATE_STORE_ENABLED = os.getenv("CLIMATE_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+CLIMATE_STORE_DIR = os.getenv("CLIMATE_STORE_DIR", "climate_data")
+
+# Fração mínima das horas do período com leitura para que o agregado da janela seja usado;
+# abaixo disso a janela é parcial e não dispara sinistros
+WEATHER_WINDOW_MIN_COVERAGE = float(os.getenv("WEATHER_WINDOW_MIN_COVERAGE", "0.75"))
 
 # Tipos de parâmetros suportados e seus mapeamentos para a API OpenWeather
+# "window" é o agregado comparado ao limiar quando o parâmetro da apólice tem periodInDays:
+# a chuva é acumulada no período; os demais parâmetros usam a média do período
 PARAMETER_MAPPINGS = {
-    "rainfall": {"source": "rain", "field": "1h", "multiplier": 1000, "default": 0},
-    "temperature": {"source": "main", "field": "temp", "multiplier": 1000, "default": 0},
-    "humidity": {"source": "main", "field": "humidity", "multiplier": 100, "default": 0},
-    "wind_speed": {"source": "wind", "field": "speed", "multiplier": 1000, "default": 0},
-    "pressure": {"source": "main", "field": "pressure", "multiplier": 10, "default": 0},
-    "clouds": {"source": "clouds", "field": "all", "multiplier": 100, "default": 0}
+    "rainfall": {"source": "rain", "field": "1h", "multiplier": 1000, "default": 0, "window": "sum"},
+    "temperature": {"source": "main", "field": "temp", "multiplier": 1000, "default": 0, "window": "mean"},
+    "humidity": {"source": "main", "field": "humidity", "multiplier": 100, "default": 0, "window": "mean"},
+    "wind_speed": {"source": "wind", "field": "speed", "multiplier": 1000, "default": 0, "window": "mean"},
+    "pressure": {"source": "main", "field": "pressure", "multiplier": 10, "default": 0, "window": "mean"},
+    "clouds": {"source": "clouds", "field": "all", "multiplier": 100, "default": 0, "window": "mean"}
 }
 
-def fetch_climate_data(region: str, parameter_type: str) -> int:
+class OpenWeatherError(Exception):
+    """Falha ao consultar a API OpenWeather (rede, timeout ou status HTTP de erro)"""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class OpenWeatherClient:
+    """
+    Cliente assíncrono da OpenWeather com um pool de conexões compartilhado.
+
+    A sessão aiohttp é criada no primeiro uso e mantém as conexões abertas (keep-alive)
+    entre as consultas; um semáforo limita quantas requisições ficam em andamento ao
+    mesmo tempo, e cada requisição tem timeouts de conexão e de leitura.
+    """
+
+    def __init__(self, base_url, api_key, connect_timeout=3.0, read_timeout=10.0,
+                 max_connections=20, max_concurrency=20):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout)
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.request_count = 0
+        self._session = None
+        self._semaphore = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def get_weather(self, region):
+        """
+        Busca o clima atual de uma região.
+
+        Args:
+            region: A região (cidade, país)
+
+        Returns:
+            O JSON completo devolvido pela API
+
+        Raises:
+            ValueError: Se a chave da API não estiver configurada
+            OpenWeatherError: Se a requisição falhar
+        """
+        if not self.api_key:
+            raise ValueError("OPENWEATHER_API_KEY is not set in environment variables")
+
+        params = {
+            "q": region,
+            "appid": self.api_key,
+            "units": "metric"  # Usar unidades métricas (°C, mm, etc.)
+        }
+        session = self._get_session()
+        try:
+            async with self._semaphore:
+                self.request_count += 1
+                async with session.get(self.base_url, params=params) as response:
+                    if response.status >= 400:
+                        retry_after = response.headers.get("Retry-After")
+                        raise OpenWeatherError(
+                            f"OpenWeather API returned {response.status} for region {region}", response.status,
+                            float(retry_after) if retry_after and retry_after.isdigit() else None
+                        )
+                    return await response.json(content_type=None)
+        except asyncio.TimeoutError:
+            raise OpenWeatherError(f"Timeout contacting OpenWeather API for region {region}")
+        except aiohttp.ClientError as e:
+            raise OpenWeatherError(f"Error contacting OpenWeather API: {str(e)}")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+# Cliente compartilhado por todas as rotas
+openweather_client = OpenWeatherClient(
+    OPENWEATHER_BASE_URL,
+    OPENWEATHER_API_KEY,
+    connect_timeout=OPENWEATHER_CONNECT_TIMEOUT,
+    read_timeout=OPENWEATHER_READ_TIMEOUT,
+    max_connections=OPENWEATHER_MAX_CONNECTIONS,
+    max_concurrency=OPENWEATHER_MAX_CONCURRENCY
+)
+
+def extract_parameter(data, parameter_type):
+    """
+    Extrai um parâmetro climático de uma resposta da OpenWeather.
+
+    Returns:
+        O valor convertido para inteiro (multiplicado pelo fator de conversão)
+    """
+    # Obter a configuração de mapeamento para o tipo de parâmetro
+    mapping = PARAMETER_MAPPINGS[parameter_type]
+    
+    # Extrair o valor do parâmetro da resposta
+    source_data = data.get(mapping["source"], {})
+    
+    # Para alguns parâmetros como "rain", o valor pode estar em um subcampo
+    if isinstance(source_data, dict):
+        value = source_data.get(mapping["field"], mapping["default"])
+    else:
+        value = mapping["default"]
+    
+    # Converter para inteiro (multiplicado pelo fator de conversão)
+    return int(float(value) * mapping["multiplier"])
+
+# Snapshots de clima compartilhados entre os tipos de parâmetro; consultas simultâneas da
+# mesma região compartilham uma única requisição à OpenWeather
+weather_cache = WeatherCache(WEATHER_CACHE_MAX_ENTRIES, OPENWEATHER_UPDATE_INTERVAL, WEATHER_CACHE_MIN_TTL)
+weather_flights = SingleFlight()
+
+# Histórico compartilhado; None quando CLIMATE_STORE_ENABLED está desligado. O diretório só é
+# criado no primeiro uso, para que importar o módulo não escreva no disco
+climate_store = LazyObject(lambda: ClimateSeriesStore(CLIMATE_STORE_DIR)) if CLIMATE_STORE_ENABLED else None
+
+# Cota de chamadas compartilhada; as regiões com apólices mais perto do limiar passam na frente
+weather_quota = QuotaScheduler(
+    [limit for limit in (
+        SlidingWindowLimit("perMinute", OPENWEATHER_CALLS_PER_MINUTE, 60) if OPENWEATHER_CALLS_PER_MINUTE else None,
+        SlidingWindowLimit("perDay", OPENWEATHER_CALLS_PER_DAY, 86400) if OPENWEATHER_CALLS_PER_DAY else None
+    ) if limit is not None],
+    max_wait=WEATHER_QUOTA_MAX_WAIT
+)
+
+def update_region_priorities(margins):
+    """
+    Atualiza a prioridade das regiões na fila da cota.
+
+    Args:
+        margins: Dicionário região normalizada -> distância relativa entre a última leitura
+            e o limiar mais próximo das apólices ativas da região (0 = no limiar)
+    """
+    weather_quota.update_priorities(margins)
+
+# Janelas móveis dos períodos (periodInDays) em uso, preenchidas a partir do histórico
+rolling_aggregates = RollingAggregates(climate_store)
+
+def retain_rolling_windows(groups):
+    """
+    Descarta as janelas móveis que nenhuma regra das apólices ativas usa.
+
+    Args:
+        groups: Trios (região, tipo de parâmetro, periodInDays) das regras com período
+    """
+    evicted = rolling_aggregates.retain(groups)
+    if evicted:
+        logger.info(f"Dropped {evicted} rolling windows no longer used by active policies")
+
+def build_snapshot(region, data):
+    """
+    Monta o snapshot de uma região com todos os parâmetros de PARAMETER_MAPPINGS.
+
+    Um parâmetro que não pode ser convertido fica com valor None e o erro em "errors".
+    """
+    values = {}
+    errors = {}
+    for parameter_type in PARAMETER_MAPPINGS:
+        try:
+            values[parameter_type] = extract_parameter(data, parameter_type)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            values[parameter_type] = None
+            errors[parameter_type] = str(e)
+    return {"region": region, "dt": data.get("dt"), "values": values, "errors": errors, "data": data}
+
+async def get_weather_snapshot(region: str):
+    """
+    Retorna o snapshot de clima da região, consultando a OpenWeather só quando o cache expirou.
+
+    Raises:
+        OpenWeatherError: Se ocorrer um erro na requisição para a API
+    """
+    key = normalize_region(region)
+    snapshot = weather_cache.get(key)
+    if snapshot is None:
+        snapshot = await weather_flights.do(key, lambda: _fetch_snapshot(region, key))
+    return snapshot
+
+async def _fetch_snapshot(region, key):
+    try:
+        await weather_quota.acquire(weather_quota.priority(key))
+    except QuotaExceeded as e:
+        raise OpenWeatherError(str(e), 429)
+    try:
+        data = await openweather_client.get_weather(region)
+    except OpenWeatherError as e:
+        if e.status == 429:
+            # A cota do provedor acabou antes da nossa: segura todas as consultas
+            logger.warning(f"OpenWeather rate limit reached, pausing lookups for {e.retry_after or 60}s")
+            weather_quota.pause(e.retry_after or 60)
+        raise
+    snapshot = build_snapshot(region, data)
+    weather_cache.put(key, snapshot)
+    if climate_store is not None:
+        try:
+            climate_store.record_snapshot(snapshot)
+        except (OSError, ValueError) as e:
+            # O histórico não pode derrubar a consulta de clima
+            logger.error(f"Error recording climate observation for {region}: {str(e)}")
+    rolling_aggregates.observe_snapshot(snapshot)
+    return snapshot
+
+async def fetch_climate_data(region: str, parameter_type: str) -> int:
     """
     Busca dados climáticos da API OpenWeather.
     
@@ -34,7 +285,7 @@ def fetch_climate_data(region: str, parameter_type: str) -> int:
         
     Raises:
         ValueError: Se o tipo de parâmetro não for suportado
-        requests.RequestException: Se ocorrer um erro na requisição para a API
+        OpenWeatherError: Se ocorrer um erro na requisição para a API
     """
     # Validar o tipo de parâmetro
     if parameter_type not in PARAMETER_MAPPINGS:
@@ -43,55 +294,83 @@ def fetch_climate_data(region: str, parameter_type: str) -> int:
         logger.error(error_msg)
         raise ValueError(error_msg)
     
-    # Verificar se a chave da API está configurada
-    if not OPENWEATHER_API_KEY:
-        error_msg = "OPENWEATHER_API_KEY is not set in environment variables"
+    logger.info(f"Fetching {parameter_type} data for region: {region}")
+    try:
+        snapshot = await get_weather_snapshot(region)
+    except OpenWeatherError as e:
+        logger.error(f"Error fetching data from OpenWeather API: {str(e)}")
+        raise
+    
+    int_value = snapshot["values"][parameter_type]
+    if int_value is None:
+        error_msg = f"Error processing OpenWeather API response: {snapshot['errors'][parameter_type]}"
         logger.error(error_msg)
         raise ValueError(error_msg)
     
-    # Preparar parâmetros da requisição
-    params = {
-        "q": region,
-        "appid": OPENWEATHER_API_KEY,
-        "units": "metric"  # Usar unidades métricas (°C, mm, etc.)
-    }
+    logger.info(f"Fetched {parameter_type} value for {region}: {int_value} (converted)")
+    return int_value
+
+def windowed_value(region: str, parameter_type: str, period_days, now=None):
+    """
+    Retorna o agregado de PARAMETER_MAPPINGS[parameter_type]["window"] nos últimos period_days dias.
+
+    Returns:
+        (value, stats): o valor inteiro comparado ao limiar (None quando a janela é parcial,
+        isto é, cobre menos de WEATHER_WINDOW_MIN_COVERAGE do período) e todos os agregados
+        da janela, com partial
+    """
+    stats = rolling_aggregates.window(region, parameter_type, period_days, now)
+    stats["partial"] = stats["coverage"] < WEATHER_WINDOW_MIN_COVERAGE
+    value = stats[PARAMETER_MAPPINGS[parameter_type]["window"]]
+    if value is None or stats["partial"]:
+        return None, stats
+    return int(round(value)), stats
+
+async def fetch_windowed_climate_data(region: str, parameter_type: str, period_days) -> dict:
+    """
+    Busca a leitura atual e o valor agregado do parâmetro no período da apólice.
     
-    try:
-        logger.info(f"Fetching {parameter_type} data for region: {region}")
-        response = requests.get(OPENWEATHER_BASE_URL, params=params)
-        response.raise_for_status()  # Verificar se a requisição foi bem-sucedida
-        data = response.json()
-        
-        # Obter a configuração de mapeamento para o tipo de parâmetro
-        mapping = PARAMETER_MAPPINGS[parameter_type]
-        
-        # Extrair o valor do parâmetro da resposta
-        source_data = data.get(mapping["source"], {})
-        
-        # Para alguns parâmetros como "rain", o valor pode estar em um subcampo
-        if isinstance(source_data, dict):
-            value = source_data.get(mapping["field"], mapping["default"])
-        else:
-            value = mapping["default"]
+    Args:
+        region: A região para buscar os dados (cidade, país)
+        parameter_type: O tipo de parâmetro climático a ser buscado
+        period_days: O periodInDays do parâmetro da apólice; 0 usa só a leitura atual
         
-        # Converter para inteiro (multiplicado pelo fator de conversão)
-        int_value = int(float(value) * mapping["multiplier"])
+    Returns:
+        Um dicionário com currentValue, value (o valor a comparar com o limiar), aggregation,
+        observations (quantas horas com leitura formam a janela), coverage e partial (True
+        quando a janela não tem leituras suficientes e value é só a leitura atual)
         
-        logger.info(f"Fetched {parameter_type} value for {region}: {value} (raw), {int_value} (converted)")
-        return int_value
-    
-    except requests.exceptions.RequestException as e:
-        error_msg = f"Error fetching data from OpenWeather API: {str(e)}"
-        logger.error(error_msg)
-        raise
-    
-    except (ValueError, TypeError, KeyError) as e:
-        error_msg = f"Error processing OpenWeather API response: {str(e)}"
-        logger.error(error_msg)
-        raise ValueError(error_msg)
+    Raises:
+        ValueError: Se o tipo de parâmetro não for suportado
+        OpenWeatherError: Se ocorrer um erro na requisição para a API
+    """
+    # A leitura atual entra na janela antes de ela ser consultada
+    current_value = await fetch_climate_data(region, parameter_type)
+    if not period_days:
+        return {
+            "currentValue": current_value, "value": current_value, "aggregation": "current",
+            "observations": 1, "coverage": 1.0, "partial": False
+        }
+
+    value, stats = windowed_value(region, parameter_type, period_days)
+    if value is None:
+        # Histórico insuficiente no período (ex.: região consultada há pouco): a leitura atual é
+        # devolvida só como referência e a janela fica marcada como parcial
+        return {
+            "currentValue": current_value, "value": current_value, "aggregation": "current",
+            "observations": stats["count"], "coverage": stats["coverage"], "partial": True
+        }
+    return {
+        "currentValue": current_value,
+        "value": value,
+        "aggregation": PARAMETER_MAPPINGS[parameter_type]["window"],
+        "observations": stats["count"],
+        "coverage": stats["coverage"],
+        "partial": False
+    }
 
 # Função adicional para obter dados mais detalhados (opcional)
-def fetch_detailed_climate_data(region: str):
+async def fetch_detailed_climate_data(region: str):
     """
     Busca dados climáticos detalhados da API OpenWeather.
     
@@ -101,16 +380,52 @@ def fetch_detailed_climate_data(region: str):
     Returns:
         Um dicionário com todos os dados climáticos disponíveis
     """
-    if not OPENWEATHER_API_KEY:
-        raise ValueError("OPENWEATHER_API_KEY is not set in environment variables")
-    
-    params = {
-        "q": region,
-        "appid": OPENWEATHER_API_KEY,
-        "units": "metric"
-    }
-    
-    response = requests.get(OPENWEATHER_BASE_URL, params=params)
-    response.raise_for_status()
+    snapshot = await get_weather_snapshot(region)
+    return snapshot["data"]
+
+
+def validate_parameter_types(parameter_types):
+    """Levanta ValueError se algum tipo de parâmetro não estiver em PARAMETER_MAPPINGS"""
+    unsupported = [p for p in parameter_types if p not in PARAMETER_MAPPINGS]
+    if unsupported:
+        supported_types = ", ".join(PARAMETER_MAPPINGS.keys())
+        raise ValueError(
+            f"Unsupported parameter types: {', '.join(unsupported)}. Supported types are: {supported_types}"
+        )
+
+async def fetch_bulk_climate_data(regions, parameter_types=None, concurrency=WEATHER_BULK_CONCURRENCY):
+    """
+    Busca os parâmetros climáticos de várias regiões ao mesmo tempo.
     
-    return response.json()
\ No newline at end of file
+    Args:
+        regions: Lista de regiões (cidade, país)
+        parameter_types: Tipos de parâmetro a retornar (opcional; padrão: todos)
+        concurrency: Máximo de regiões consultadas simultaneamente
+        
+    Returns:
+        Uma lista na ordem de regions; cada item traz os valores convertidos
+        (multiplicados pelo fator de PARAMETER_MAPPINGS) ou o erro daquela região
+        
+    Raises:
+        ValueError: Se algum tipo de parâmetro não for suportado
+    """
+    parameter_types = list(parameter_types or PARAMETER_MAPPINGS.keys())
+    validate_parameter_types(parameter_types)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_region(region):
+        try:
+            async with semaphore:
+                snapshot = await get_weather_snapshot(region)
+        except (OpenWeatherError, ValueError) as e:
+            return {"region": region, "values": None, "timestamp": None, "error": str(e)}
+
+        errors = {p: snapshot["errors"][p] for p in parameter_types if p in snapshot["errors"]}
+        return {
+            "region": region,
+            "values": {p: snapshot["values"][p] for p in parameter_types},
+            "timestamp": snapshot["dt"],
+            "error": "; ".join(f"{p}: {e}" for p, e in errors.items()) or None
+        }
+
+    return await asyncio.gather(*(fetch_region(region) for region in regions))
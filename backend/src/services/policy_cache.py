@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from eth_utils import event_abi_to_log_topic
+
+from ..utils.config import async_w3, POLICY_CACHE_SIZE, POLICY_CACHE_TTL, POLICY_CACHE_POLL_INTERVAL
+from .blockchain import insurance_contract
+from .indexer import policy_indexer, INSURANCE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+class PolicyCache:
+    """
+    Cache LRU de leitura das apólices (getPolicyDetails / getPolicyStatus) por policyId.
+
+    As entradas são descartadas quando um evento do contrato de seguro cita a apólice;
+    o TTL serve apenas de segurança caso algum evento seja perdido. Uma invalidação da
+    apólice que ocorra durante uma leitura dela impede que o valor lido seja gravado no
+    cache; as leituras das demais apólices não são afetadas.
+    """
+
+    def __init__(self, max_size=10000, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # policyId -> [leituras em andamento, geração]; só existe enquanto há leituras
+        self._loading = {}
+        # Incrementado por clear(), que invalida todas as leituras em andamento
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidated = 0
+
+    async def get(self, kind, policy_id, loader):
+        """
+        Retorna o valor em cache ou o lê com loader e o armazena.
+
+        Args:
+            kind: O tipo de leitura ("details" ou "status")
+            policy_id: O ID da apólice
+            loader: Função assíncrona sem argumentos que lê o valor no contrato
+
+        Returns:
+            O valor lido ou em cache
+        """
+        entry = self._entries.get(policy_id)
+        if entry is not None and kind in entry:
+            value, cached_at = entry[kind]
+            if time.monotonic() - cached_at <= self.ttl:
+                self._entries.move_to_end(policy_id)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        state = self._loading.setdefault(policy_id, [0, 0])
+        state[0] += 1
+        generation = (self._epoch, state[1])
+        try:
+            value = await loader()
+        finally:
+            state[0] -= 1
+            if not state[0]:
+                del self._loading[policy_id]
+        if generation == (self._epoch, state[1]):
+            self._entries.setdefault(policy_id, {})[kind] = (value, time.monotonic())
+            self._entries.move_to_end(policy_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, policy_id):
+        """Descarta tudo o que está em cache para uma apólice"""
+        state = self._loading.get(policy_id)
+        if state is not None:
+            state[1] += 1
+        if self._entries.pop(policy_id, None) is not None:
+            self.invalidated += 1
+
+    def invalidate_events(self, events):
+        """Descarta as apólices citadas em uma lista de eventos decodificados"""
+        for event in events:
+            policy_id = event["args"].get("policyId")
+            if policy_id is not None:
+                self.invalidate(policy_id)
+
+    def clear(self):
+        self._epoch += 1
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxSize": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidated
+        }
+
+class PolicyEventWatcher:
+    """
+    Acompanha os eventos do contrato de seguro e invalida o cache das apólices citadas.
+
+    Usado quando o indexador está desligado. Como todos os eventos acompanhados têm o
+    policyId como primeiro tópico indexado, não é preciso decodificar os logs.
+    """
+
+    def __init__(self, w3, contract, cache, event_names, poll_interval=2.0):
+        self.w3 = w3
+        self.contract = contract
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.last_block = None
+        self.event_names = event_names
+        self._task = None
+        self._topics = None
+
+    def _event_topics(self):
+        # Calculados no primeiro uso para não carregar os ABIs na importação
+        if self._topics is None:
+            self._topics = []
+            for event_name in self.event_names:
+                event = getattr(self.contract.events, event_name, None)
+                if event is not None:
+                    self._topics.append(event_abi_to_log_topic(event._get_event_abi()))
+        return self._topics
+
+    async def poll_once(self):
+        head = await self.w3.eth.block_number
+        if self.last_block is None:
+            # Nada em cache pode ser anterior ao início do acompanhamento
+            self.last_block = head
+            return
+        if head <= self.last_block:
+            return
+
+        logs = await self.w3.eth.get_logs({
+            "fromBlock": self.last_block + 1,
+            "toBlock": head,
+            "address": self.contract.address,
+            "topics": [self._event_topics()]
+        })
+        for log in logs:
+            if len(log["topics"]) > 1:
+                self.cache.invalidate(int.from_bytes(bytes(log["topics"][1]), "big"))
+        self.last_block = head
+
+    async def run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Sem saber o que mudou, descarta o cache inteiro
+                logger.error(f"Error watching policy events: {str(e)}")
+                self.cache.clear()
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Cache compartilhado; com o indexador ativo, as invalidações vêm dos eventos indexados
+policy_cache = PolicyCache(POLICY_CACHE_SIZE, POLICY_CACHE_TTL)
+policy_cache_watcher = None
+if policy_indexer is not None:
+    policy_indexer.add_listener(policy_cache.invalidate_events)
+else:
+    policy_cache_watcher = PolicyEventWatcher(
+        async_w3, insurance_contract, policy_cache, INSURANCE_EVENTS, POLICY_CACHE_POLL_INTERVAL
+    )
@@ -0,0 +1,263 @@
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Valores em wei podem passar de 2^63, por isso são guardados como TEXT
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS policies (
+    id INTEGER PRIMARY KEY,
+    farmer TEXT NOT NULL,
+    farmer_lower TEXT NOT NULL,
+    coverage_amount TEXT NOT NULL DEFAULT '0',
+    premium TEXT NOT NULL DEFAULT '0',
+    start_date INTEGER,
+    end_date INTEGER,
+    region TEXT,
+    crop_type TEXT,
+    active INTEGER NOT NULL DEFAULT 0,
+    claimed INTEGER NOT NULL DEFAULT 0,
+    claim_paid TEXT NOT NULL DEFAULT '0',
+    cancelled INTEGER NOT NULL DEFAULT 0,
+    expired INTEGER NOT NULL DEFAULT 0,
+    created_block INTEGER,
+    updated_block INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_policies_farmer ON policies (farmer_lower);
+CREATE INDEX IF NOT EXISTS idx_policies_region ON policies (region);
+CREATE INDEX IF NOT EXISTS idx_policies_crop ON policies (crop_type);
+
+CREATE TABLE IF NOT EXISTS treasury_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    policy_id INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    recipient TEXT,
+    amount TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    transaction_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_treasury_events_policy ON treasury_events (policy_id);
+
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    block_number INTEGER NOT NULL
+);
+"""
+
+COUNTER_NAMES = ("total_policies", "active_policies", "total_claims", "total_premiums", "total_payouts", "total_refunds")
+
+class PolicyStore:
+    """
+    Armazenamento local das apólices reconstruídas a partir dos eventos dos contratos.
+
+    Os eventos de cada intervalo de blocos são aplicados numa única transação junto com
+    o checkpoint, então uma reinicialização retoma exatamente do último bloco gravado.
+    Os totais do dashboard são mantidos incrementalmente na tabela counters.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        with self.conn:
+            for name in COUNTER_NAMES:
+                self.conn.execute("INSERT OR IGNORE INTO counters (name, value) VALUES (?, '0')", (name,))
+
+    def close(self):
+        self.conn.close()
+
+    def get_checkpoint(self):
+        """Retorna o último bloco indexado ou None se nada foi indexado ainda"""
+        row = self.conn.execute("SELECT block_number FROM checkpoint WHERE id = 1").fetchone()
+        return row["block_number"] if row else None
+
+    def apply_events(self, events, checkpoint_block, details=None):
+        """
+        Aplica uma lista de eventos decodificados e avança o checkpoint atomicamente.
+
+        Args:
+            events: Eventos decodificados (com "event", "args", "blockNumber", "transactionHash")
+            checkpoint_block: O último bloco coberto por estes eventos
+            details: Dicionário opcional policy_id -> (policy, parameters) de getPolicyDetails,
+                usado para completar os dados que PolicyCreated não traz
+        """
+        details = details or {}
+        with self.conn:
+            for event in events:
+                handler = getattr(self, f"_on_{event['event']}", None)
+                if handler is None:
+                    continue
+                handler(event["args"], event["blockNumber"], event, details)
+            self.conn.execute(
+                "INSERT INTO checkpoint (id, block_number) VALUES (1, ?) "
+                "ON CONFLICT(id) DO UPDATE SET block_number = excluded.block_number",
+                (checkpoint_block,)
+            )
+
+    # Contadores
+    def _add(self, name, amount):
+        row = self.conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        self.conn.execute("UPDATE counters SET value = ? WHERE name = ?", (str(int(row["value"]) + amount), name))
+
+    def _policy_row(self, policy_id):
+        return self.conn.execute("SELECT * FROM policies WHERE id = ?", (policy_id,)).fetchone()
+
+    # Eventos do contrato de seguro
+    def _on_PolicyCreated(self, args, block_number, event, details):
+        policy_id = args["policyId"]
+        policy = details.get(policy_id, (None, None))[0]
+        self.conn.execute(
+            "INSERT OR IGNORE INTO policies (id, farmer, farmer_lower, coverage_amount, premium, start_date, "
+            "end_date, region, crop_type, created_block, updated_block) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                policy_id, args["farmer"], args["farmer"].lower(), str(args["coverageAmount"]),
+                str(policy[3]) if policy else "0",
+                policy[4] if policy else None,
+                policy[5] if policy else None,
+                policy[11] if policy else None,
+                args["cropType"], block_number, block_number
+            )
+        )
+        self._add("total_policies", 1)
+
+    def _on_PolicyActivated(self, args, block_number, event, details):
+        row = self._policy_row(args["policyId"])
+        if row is not None and not row["active"]:
+            self._add("active_policies", 1)
+        self.conn.execute(
+            "UPDATE policies SET active = 1, premium = ?, updated_block = ? WHERE id = ?",
+            (str(args["premium"]), block_number, args["policyId"])
+        )
+
+    def _on_ClaimTriggered(self, args, block_number, event, details):
+        row = self._policy_row(args["policyId"])
+        if row is None:
+            return
+        if not row["claimed"]:
+            self._add("total_claims", 1)
+        self.conn.execute(
+            "UPDATE policies SET claimed = 1, claim_paid = ?, updated_block = ? WHERE id = ?",
+            (str(int(row["claim_paid"]) + args["payoutAmount"]), block_number, args["policyId"])
+        )
+
+    def _deactivate(self, policy_id, column, block_number):
+        row = self._policy_row(policy_id)
+        if row is None:
+            return
+        if row["active"]:
+            self._add("active_policies", -1)
+        self.conn.execute(
+            f"UPDATE policies SET active = 0, {column} = 1, updated_block = ? WHERE id = ?",
+            (block_number, policy_id)
+        )
+
+    def _on_PolicyCancelled(self, args, block_number, event, details):
+        self._deactivate(args["policyId"], "cancelled", block_number)
+
+    def _on_PolicyExpired(self, args, block_number, event, details):
+        self._deactivate(args["policyId"], "expired", block_number)
+
+    # Eventos da tesouraria
+    def _record_treasury_event(self, args, block_number, event):
+        tx_hash = event.get("transactionHash")
+        self.conn.execute(
+            "INSERT INTO treasury_events (policy_id, event, recipient, amount, block_number, transaction_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                args["policyId"], event["event"], args.get("recipient"), str(args["amount"]), block_number,
+                tx_hash.hex() if hasattr(tx_hash, "hex") else tx_hash
+            )
+        )
+
+    def _on_PremiumDeposited(self, args, block_number, event, details):
+        self._record_treasury_event(args, block_number, event)
+        self._add("total_premiums", args["amount"])
+
+    def _on_ClaimPaid(self, args, block_number, event, details):
+        self._record_treasury_event(args, block_number, event)
+        self._add("total_payouts", args["amount"])
+
+    def _on_RefundProcessed(self, args, block_number, event, details):
+        self._record_treasury_event(args, block_number, event)
+        self._add("total_refunds", args["amount"])
+
+    # Consultas
+    @staticmethod
+    def _to_policy(row):
+        return {
+            "id": row["id"],
+            "farmer": row["farmer"],
+            "coverageAmount": int(row["coverage_amount"]),
+            "premium": int(row["premium"]),
+            "startDate": row["start_date"],
+            "endDate": row["end_date"],
+            "active": bool(row["active"]),
+            "claimed": bool(row["claimed"]),
+            "claimPaid": int(row["claim_paid"]),
+            "cancelled": bool(row["cancelled"]),
+            "expired": bool(row["expired"]),
+            "region": row["region"],
+            "cropType": row["crop_type"]
+        }
+
+    def get_policy(self, policy_id):
+        """Retorna uma apólice indexada ou None"""
+        row = self._policy_row(policy_id)
+        return self._to_policy(row) if row else None
+
+    def get_farmer_policies(self, address):
+        """Retorna as apólices de um produtor, usando o índice por endereço"""
+        rows = self.conn.execute(
+            "SELECT * FROM policies WHERE farmer_lower = ? ORDER BY id", (address.lower(),)
+        ).fetchall()
+        return [self._to_policy(row) for row in rows]
+
+    def get_active_policy_ids(self):
+        """Retorna os IDs das apólices ativas"""
+        rows = self.conn.execute("SELECT id FROM policies WHERE active = 1 ORDER BY id").fetchall()
+        return [row["id"] for row in rows]
+
+    def get_policies_missing_details(self, limit=100):
+        """IDs das apólices gravadas sem região ou datas (a leitura de getPolicyDetails falhou)"""
+        rows = self.conn.execute(
+            "SELECT id FROM policies WHERE region IS NULL OR start_date IS NULL OR end_date IS NULL "
+            "ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def fill_details(self, details):
+        """
+        Completa apólices com os dados de getPolicyDetails, sem sobrescrever o que já foi gravado.
+
+        Args:
+            details: Dicionário policy_id -> (policy, parameters) de getPolicyDetails
+        """
+        with self.conn:
+            for policy_id, (policy, _) in details.items():
+                self.conn.execute(
+                    "UPDATE policies SET start_date = COALESCE(start_date, ?), end_date = COALESCE(end_date, ?), "
+                    "region = COALESCE(region, ?) WHERE id = ?",
+                    (policy[4], policy[5], policy[11], policy_id)
+                )
+
+    def get_counters(self):
+        """Retorna os totais mantidos incrementalmente"""
+        rows = self.conn.execute("SELECT name, value FROM counters").fetchall()
+        return {row["name"]: int(row["value"]) for row in rows}
+
+    def top_values(self, column, limit=5):
+        """Retorna as regiões ou culturas com mais apólices como pares (valor, quantidade)"""
+        if column not in ("region", "crop_type"):
+            raise ValueError(f"Unsupported column: {column}")
+        rows = self.conn.execute(
+            f"SELECT {column} AS value, COUNT(*) AS total FROM policies WHERE {column} IS NOT NULL AND {column} != '' "
+            f"GROUP BY {column} ORDER BY total DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [(row["value"], row["total"]) for row in rows]
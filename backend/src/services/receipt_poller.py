@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted
+from web3._utils.method_formatters import receipt_formatter
+from web3._utils.request import async_make_post_request
+from ..utils.config import async_w3, RECEIPT_POLL_INTERVAL, RECEIPT_TIMEOUT, BATCH_CALL_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+class ReceiptPoller:
+    """
+    Acompanha os recibos de todas as transações pendentes do processo num único laço.
+
+    A cada poll_interval o laço consulta o número do bloco; só quando surge um bloco novo
+    os recibos de todos os hashes pendentes são pedidos num batch JSON-RPC. Hashes
+    registrados depois da última consulta são verificados na volta seguinte, mesmo sem
+    bloco novo (a transação pode ter entrado no bloco já visto). Quem espera recebe o
+    recibo por um future compartilhado por hash, no mesmo formato de
+    wait_for_transaction_receipt. Se o nó ou o provedor recusar o batch (resposta que não
+    é uma lista, como um erro de "batch too large"), os recibos daquele trecho são pedidos
+    um a um.
+    """
+
+    def __init__(self, w3, poll_interval=RECEIPT_POLL_INTERVAL, timeout=RECEIPT_TIMEOUT,
+                 chunk_size=BATCH_CALL_CHUNK_SIZE):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.last_block = None
+        self._futures = {}
+        self._waiters = {}
+        self._unchecked = set()
+        self._task = None
+        self._receipt_listeners = []
+        self._block_listeners = []
+        self.blocks_seen = 0
+        self.rpc_requests = 0
+        self.receipts_requested = 0
+        self.resolved = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.batch_fallbacks = 0
+
+    async def wait(self, tx_hash, timeout=None):
+        """
+        Aguarda o recibo de uma transação.
+
+        Args:
+            tx_hash: O hash da transação
+            timeout: Segundos de espera (opcional, padrão: self.timeout)
+
+        Returns:
+            O recibo formatado como em wait_for_transaction_receipt
+
+        Raises:
+            TimeExhausted: Se a transação não for minerada dentro do timeout
+        """
+        key = Web3.to_hex(HexBytes(tx_hash))
+        timeout = self.timeout if timeout is None else timeout
+        future = self._futures.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[key] = future
+            self._unchecked.add(key)
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        self.start()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise TimeExhausted(f"Transaction {key} is not in the chain after {timeout} seconds")
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                # Último interessado: o hash deixa de ser consultado
+                del self._waiters[key]
+                self._futures.pop(key, None)
+                self._unchecked.discard(key)
+
+    def add_listener(self, listener):
+        """Registra uma função chamada com cada recibo obtido"""
+        self._receipt_listeners.append(listener)
+
+    def add_block_listener(self, listener):
+        """Registra uma função chamada com o número de cada bloco novo observado"""
+        self._block_listeners.append(listener)
+
+    def _notify(self, listeners, value):
+        for listener in listeners:
+            try:
+                listener(value)
+            except Exception as e:
+                logger.error(f"Receipt poller listener failed: {str(e)}", exc_info=True)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self):
+        while True:
+            if self._futures:
+                try:
+                    await self.poll_once()
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Receipt polling failed: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll_once(self):
+        """Uma volta do laço: consulta os recibos se houver bloco novo ou hashes ainda não verificados"""
+        block = await self.w3.eth.block_number
+        self.rpc_requests += 1
+        if self.last_block is None or block > self.last_block:
+            self.blocks_seen += 1
+            self.last_block = block
+            self._notify(self._block_listeners, block)
+            hashes = list(self._futures)
+        else:
+            hashes = list(self._unchecked)
+        self._unchecked.clear()
+        if not hashes:
+            return
+
+        receipts = await self._fetch_receipts(hashes)
+        for key, receipt in zip(hashes, receipts):
+            future = self._futures.get(key)
+            if receipt is not None and future is not None and not future.done():
+                formatted = AttributeDict.recursive(receipt_formatter(receipt))
+                future.set_result(formatted)
+                self.resolved += 1
+                self._notify(self._receipt_listeners, formatted)
+
+    async def _fetch_receipts(self, hashes):
+        """Pede eth_getTransactionReceipt de todos os hashes em batches JSON-RPC"""
+        provider = self.w3.provider
+
+        async def post(payload):
+            raw_response = await async_make_post_request(
+                provider.endpoint_uri, json.dumps(payload).encode(), **provider.get_request_kwargs()
+            )
+            return json.loads(raw_response)
+
+        async def fetch_one(key):
+            response = await post({"jsonrpc": "2.0", "id": 0, "method": "eth_getTransactionReceipt", "params": [key]})
+            return response.get("result") if isinstance(response, dict) else None
+
+        async def fetch(chunk):
+            payload = [
+                {"jsonrpc": "2.0", "id": i, "method": "eth_getTransactionReceipt", "params": [key]}
+                for i, key in enumerate(chunk)
+            ]
+            response = await post(payload)
+            if not isinstance(response, list):
+                # Batch recusado (ex.: limite de tamanho do provedor): um pedido por hash
+                self.batch_fallbacks += 1
+                self.rpc_requests += len(chunk)
+                logger.warning(f"Batch receipt request for {len(chunk)} hashes failed, "
+                               f"falling back to one request per hash: {str(response)[:200]}")
+                return await asyncio.gather(*(fetch_one(key) for key in chunk))
+            responses = {item.get("id"): item for item in response if isinstance(item, dict)}
+            return [responses.get(i, {}).get("result") for i in range(len(chunk))]
+
+        chunks = [hashes[i:i + self.chunk_size] for i in range(0, len(hashes), self.chunk_size)]
+        self.rpc_requests += len(chunks)
+        self.receipts_requested += len(hashes)
+        results = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+        return [receipt for chunk in results for receipt in chunk]
+
+    def stats(self):
+        return {
+            "pending": len(self._futures),
+            "lastBlock": self.last_block,
+            "blocksSeen": self.blocks_seen,
+            "rpcRequests": self.rpc_requests,
+            "receiptsRequested": self.receipts_requested,
+            "resolved": self.resolved,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "batchFallbacks": self.batch_fallbacks
+        }
+
+# Laço compartilhado por send_transaction, pelo acompanhamento assíncrono e pelos lotes de sinistros
+receipt_poller = ReceiptPoller(async_w3)
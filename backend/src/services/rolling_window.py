@@ -0,0 +1,220 @@
+import time
+from collections import deque
+
+from .weather_cache import normalize_region
+
+DAY = 86400
+HOUR = 3600
+
+class RollingWindow:
+    """
+    Soma, mínimo, máximo e média das observações dos últimos length segundos.
+
+    Cada observação entra e sai uma única vez: a soma é ajustada na entrada e na saída e o
+    mínimo e o máximo ficam em filas monotônicas, então a atualização custa O(1) amortizado,
+    qualquer que seja o tamanho da janela. A janela cobre o intervalo (agora - length, agora].
+    """
+
+    def __init__(self, length):
+        self.length = length
+        self.sum = 0
+        self._items = deque()
+        self._min = deque()
+        self._max = deque()
+
+    def push(self, timestamp, value):
+        """Acrescenta uma observação; os horários devem ser crescentes"""
+        self._items.append((timestamp, value))
+        self.sum += value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+
+    def expire(self, now):
+        """Descarta as observações que saíram da janela"""
+        cutoff = now - self.length
+        while self._items and self._items[0][0] <= cutoff:
+            timestamp, value = self._items.popleft()
+            self.sum -= value
+            if self._min[0][0] == timestamp:
+                self._min.popleft()
+            if self._max[0][0] == timestamp:
+                self._max.popleft()
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self):
+        count = len(self._items)
+        if count == 0:
+            return {"count": 0, "sum": None, "min": None, "max": None, "mean": None}
+        return {
+            "count": count,
+            "sum": self.sum,
+            "min": self._min[0][1],
+            "max": self._max[0][1],
+            "mean": self.sum / count
+        }
+
+def hourly_means(timestamps, values):
+    """Agrupa observações em ordem crescente por hora: [(início da hora, média), ...]"""
+    buckets = []
+    for timestamp, value in zip(timestamps, values):
+        hour = timestamp - timestamp % HOUR
+        if buckets and buckets[-1][0] == hour:
+            buckets[-1][1] += value
+            buckets[-1][2] += 1
+        else:
+            buckets.append([hour, value, 1])
+    return [(hour, total / count) for hour, total, count in buckets]
+
+class RollingAggregates:
+    """
+    Janelas móveis por (região normalizada, parâmetro), uma para cada período em uso.
+
+    As observações entram nas janelas como uma leitura por hora (a média das leituras da
+    hora): a OpenWeather renova os dados a cada ~10 minutos e as consultas dependem do
+    tráfego, então somar cada leitura contaria a mesma chuva de rain.1h várias vezes. A hora
+    corrente fica num acumulador e entra nas janelas quando chega uma leitura da hora seguinte.
+
+    Uma janela é criada na primeira consulta de um período (periodInDays das apólices) e
+    preenchida uma vez a partir do histórico em disco; a partir daí cada hora nova a atualiza
+    incrementalmente. Antes de cada leitura as observações gravadas no histórico por outros
+    workers e ainda não vistas são aplicadas. Quando as apólices são recarregadas, retain
+    descarta as janelas que nenhuma regra ativa usa.
+    """
+
+    def __init__(self, history=None):
+        self.history = history
+        self._series = {}
+        self.observations = 0
+        self.seeded = 0
+        self.evicted = 0
+
+    def _entry(self, region, parameter_type):
+        key = (normalize_region(region), parameter_type)
+        entry = self._series.get(key)
+        if entry is None:
+            entry = self._series[key] = {"last": None, "hour": None, "windows": {}}
+        return entry
+
+    def observe(self, region, parameter_type, timestamp, value):
+        """Aplica uma observação à hora corrente da série; repetições são ignoradas"""
+        entry = self._entry(region, parameter_type)
+        if entry["last"] is not None and timestamp <= entry["last"]:
+            return False
+        entry["last"] = timestamp
+        hour = timestamp - timestamp % HOUR
+        current = entry["hour"]
+        if current is not None and current[0] == hour:
+            current[1] += value
+            current[2] += 1
+        else:
+            if current is not None:
+                # A hora anterior terminou: entra nas janelas como uma única leitura
+                for window in entry["windows"].values():
+                    window.push(current[0], current[1] / current[2])
+                    window.expire(timestamp)
+            entry["hour"] = [hour, value, 1]
+        self.observations += 1
+        return True
+
+    @staticmethod
+    def _stats(window, current, now):
+        """Agregados das horas fechadas da janela mais a hora corrente, com a cobertura"""
+        stats = window.stats()
+        hours = window.length / HOUR
+        if current is None or current[0] <= now - window.length:
+            return {**stats, "coverage": min(stats["count"] / hours, 1.0)}
+        value = current[1] / current[2]
+        count = stats["count"] + 1
+        total = (stats["sum"] or 0) + value
+        return {
+            "count": count,
+            "sum": total,
+            "min": value if stats["min"] is None else min(stats["min"], value),
+            "max": value if stats["max"] is None else max(stats["max"], value),
+            "mean": total / count,
+            "coverage": min(count / hours, 1.0)
+        }
+
+    def observe_snapshot(self, snapshot):
+        """Aplica todos os parâmetros disponíveis de um snapshot de clima"""
+        if not isinstance(snapshot.get("dt"), (int, float)):
+            return
+        for parameter_type, value in snapshot["values"].items():
+            if value is not None:
+                self.observe(snapshot["region"], parameter_type, int(snapshot["dt"]), value)
+
+    def _catch_up(self, region, parameter_type, entry, since):
+        if self.history is None:
+            return
+        start = since if entry["last"] is None else entry["last"] + 1
+        timestamps, values = self.history.query(region, parameter_type, start)
+        for timestamp, value in zip(timestamps.tolist(), values.tolist()):
+            self.observe(region, parameter_type, timestamp, value)
+
+    def window(self, region, parameter_type, period_days, now=None):
+        """
+        Retorna os agregados da janela dos últimos period_days dias.
+
+        Args:
+            region: A região (cidade, país)
+            parameter_type: O tipo de parâmetro climático
+            period_days: O tamanho da janela em dias
+            now: Horário de referência (opcional, padrão: agora)
+
+        Returns:
+            Um dicionário com count (horas com leitura), sum, min, max e mean das médias
+            horárias (None sem observações na janela) e coverage (fração das horas da janela
+            com leitura)
+        """
+        now = int(time.time()) if now is None else now
+        length = int(period_days * DAY)
+        entry = self._entry(region, parameter_type)
+        window = entry["windows"].get(length)
+        if window is None:
+            # Janela nova: preenche com o histórico em disco até a hora corrente (que está no acumulador)
+            window = RollingWindow(length)
+            if self.history is not None and entry["hour"] is not None and entry["hour"][0] > now - length + 1:
+                timestamps, values = self.history.query(region, parameter_type, now - length + 1, entry["hour"][0] - 1)
+                for hour, value in hourly_means(timestamps.tolist(), values.tolist()):
+                    window.push(hour, value)
+            entry["windows"][length] = window
+            self.seeded += 1
+        self._catch_up(region, parameter_type, entry, now - length + 1)
+        window.expire(now)
+        return self._stats(window, entry["hour"], now)
+
+    def retain(self, groups):
+        """
+        Descarta as janelas que não estão em groups.
+
+        Args:
+            groups: Trios (região, parâmetro, period_days) das janelas ainda em uso
+
+        Returns:
+            O número de janelas descartadas
+        """
+        in_use = {(normalize_region(region), parameter_type, int(period_days * DAY))
+                  for region, parameter_type, period_days in groups}
+        evicted = 0
+        for (region_key, parameter_type), entry in self._series.items():
+            for length in list(entry["windows"]):
+                if (region_key, parameter_type, length) not in in_use:
+                    del entry["windows"][length]
+                    evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def stats(self):
+        return {
+            "series": len(self._series),
+            "windows": sum(len(entry["windows"]) for entry in self._series.values()),
+            "observations": self.observations,
+            "seeded": self.seeded,
+            "evicted": self.evicted
+        }
@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import namedtuple
+from hexbytes import HexBytes
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("least-loaded", "round-robin")
+
+# Remetente escolhido para uma transação; slot identifica a vaga ocupada até o recibo
+SignerLease = namedtuple("SignerLease", ["address", "private_key", "slot"])
+
+class SignerPool:
+    """
+    Distribui as transações entre várias chaves, cada uma com sua própria sequência de nonces.
+
+    Com uma única chave, todas as escritas formam uma fila de nonces e o nó aceita só um
+    número limitado de transações pendentes por conta. Aqui cada chave do pool tem até
+    max_pending transações aguardando recibo; quando todas estão cheias, acquire espera
+    um recibo liberar uma vaga. Só as funções em pooled_functions, e sem valor enviado,
+    usam o pool: as demais dependem de msg.sender (onlyOwner, onlyOracle, votos, etc.)
+    e continuam assinadas pela chave do owner.
+    """
+
+    def __init__(self, signers, owner, pooled_functions, strategy="least-loaded", max_pending=16, pending_timeout=120):
+        """
+        Args:
+            signers: Pares (endereço, chave privada) das chaves do pool; vazio usa só o owner
+            owner: Par (endereço, chave privada) do owner dos contratos
+            pooled_functions: Nomes das funções do contrato que podem ser assinadas por qualquer chave
+            strategy: "least-loaded" (menos pendências) ou "round-robin"
+            max_pending: Transações aguardando recibo por chave do pool
+            pending_timeout: Segundos após os quais uma vaga sem recibo é liberada
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown signer pool strategy: {strategy}. Available: {', '.join(STRATEGIES)}")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.owner = tuple(owner)
+        self.signers = [tuple(signer) for signer in signers] or [self.owner]
+        self.pooled_functions = set(pooled_functions)
+        self.strategy = strategy
+        self.max_pending = max_pending
+        self.pending_timeout = pending_timeout
+        self._slots = itertools.count()
+        self._pending = {address: {} for address, _ in [self.owner, *self.signers]}
+        self._by_hash = {}
+        self._cursor = 0
+        self._released = None
+        self.sent = {address: 0 for address in self._pending}
+        self.pinned = 0
+        self.waits = 0
+
+    def is_pooled(self, function_name, value=0):
+        """Verifica se a função pode ser assinada por qualquer chave do pool"""
+        return not value and function_name in self.pooled_functions
+
+    def _load(self, address):
+        pending = self._pending[address]
+        expired_before = time.monotonic() - self.pending_timeout
+        expired = {slot for slot, started in pending.items() if started < expired_before}
+        if expired:
+            # Sem recibo no prazo (transação descartada ou acompanhada por fora): libera a vaga
+            for slot in expired:
+                del pending[slot]
+            self._by_hash = {
+                tx_hash: lease for tx_hash, lease in self._by_hash.items()
+                if not (lease.address == address and lease.slot in expired)
+            }
+        return len(pending)
+
+    def _choose(self):
+        order = self.signers[self._cursor:] + self.signers[:self._cursor]
+        available = [signer for signer in order if self._load(signer[0]) < self.max_pending]
+        if not available:
+            return None
+        if self.strategy == "round-robin":
+            chosen = available[0]
+        else:
+            # Empates vão para a próxima chave da rotação, para não concentrar numa só
+            chosen = min(available, key=lambda signer: self._load(signer[0]))
+        self._cursor = (self.signers.index(chosen) + 1) % len(self.signers)
+        return chosen
+
+    def _lease(self, signer):
+        slot = next(self._slots)
+        self._pending[signer[0]][slot] = time.monotonic()
+        return SignerLease(signer[0], signer[1], slot)
+
+    async def acquire(self, function_name, value=0):
+        """
+        Reserva o remetente de uma transação.
+
+        Args:
+            function_name: Nome da função do contrato (fn_name)
+            value: O valor em wei enviado com a transação
+
+        Returns:
+            SignerLease com endereço e chave; deve ser passado a bind após o envio ou a cancel se falhar
+        """
+        if not self.is_pooled(function_name, value):
+            self.pinned += 1
+            return self._lease(self.owner)
+        waited = False
+        while True:
+            signer = self._choose()
+            if signer is not None:
+                if waited:
+                    self.waits += 1
+                return self._lease(signer)
+            waited = True
+            if self._released is None:
+                self._released = asyncio.Event()
+            self._released.clear()
+            oldest = min(min(self._pending[address].values()) for address, _ in self.signers)
+            try:
+                await asyncio.wait_for(self._released.wait(), max(oldest + self.pending_timeout - time.monotonic(), 0.01))
+            except asyncio.TimeoutError:
+                pass
+
+    def bind(self, lease, tx_hash):
+        """Associa a vaga ao hash transmitido; o recibo correspondente a libera"""
+        self.sent[lease.address] += 1
+        self._by_hash[Web3.to_hex(HexBytes(tx_hash))] = lease
+
+    def cancel(self, lease):
+        """Libera a vaga de uma transação que não chegou a ser transmitida"""
+        self._pending[lease.address].pop(lease.slot, None)
+        if self._released is not None:
+            self._released.set()
+
+    def sender_of(self, tx_hash):
+        """Endereço que assinou uma transação ainda sem recibo (None se desconhecida)"""
+        lease = self._by_hash.get(Web3.to_hex(HexBytes(tx_hash)))
+        return lease.address if lease else None
+
+    def observe_receipt(self, receipt):
+        """Libera a vaga da transação do recibo (listener do ReceiptPoller)"""
+        lease = self._by_hash.pop(Web3.to_hex(HexBytes(receipt["transactionHash"])), None)
+        if lease is not None:
+            self.cancel(lease)
+
+    def stats(self):
+        return {
+            "strategy": self.strategy,
+            "maxPending": self.max_pending,
+            "pooledFunctions": sorted(self.pooled_functions),
+            "owner": {"address": self.owner[0], "pending": self._load(self.owner[0]), "sent": self.sent[self.owner[0]]},
+            "signers": [
+                {"address": address, "pending": self._load(address), "sent": self.sent[address]}
+                for address, _ in self.signers
+            ],
+            "pinned": self.pinned,
+            "waits": self.waits
+        }
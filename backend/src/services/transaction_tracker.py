@@ -0,0 +1,130 @@
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+from collections import OrderedDict
+
+from .blockchain import broadcast_transaction, get_event_data, gas_estimator
+from .receipt_poller import receipt_poller
+
+logger = logging.getLogger(__name__)
+
+# Quantidade máxima de transações mantidas em memória para consulta
+TRACKER_MAX_RECORDS = 10000
+
+def serialize_event(event):
+    """Converte um evento decodificado em um dicionário serializável em JSON"""
+    def _value(value):
+        if isinstance(value, (bytes, bytearray)):
+            return "0x" + bytes(value).hex()
+        if isinstance(value, (list, tuple)):
+            return [_value(v) for v in value]
+        return value
+
+    return {
+        "event": event["event"],
+        "address": event["address"],
+        "logIndex": event["logIndex"],
+        "args": {name: _value(value) for name, value in event["args"].items()}
+    }
+
+class TransactionTracker:
+    """
+    Acompanha transações transmitidas sem bloquear a requisição HTTP.
+
+    Cada transação submetida recebe um trackingId; uma tarefa em segundo plano espera
+    o recibo, decodifica os eventos pedidos e monta o mesmo resultado que o endpoint
+    devolveria no modo síncrono.
+
+    Os registros ficam na memória do processo: só o worker que recebeu a escrita os
+    conhece, e eles se perdem numa reinicialização (escritas com Idempotency-Key são
+    acompanhadas pelo outbox durável).
+    """
+
+    def __init__(self, max_records=TRACKER_MAX_RECORDS):
+        self.max_records = max_records
+        self._records = OrderedDict()
+        self._tasks = set()
+
+    def get(self, tracking_id):
+        """Retorna o registro de uma transação ou None se não for conhecida"""
+        return self._records.get(tracking_id)
+
+    def _store(self, record):
+        self._records[record["trackingId"]] = record
+        # Descarta os registros mais antigos já finalizados; os pendentes vão para o fim da fila
+        skipped = 0
+        while len(self._records) > self.max_records and skipped < len(self._records):
+            oldest_id = next(iter(self._records))
+            if self._records[oldest_id]["status"] == "pending":
+                self._records.move_to_end(oldest_id)
+                skipped += 1
+            else:
+                self._records.pop(oldest_id)
+
+    async def submit(self, contract_function, value=0, result_builder=None, events=(),
+                     sender_address=None, private_key=None, urgency="standard"):
+        """
+        Transmite uma transação e retorna imediatamente o registro de acompanhamento.
+
+        Args:
+            contract_function: A função do contrato a ser chamada
+            value: O valor em wei a ser enviado com a transação (opcional)
+            result_builder: Função (síncrona ou assíncrona) que recebe o recibo e monta
+                o resultado no formato do endpoint (opcional)
+            events: Pares (contrato, nome do evento) a decodificar do recibo (opcional)
+            sender_address: O endereço do remetente (opcional)
+            private_key: A chave privada do remetente (opcional)
+            urgency: Nível de taxa do fee_oracle (opcional)
+
+        Returns:
+            O registro com trackingId, transactionHash e status "pending"
+        """
+        tx_hash = await broadcast_transaction(contract_function, value, sender_address, private_key, urgency=urgency)
+        record = {
+            "trackingId": uuid.uuid4().hex,
+            "transactionHash": tx_hash.hex(),
+            "status": "pending",
+            "submittedAt": int(time.time()),
+            "blockNumber": None,
+            "gasUsed": None,
+            "events": [],
+            "result": None,
+            "error": None
+        }
+        self._store(record)
+
+        task = asyncio.create_task(self._track(record, tx_hash, contract_function, result_builder, events))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return dict(record)
+
+    async def _track(self, record, tx_hash, contract_function, result_builder, events):
+        try:
+            receipt = await receipt_poller.wait(tx_hash)
+            record["blockNumber"] = receipt["blockNumber"]
+            record["gasUsed"] = receipt["gasUsed"]
+
+            if receipt["status"] != 1:
+                gas_estimator.invalidate(contract_function)
+                record["status"] = "reverted"
+                return
+
+            for contract, event_name in events:
+                for event in get_event_data(contract, event_name, receipt) or []:
+                    record["events"].append(serialize_event(event))
+
+            if result_builder is not None:
+                result = result_builder(receipt)
+                if inspect.isawaitable(result):
+                    result = await result
+                record["result"] = result
+            record["status"] = "mined"
+        except Exception as e:
+            logger.error(f"Error tracking transaction {tx_hash.hex()}: {str(e)}", exc_info=True)
+            record["status"] = "failed"
+            record["error"] = str(e)
+
+# Instância compartilhada usada pelas rotas
+transaction_tracker = TransactionTracker()
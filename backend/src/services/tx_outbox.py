@@ -0,0 +1,132 @@
+import json
+import sqlite3
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Estados: reserved (chave registrada, nada transmitido), signed (transação assinada e gravada,
+# ainda sem confirmação de envio), broadcast (enviada ao nó), mined ou reverted (recibo obtido),
+# failed (descartada: o nonce foi usado por outra transação e não há recibo)
+IN_FLIGHT_STATUSES = ("signed", "broadcast")
+FINAL_STATUSES = ("mined", "reverted", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    idempotency_key TEXT PRIMARY KEY,
+    operation TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    sender TEXT,
+    nonce INTEGER,
+    raw_transaction TEXT,
+    transaction_hash TEXT,
+    block_number INTEGER,
+    gas_used INTEGER,
+    result TEXT,
+    error TEXT,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status);
+"""
+
+class TransactionOutbox:
+    """
+    Registro durável das transações enviadas com uma Idempotency-Key.
+
+    A transação assinada é gravada antes de ser transmitida; assim, uma repetição da mesma
+    requisição encontra o registro em vez de enviar outra transação, e após uma
+    reinicialização as transações em andamento podem ser retransmitidas e acompanhadas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _record(row):
+        if row is None:
+            return None
+        record = dict(row)
+        record["params"] = json.loads(record["params"])
+        record["result"] = json.loads(record["result"]) if record["result"] is not None else None
+        return record
+
+    def get(self, key):
+        """Retorna o registro de uma chave ou None se não for conhecida"""
+        return self._record(self.conn.execute("SELECT * FROM outbox WHERE idempotency_key = ?", (key,)).fetchone())
+
+    def reserve(self, key, operation, fingerprint, params):
+        """
+        Registra a chave antes de qualquer envio.
+
+        Returns:
+            True se a chave foi registrada agora, False se já existia
+        """
+        now = int(time.time())
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, operation, fingerprint, params, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'reserved', ?, ?)",
+                (key, operation, fingerprint, json.dumps(params), now, now)
+            )
+        return cursor.rowcount == 1
+
+    def _update(self, key, **fields):
+        fields["updated_at"] = int(time.time())
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.conn:
+            self.conn.execute(f"UPDATE outbox SET {assignments} WHERE idempotency_key = ?", (*fields.values(), key))
+
+    def mark_signed(self, key, sender, nonce, raw_transaction, transaction_hash):
+        self._update(key, status="signed", sender=sender, nonce=nonce,
+                     raw_transaction=raw_transaction, transaction_hash=transaction_hash)
+
+    def mark_broadcast(self, key, error=None):
+        self._update(key, status="broadcast", error=error)
+
+    def complete(self, key, status, block_number, gas_used, result):
+        self._update(key, status=status, block_number=block_number, gas_used=gas_used,
+                     result=json.dumps(result), error=None)
+
+    def fail(self, key, error):
+        self._update(key, status="failed", error=error)
+
+    def release(self, key, rejected=False):
+        """
+        Apaga uma chave cuja transação não chegou ao nó, liberando-a para nova tentativa.
+
+        Uma transação assinada só é apagada com rejected=True (o nó respondeu recusando-a);
+        após uma falha ambígua (timeout, conexão caída) ela pode ter sido aceita e fica gravada.
+        """
+        statuses = ("reserved", "signed") if rejected else ("reserved",)
+        with self.conn:
+            self.conn.execute(
+                f"DELETE FROM outbox WHERE idempotency_key = ? AND status IN ({', '.join('?' * len(statuses))})",
+                (key, *statuses)
+            )
+
+    def in_flight(self):
+        """Registros com transação assinada ou transmitida e ainda sem recibo"""
+        rows = self.conn.execute(
+            f"SELECT * FROM outbox WHERE status IN ({', '.join('?' * len(IN_FLIGHT_STATUSES))}) ORDER BY sender, nonce",
+            IN_FLIGHT_STATUSES
+        ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def release_abandoned(self):
+        """Apaga as chaves reservadas que nunca chegaram a assinar uma transação (ex.: queda do processo)"""
+        with self.conn:
+            return self.conn.execute("DELETE FROM outbox WHERE status = 'reserved'").rowcount
+
+    def stats(self):
+        counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        return {"path": self.path, "records": sum(counts.values()), **counts}
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+def normalize_region(region):
+    """Normaliza o nome da região para uso como chave ("São Paulo , BR" -> "são paulo,br")"""
+    parts = [" ".join(part.split()) for part in region.split(",")]
+    return ",".join(parts).lower()
+
+class WeatherCache:
+    """
+    Cache LRU de snapshots de clima por região normalizada.
+
+    A OpenWeather atualiza cada região a cada update_interval segundos, então um snapshot
+    vale até dt + update_interval (dt é o horário da observação na resposta). Se essa
+    previsão já passou, o snapshot ainda vale min_ttl segundos, para não repetir a consulta
+    a cada requisição enquanto o provedor não publica a próxima observação.
+    """
+
+    def __init__(self, max_entries=1000, update_interval=600, min_ttl=60):
+        self.max_entries = max_entries
+        self.update_interval = update_interval
+        self.min_ttl = min_ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expires_at(self, snapshot, now):
+        dt = snapshot.get("dt")
+        if isinstance(dt, (int, float)):
+            next_update = dt + self.update_interval
+            if next_update > now:
+                # Não confia em previsões além de um intervalo a partir de agora
+                return min(next_update, now + self.update_interval)
+        return now + self.min_ttl
+
+    def get(self, key):
+        """Retorna o snapshot válido da região ou None"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, snapshot):
+        now = time.time()
+        self._entries[key] = (snapshot, self._expires_at(snapshot, now))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxEntries": self.max_entries,
+            "updateInterval": self.update_interval,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave numa única execução.
+
+    A primeira chamada inicia a tarefa; as que chegam enquanto ela está em andamento
+    aguardam o mesmo resultado (ou a mesma exceção). O cancelamento de quem espera não
+    cancela a tarefa compartilhada.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, factory):
+        """
+        Executa factory() uma única vez por chave entre as chamadas simultâneas.
+
+        Args:
+            key: A chave que identifica a operação (ex.: a região normalizada)
+            factory: Função sem argumentos que devolve a corrotina a executar
+
+        Returns:
+            O resultado da execução compartilhada
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Marca a exceção como lida mesmo que todos os interessados tenham sido cancelados
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def in_flight(self):
+        return len(self._calls)
+
+    def stats(self):
+        return {"executions": self.executions, "coalesced": self.coalesced, "inFlight": self.in_flight}
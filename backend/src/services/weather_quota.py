@@ -0,0 +1,175 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+
+class QuotaExceeded(Exception):
+    """A consulta esperou mais que o permitido por uma vaga na cota do provedor"""
+
+class SlidingWindowLimit:
+    """
+    No máximo capacity chamadas em qualquer intervalo de period segundos.
+
+    As liberações são contadas em buckets de period / buckets segundos; a memória é de no
+    máximo buckets + 1 contadores, qualquer que seja a capacidade (a cota diária tem
+    centenas de milhares de chamadas). Um bucket só deixa a janela quando o seu fim completa
+    period segundos, então cada chamada conta por pelo menos period segundos e o limite vale
+    também para a janela fixa do provedor, qualquer que seja o seu alinhamento (um balde
+    cheio reposto continuamente liberaria até 2 × capacity numa mesma janela). O custo é
+    liberar uma vaga até um bucket depois do estritamente necessário.
+    """
+
+    def __init__(self, name, capacity, period, buckets=60):
+        self.name = name
+        self.capacity = capacity
+        self.period = period
+        self.bucket_width = period / buckets
+        # [índice do bucket, liberações], do mais antigo para o mais recente
+        self._buckets = deque()
+        self._count = 0
+
+    def _expires_at(self, bucket):
+        return (bucket + 1) * self.bucket_width + self.period
+
+    def _expire(self, now):
+        while self._buckets and self._expires_at(self._buckets[0][0]) <= now:
+            self._count -= self._buckets.popleft()[1]
+
+    def remaining(self, now):
+        self._expire(now)
+        return self.capacity - self._count
+
+    def wait_time(self, now):
+        """Segundos até haver uma vaga na janela"""
+        excess = 1 - self.remaining(now)
+        if excess <= 0:
+            return 0.0
+        for bucket, count in self._buckets:
+            excess -= count
+            if excess <= 0:
+                return self._expires_at(bucket) - now
+        return self._expires_at(self._buckets[-1][0]) - now
+
+    def take(self, now):
+        self._expire(now)
+        bucket = int(now // self.bucket_width)
+        if self._buckets and self._buckets[-1][0] == bucket:
+            self._buckets[-1][1] += 1
+        else:
+            self._buckets.append([bucket, 1])
+        self._count += 1
+
+class QuotaScheduler:
+    """
+    Distribui a cota de chamadas do provedor entre as consultas, por prioridade.
+
+    Cada chamada precisa de vaga em todos os limites (ex.: por minuto e por dia). Quando não
+    há vaga, a consulta entra numa fila de prioridade (menor valor primeiro) e é liberada
+    assim que a cota permitir; quem esperar mais que max_wait recebe QuotaExceeded. Um 429 do
+    provedor suspende todas as liberações pelo tempo indicado em Retry-After.
+
+    A contagem é por processo: com N workers do uvicorn, cada um aplica a cota inteira.
+    """
+
+    def __init__(self, limits, max_wait=30.0, default_priority=1.0):
+        self.limits = limits
+        self.max_wait = max_wait
+        self.default_priority = default_priority
+        self.priorities = {}
+        self.granted = 0
+        self.queued = 0
+        self.expired = 0
+        self.rate_limited = 0
+        self.max_wait_seen = 0.0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._dispatcher = None
+
+    def priority(self, key):
+        return self.priorities.get(key, self.default_priority)
+
+    def update_priorities(self, priorities):
+        """Substitui as prioridades por chave (ex.: a distância relativa ao limiar mais próximo)"""
+        self.priorities = dict(priorities)
+
+    def pause(self, seconds):
+        """Suspende as liberações (após um 429 do provedor)"""
+        self.rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _wait_time(self, now):
+        return max([self._paused_until - now] + [limit.wait_time(now) for limit in self.limits])
+
+    def _take(self, now):
+        for limit in self.limits:
+            limit.take(now)
+        self.granted += 1
+
+    async def acquire(self, priority=None):
+        """
+        Aguarda uma vaga na cota.
+
+        Args:
+            priority: Prioridade da consulta; menor é mais urgente (opcional, padrão: default_priority)
+
+        Raises:
+            QuotaExceeded: Se a vaga não sair em max_wait segundos
+        """
+        now = time.monotonic()
+        if not self._queue and self._wait_time(now) <= 0:
+            self._take(now)
+            return
+
+        priority = self.default_priority if priority is None else priority
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), now, future))
+        self.queued += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        while self._queue:
+            now = time.monotonic()
+            # Descarta quem desistiu e quem passou do tempo máximo de espera
+            for _, _, enqueued_at, future in self._queue:
+                if not future.done() and now - enqueued_at > self.max_wait:
+                    self.expired += 1
+                    future.set_exception(QuotaExceeded(f"Weather quota exhausted: waited more than {self.max_wait}s"))
+            self._queue = [entry for entry in self._queue if not entry[3].done()]
+            heapq.heapify(self._queue)
+            if not self._queue:
+                break
+
+            wait = self._wait_time(now)
+            if wait <= 0:
+                _, _, enqueued_at, future = heapq.heappop(self._queue)
+                self._take(now)
+                self.max_wait_seen = max(self.max_wait_seen, now - enqueued_at)
+                future.set_result(None)
+                continue
+            oldest = min(entry[2] for entry in self._queue)
+            await asyncio.sleep(max(0.001, min(wait, oldest + self.max_wait - now)))
+
+    @property
+    def queue_depth(self):
+        return sum(1 for entry in self._queue if not entry[3].done())
+
+    def stats(self):
+        now = time.monotonic()
+        budget = {}
+        for limit in self.limits:
+            budget[limit.name] = {"limit": limit.capacity, "remaining": limit.remaining(now)}
+        return {
+            "queueDepth": self.queue_depth,
+            "budget": budget,
+            "granted": self.granted,
+            "queued": self.queued,
+            "expired": self.expired,
+            "rateLimited": self.rate_limited,
+            "pausedFor": round(max(0.0, self._paused_until - now), 3),
+            "maxWaitSeen": round(self.max_wait_seen, 3),
+            "prioritizedKeys": len(self.priorities)
+        }
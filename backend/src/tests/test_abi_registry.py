@@ -0,0 +1,46 @@
+import json
+import logging
+from ..utils import config
+from ..utils.abi_registry import ABIRegistry
+
+ABI = [
+    {"type": "function", "name": "getPolicyDetails", "stateMutability": "view",
+     "inputs": [{"name": "policyId", "type": "uint256"}], "outputs": []},
+    {"type": "function", "name": "owner", "stateMutability": "view", "inputs": [],
+     "outputs": [{"name": "", "type": "address"}]},
+    {"type": "function", "name": "processClaim", "stateMutability": "nonpayable",
+     "inputs": [{"name": "policyId", "type": "uint256"}], "outputs": []},
+    {"type": "event", "name": "PolicyCancelled", "anonymous": False, "inputs": [
+        {"name": "policyId", "type": "uint256", "indexed": True},
+        {"name": "refundAmount", "type": "uint256", "indexed": False}]},
+]
+
+def test_capabilities_lookups():
+    capabilities = ABIRegistry({"insurance": ABI})["insurance"]
+    assert capabilities.has_function("getPolicyDetails")
+    assert not capabilities.has_function("getActivePolicies")
+    assert capabilities.has_event("PolicyCancelled")
+    assert capabilities.view_functions == ("owner",)
+
+def test_selectors_and_topics():
+    capabilities = ABIRegistry({"insurance": ABI})["insurance"]
+    assert capabilities.selector("owner").hex().removeprefix("0x") == "8da5cb5b"
+    topic = capabilities.topic("PolicyCancelled")
+    assert len(topic) == 32
+    assert capabilities.events_by_topic[topic]["name"] == "PolicyCancelled"
+
+def test_incomplete_or_invalid_bundle_falls_back_to_artifacts_with_a_warning(monkeypatch, tmp_path, caplog):
+    bundle = tmp_path / "abis.json"
+    monkeypatch.setattr(config, "ABI_BUNDLE_PATH", str(bundle))
+    monkeypatch.setattr(config, "load_contract_abi", lambda artifact: ABI)
+
+    bundle.write_text(json.dumps({"insurance": ABI}))
+    with caplog.at_level(logging.WARNING, logger=config.__name__):
+        abis = config.load_contract_abis()
+    assert set(abis) == set(config.CONTRACT_ARTIFACTS)
+    assert "is missing oracle" in caplog.records[-1].getMessage()
+
+    bundle.write_text("{")
+    with caplog.at_level(logging.WARNING, logger=config.__name__):
+        config.load_contract_abis()
+    assert caplog.records[-1].levelno == logging.WARNING and "Invalid ABI bundle" in caplog.records[-1].getMessage()
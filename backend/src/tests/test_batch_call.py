@@ -0,0 +1,112 @@
+import asyncio
+import math
+import pytest
+from eth_abi import decode, encode
+from eth_utils import function_abi_to_4byte_selector
+from web3 import AsyncWeb3
+from web3.exceptions import ContractLogicError
+from ..services import blockchain
+from ..tools.chain_standin import ChainStandIn, RPCError
+
+CONTRACT_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+READER_ABI = [
+    {"type": "function", "name": "premiumOf", "stateMutability": "view",
+     "inputs": [{"name": "policyId", "type": "uint256"}], "outputs": [{"name": "", "type": "uint256"}]},
+    {"type": "function", "name": "describe", "stateMutability": "view",
+     "inputs": [{"name": "policyId", "type": "uint256"}],
+     "outputs": [{"name": "region", "type": "string"}, {"name": "owner", "type": "address"}]}
+]
+SELECTORS = {function_abi_to_4byte_selector(entry): entry["name"] for entry in READER_ABI}
+OWNER = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+MISSING_POLICY = 13
+
+class ReaderChain(ChainStandIn):
+    """Nó local com um contrato de leitura e o Multicall3 (aggregate3) implementados em Python"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.aggregate_sizes = []
+
+    def execute(self, data):
+        name = SELECTORS[data[:4]]
+        (policy_id,) = decode(["uint256"], data[4:])
+        if policy_id == MISSING_POLICY:
+            raise RPCError("execution reverted: policy not found", code=3)
+        if name == "premiumOf":
+            return encode(["uint256"], [policy_id * 10 ** 15])
+        return encode(["string", "address"], [f"Region{policy_id},BR", OWNER])
+
+    def rpc_eth_call(self, params):
+        data = bytes.fromhex(params[0]["data"][2:])
+        if params[0]["to"].lower() != MULTICALL3_ADDRESS.lower():
+            return "0x" + self.execute(data).hex()
+        (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+        self.aggregate_sizes.append(len(calls))
+        results = []
+        for _, _, call_data in calls:
+            try:
+                results.append((True, self.execute(call_data)))
+            except RPCError:
+                results.append((False, b""))
+        return "0x" + encode(["(bool,bytes)[]"], [results]).hex()
+
+def run_batch(monkeypatch, standin, policy_ids, multicall=False, chunk_size=4):
+    w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url))
+    monkeypatch.setattr(blockchain, "async_w3", w3)
+    monkeypatch.setattr(blockchain, "BATCH_CALL_CHUNK_SIZE", chunk_size)
+    monkeypatch.setattr(blockchain, "MULTICALL3_ADDRESS", MULTICALL3_ADDRESS if multicall else None)
+    contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=READER_ABI)
+    calls = [
+        fn for policy_id in policy_ids
+        for fn in (contract.functions.premiumOf(policy_id), contract.functions.describe(policy_id))
+    ]
+    requests_before = standin.request_count
+    results = asyncio.run(blockchain.batch_call(calls))
+    return results, standin.request_count - requests_before
+
+@pytest.mark.parametrize("multicall", [False, True])
+def test_outputs_are_decoded_like_call(monkeypatch, multicall):
+    with ReaderChain(latency=0) as standin:
+        results, _ = run_batch(monkeypatch, standin, [1, 2], multicall)
+
+    assert results == [10 ** 15, ["Region1,BR", OWNER], 2 * 10 ** 15, ["Region2,BR", OWNER]]
+
+@pytest.mark.parametrize("multicall", [False, True])
+def test_a_reverted_call_does_not_affect_the_others(monkeypatch, multicall):
+    with ReaderChain(latency=0) as standin:
+        results, _ = run_batch(monkeypatch, standin, [1, MISSING_POLICY, 3], multicall)
+
+    assert isinstance(results[2], ContractLogicError) and isinstance(results[3], ContractLogicError)
+    assert "premiumOf" in str(results[2]) and "describe" in str(results[3])
+    assert results[:2] == [10 ** 15, ["Region1,BR", OWNER]]
+    assert results[4:] == [3 * 10 ** 15, ["Region3,BR", OWNER]]
+
+def assert_in_order(results, policy_ids):
+    assert results[::2] == [policy_id * 10 ** 15 for policy_id in policy_ids]
+    assert [region for region, _ in results[1::2]] == [f"Region{policy_id},BR" for policy_id in policy_ids]
+
+def test_json_rpc_batches_are_split_in_chunks(monkeypatch):
+    policy_ids = list(range(1, 12))
+    # O nó recusa lotes acima de 5 chamadas: um bloco maior falharia por inteiro
+    with ReaderChain(latency=0, max_batch_size=5) as standin:
+        results, requests = run_batch(monkeypatch, standin, policy_ids, chunk_size=5)
+        rpc_calls = standin.rpc_call_count
+
+    # 22 chamadas em blocos de 5: uma requisição HTTP por bloco
+    assert requests == math.ceil(2 * len(policy_ids) / 5)
+    assert rpc_calls == 2 * len(policy_ids)
+    assert_in_order(results, policy_ids)
+
+def test_multicall_aggregates_are_split_in_chunks(monkeypatch):
+    policy_ids = list(range(1, 12))
+    with ReaderChain(latency=0) as standin:
+        results, _ = run_batch(monkeypatch, standin, policy_ids, multicall=True, chunk_size=5)
+
+    assert standin.aggregate_sizes == [5, 5, 5, 5, 2]
+    assert_in_order(results, policy_ids)
+
+def test_empty_batch_makes_no_request(monkeypatch):
+    with ReaderChain(latency=0) as standin:
+        results, requests = run_batch(monkeypatch, standin, [])
+    assert results == [] and requests == 0
@@ -0,0 +1,119 @@
+import asyncio
+from web3 import AsyncWeb3
+from ..services import chain_params
+from ..services.chain_params import ChainParameters, GasEstimator
+
+ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+SENDER = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+ABI = [{
+    "type": "function", "name": "createPolicy", "stateMutability": "nonpayable", "outputs": [],
+    "inputs": [{"name": "region", "type": "string"}, {"name": "amount", "type": "uint256"}]
+}]
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def contract_function(region, amount=1, estimates=None):
+    """Chamada real do contrato (o calldata é codificado pelo web3) com estimate_gas falso"""
+    fn = AsyncWeb3().eth.contract(address=ADDRESS, abi=ABI).functions.createPolicy(region, amount)
+
+    async def estimate_gas(transaction):
+        assert transaction["from"] == SENDER
+        estimates.append(region)
+        return 50000 + 100 * len(region)
+
+    fn.estimate_gas = estimate_gas
+    return fn
+
+def test_estimates_are_cached_per_calldata_size_until_the_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(chain_params.time, "monotonic", clock)
+    estimator = GasEstimator(margin=1.5, ttl=60, default_gas=300000)
+    estimates = []
+
+    async def run():
+        first = await estimator.gas_limit(contract_function("Salvador,BR", 1, estimates), SENDER)
+        # Mesmo tamanho de calldata: reutiliza a estimativa
+        same_size = await estimator.gas_limit(contract_function("Recife,BR00", 2, estimates), SENDER)
+        longer = await estimator.gas_limit(contract_function("Salvador,BR" * 10, 1, estimates), SENDER)
+        clock.now += 61
+        expired = await estimator.gas_limit(contract_function("Salvador,BR", 1, estimates), SENDER)
+        return first, same_size, longer, expired
+
+    first, same_size, longer, expired = asyncio.run(run())
+    assert first == same_size == expired == int((50000 + 1100) * 1.5)
+    assert longer == int((50000 + 11000) * 1.5)
+    assert estimates == ["Salvador,BR", "Salvador,BR" * 10, "Salvador,BR"]
+
+def test_invalidate_drops_every_size_of_the_function():
+    estimator = GasEstimator(margin=1, ttl=60, default_gas=300000)
+    estimates = []
+
+    async def run():
+        for region in ("Salvador,BR", "Salvador,BR" * 10):
+            await estimator.gas_limit(contract_function(region, 1, estimates), SENDER)
+        estimator.invalidate(contract_function("Recife,BR", 1, estimates))
+        for region in ("Salvador,BR", "Salvador,BR" * 10):
+            await estimator.gas_limit(contract_function(region, 1, estimates), SENDER)
+
+    asyncio.run(run())
+    assert len(estimates) == 4
+
+def test_failed_estimate_uses_the_default_and_is_not_cached():
+    estimator = GasEstimator(margin=1.2, ttl=60, default_gas=300000)
+    fn = contract_function("Salvador,BR", estimates=[])
+
+    async def revert(transaction):
+        raise ValueError("execution reverted")
+
+    fn.estimate_gas = revert
+    assert asyncio.run(estimator.gas_limit(fn, SENDER)) == 300000
+    assert estimator._estimates == {}
+
+class FakeEth:
+    def __init__(self):
+        self.calls = {"chain_id": 0, "gas_price": 0}
+        self.price = 10 ** 9
+
+    async def _value(self, name, value):
+        self.calls[name] += 1
+        return value
+
+    @property
+    def chain_id(self):
+        return self._value("chain_id", 31337)
+
+    @property
+    def gas_price(self):
+        return self._value("gas_price", self.price)
+
+def test_chain_parameters_refresh_on_ttl_and_new_block(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(chain_params.time, "monotonic", clock)
+    eth = FakeEth()
+    params = ChainParameters(type("W3", (), {"eth": eth})(), fee_ttl=10)
+
+    async def run():
+        assert [await params.chain_id() for _ in range(3)] == [31337] * 3
+        prices = [await params.gas_price() for _ in range(3)]
+        eth.price = 2 * 10 ** 9
+        clock.now += 5
+        prices.append(await params.gas_price())
+        clock.now += 6
+        prices.append(await params.gas_price())
+        eth.price = 3 * 10 ** 9
+        params.on_new_block(7)
+        prices.append(await params.gas_price())
+        # O mesmo bloco informado de novo não invalida o cache
+        eth.price = 4 * 10 ** 9
+        params.on_new_block(7)
+        prices.append(await params.gas_price())
+        return prices
+
+    prices = asyncio.run(run())
+    assert prices == [10 ** 9] * 4 + [2 * 10 ** 9] + [3 * 10 ** 9] * 2
+    assert eth.calls == {"chain_id": 1, "gas_price": 3}
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from ..services.claim_engine import ClaimRuleTable, ClaimEvaluationJob
+
+NOW = int(time.time())
+
+def make_policy(policy_id, region, parameters, coverage=10**19, active=True, claim_paid=0, start=NOW - 100, end=NOW + 100):
+    policy = (policy_id, "0xfarmer", coverage, 10**17, start, end, active, claim_paid > 0, claim_paid, 0, b"", region, "soja")
+    return policy, parameters
+
+def snapshot(**values):
+    return {"values": values, "errors": {}}
+
+def test_evaluate_follows_trigger_direction_and_eligibility():
+    policies = [
+        make_policy(1, "Salvador,BR", [("rainfall", 5000, 30, False, 5000)]),
+        make_policy(2, "salvador, br", [("temperature", 35000, 30, True, 2500)]),
+        make_policy(3, "Cuiaba,BR", [("rainfall", 5000, 30, False, 5000)]),
+        make_policy(4, "Salvador,BR", [("rainfall", 5000, 30, False, 5000)], active=False),
+        make_policy(5, "Salvador,BR", [("rainfall", 5000, 30, False, 5000)], end=NOW - 1),
+        make_policy(6, "Salvador,BR", [("snow", 1, 30, True, 5000)]),
+    ]
+    table = ClaimRuleTable(policies, now=NOW)
+    assert table.policy_ids == [1, 2, 3, 6]
+    assert set(table.regions) == {"salvador,br", "cuiaba,br"}
+    assert table.skipped_rules == 1
+
+    values, valid = table.group_values({
+        "salvador,br": snapshot(rainfall=1000, temperature=36000),
+        "cuiaba,br": None
+    })
+    claims = table.evaluate(values, valid)
+    assert [(c["policyId"], c["payoutAmount"]) for c in claims] == [(1, 5 * 10**18), (2, 25 * 10**17)]
+    assert claims[0]["region"] == "Salvador,BR" and claims[0]["evaluatedValue"] == 1000
+    # Temperatura a 1000 do limiar de 35000: a região mais perto de disparar; sem leitura, sem margem
+    assert table.region_margins(values, valid) == {"salvador,br": 1000 / 35000}
+
+def test_evaluate_picks_highest_payout_and_caps_remaining_coverage():
+    policies = [
+        make_policy(1, "Salvador,BR", [
+            ("rainfall", 5000, 30, False, 2000),
+            ("humidity", 5000, 30, True, 8000),
+            ("rainfall", 9999, 30, True, 10000),  # Repetido: o contrato usa o primeiro
+        ], coverage=1000, claim_paid=500)
+    ]
+    table = ClaimRuleTable(policies, now=NOW)
+    values, valid = table.group_values({"salvador,br": snapshot(rainfall=0, humidity=9000)})
+    claims = table.evaluate(values, valid)
+    assert len(claims) == 1
+    assert claims[0]["parameterType"] == "humidity"
+    assert claims[0]["payoutAmount"] == 500
+
+def test_windowed_groups_use_the_period_aggregate():
+    policies = [
+        make_policy(1, "Salvador,BR", [("rainfall", 5000, 30, False, 5000)]),
+        make_policy(2, "Salvador,BR", [("rainfall", 5000, 0, False, 5000)]),
+    ]
+    table = ClaimRuleTable(policies, now=NOW)
+    assert len(table.groups) == 2
+
+    def window_reader(region, parameter_type, period_days, now):
+        assert (region, parameter_type, period_days) == ("Salvador,BR", "rainfall", 30)
+        return 8000, {}
+
+    values, valid = table.group_values({"salvador,br": snapshot(rainfall=1000)}, window_reader, NOW)
+    # Acumulado de 30 dias acima do limiar; leitura instantânea abaixo
+    assert [c["policyId"] for c in table.evaluate(values, valid)] == [2]
+
+    # Janela parcial: o grupo do período fica sem leitura em vez de usar a instantânea
+    values, valid = table.group_values({"salvador,br": snapshot(rainfall=1000)},
+                                       lambda *args: (None, {"partial": True}), NOW)
+    assert [c["policyId"] for c in table.evaluate(values, valid)] == [2]
+    assert valid.tolist().count(False) == 1
+
+def test_job_fetches_each_region_once_and_reports_stages():
+    policies = [make_policy(i, f"Region{i % 3},BR", [("rainfall", 5000, 30, False, 5000)]) for i in range(1, 31)]
+    fetched = []
+    received = []
+
+    async def policy_loader():
+        return policies
+
+    async def weather_loader(regions):
+        fetched.append(sorted(regions))
+        return {key: snapshot(rainfall=1000 if key == "region0,br" else 9000) for key in regions}, {}
+
+    margins = []
+    job = ClaimEvaluationJob(policy_loader=policy_loader, weather_loader=weather_loader, window_reader=None,
+                             priority_sink=margins.append)
+    job.add_listener(received.extend)
+    report = asyncio.run(job.run_once())
+
+    assert fetched == [["region0,br", "region1,br", "region2,br"]]
+    assert report["regions"] == 3 and report["rules"] == 30
+    assert sorted(c["policyId"] for c in report["triggered"]) == list(range(3, 31, 3))
+    assert received == report["triggered"]
+    assert margins == [{"region0,br": 0.8, "region1,br": 0.8, "region2,br": 0.8}]
+    assert set(report["stagesMs"]) == {"loadPolicies", "buildRules", "fetchWeather", "evaluate"}
+
+def test_job_keeps_only_the_windows_of_active_rules():
+    policies = [
+        make_policy(1, "Salvador,BR", [("rainfall", 5000, 30, False, 5000), ("temperature", 3000, 0, True, 5000)]),
+        make_policy(2, "Recife,BR", [("rainfall", 5000, 7, False, 5000)], active=False),
+    ]
+    retained = []
+
+    async def policy_loader():
+        return policies
+
+    async def weather_loader(regions):
+        return {key: snapshot(rainfall=1000, temperature=2000) for key in regions}, {}
+
+    job = ClaimEvaluationJob(policy_loader=policy_loader, weather_loader=weather_loader,
+                             window_reader=lambda *args: (None, {"partial": True}),
+                             priority_sink=None, window_sink=retained.append)
+    asyncio.run(job.run_once())
+    # A apólice inativa e a regra de leitura instantânea não mantêm janelas
+    assert retained == [[("Salvador,BR", "rainfall", 30)]]
@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+from hexbytes import HexBytes
+from eth_utils import function_signature_to_4byte_selector
+from web3 import AsyncWeb3
+from ..services import claim_submitter
+from ..services.claim_submitter import ClaimBatchSubmitter
+from ..tools.benchmark_claim_submitter import PROCESS_CLAIM_ABI, CONTRACT_ADDRESS
+
+class FakeChain:
+    """Transmite na ordem recebida e confirma cada transação depois de um pequeno atraso"""
+
+    def __init__(self, revert=(), reject=()):
+        self.revert = set(revert)
+        self.reject = set(reject)
+        self.broadcast = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def broadcaster(self, contract_function, urgency="standard"):
+        policy_id = contract_function.args[0]
+        if policy_id in self.reject:
+            raise ValueError("execution reverted: policy not eligible")
+        self.broadcast.append(policy_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return HexBytes(policy_id.to_bytes(32, "big"))
+
+    async def receipt_waiter(self, tx_hash):
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        policy_id = int.from_bytes(tx_hash, "big")
+        return {"blockNumber": 10 + len(self.broadcast), "gasUsed": 50000, "status": 0 if policy_id in self.revert else 1}
+
+def make_submitter(chain, window):
+    return ClaimBatchSubmitter(
+        window=window,
+        claim_function=lambda policy_id, climate_data: SimpleNamespace(address="0xinsurance", selector="0x1", args=(policy_id, climate_data)),
+        broadcaster=chain.broadcaster, receipt_waiter=chain.receipt_waiter
+    )
+
+def test_batch_keeps_order_and_respects_the_window():
+    chain = FakeChain()
+    submitter = make_submitter(chain, window=4)
+    report = asyncio.run(submitter.submit([(policy_id, 100, None) for policy_id in range(1, 21)]))
+
+    assert chain.broadcast == list(range(1, 21))
+    assert chain.max_in_flight == 4 and submitter.max_in_flight == 4
+    assert report["mined"] == 20 and report["totalPayout"] == 2000
+    assert [r["policyId"] for r in report["results"]] == list(range(1, 21))
+
+def test_report_has_a_result_per_policy():
+    chain = FakeChain(revert={2}, reject={3})
+    report = asyncio.run(make_submitter(chain, window=2).submit([(1, 10, None), (2, 20, None), (3, 30, None), (4, 40, None)]))
+
+    assert [r["status"] for r in report["results"]] == ["mined", "reverted", "failed", "mined"]
+    assert "not eligible" in report["results"][2]["error"]
+    assert report["results"][2]["transactionHash"] is None
+    assert (report["mined"], report["reverted"], report["failed"], report["totalPayout"]) == (2, 1, 1, 50)
+
+def test_process_claim_encodes_against_the_contract_abi(monkeypatch):
+    contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=PROCESS_CLAIM_ABI)
+    monkeypatch.setattr(claim_submitter, "insurance_contract", contract)
+    climate_data = {
+        "requestId": b"\x01" * 32, "parameterType": "rainfall", "measuredValue": 1200,
+        "timestamp": 1700000000, "dataSource": "OpenWeather", "signature": b"\x02"
+    }
+    calldata = claim_submitter._process_claim(7, climate_data)._encode_transaction_data()
+
+    # Seletor da assinatura de IAgroChainInsurance.sol: processClaim(uint256, ClimateData calldata)
+    selector = function_signature_to_4byte_selector("processClaim(uint256,(bytes32,string,uint256,uint256,string,bytes))")
+    assert calldata[:10] == "0x" + selector.hex()
+    _, args = contract.decode_function_input(calldata)
+    assert args["_policyId"] == 7
+    assert args["_climateData"] == climate_data
@@ -0,0 +1,37 @@
+import os
+import pytest
+from ..services.climate_store import ClimateSeriesStore, RECORD_DTYPE
+
+def test_range_queries_and_duplicate_observations(tmp_path):
+    store = ClimateSeriesStore(str(tmp_path))
+    for hour in range(48):
+        store.append("Salvador,BR", "rainfall", 3600 * hour, hour)
+    # O mesmo dt relido do cache não é gravado de novo
+    assert not store.append("salvador, br", "rainfall", 3600 * 47, 999)
+
+    summary = store.aggregate("Salvador,BR", "rainfall", 3600 * 24, 3600 * 47)
+    assert summary["count"] == 24
+    assert summary["sum"] == sum(range(24, 48))
+    assert (summary["min"], summary["max"]) == (24, 47)
+    timestamps, values = store.query("Salvador,BR", "rainfall", 3600 * 46)
+    assert timestamps.tolist() == [3600 * 46, 3600 * 47] and values.tolist() == [46, 47]
+    assert store.aggregate("Cuiaba,BR", "rainfall")["count"] == 0
+
+def test_survives_restart_and_truncates_partial_record(tmp_path):
+    store = ClimateSeriesStore(str(tmp_path))
+    store.record_snapshot({"region": "São Paulo,BR", "dt": 100, "values": {"rainfall": 5, "humidity": None}})
+    store.append_many("São Paulo,BR", "rainfall", [200, 300], [6, 7])
+    path = store._series_for("São Paulo,BR", "rainfall").path
+    with open(path, "ab") as f:
+        f.write(b"\x00" * (RECORD_DTYPE.itemsize // 2))
+
+    reopened = ClimateSeriesStore(str(tmp_path))
+    assert reopened.series_keys() == [("são paulo,br", "rainfall")]
+    assert reopened.aggregate("sao paulo,br", "rainfall")["count"] == 0
+    assert reopened.aggregate("São Paulo,BR", "rainfall")["sum"] == 18
+    assert os.path.getsize(path) == 3 * RECORD_DTYPE.itemsize
+
+def test_rejects_out_of_order_batches(tmp_path):
+    store = ClimateSeriesStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.append_many("Salvador,BR", "rainfall", [300, 200], [1, 2])
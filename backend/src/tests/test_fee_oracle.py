@@ -0,0 +1,74 @@
+import asyncio
+from eth_account import Account
+from web3 import AsyncWeb3
+from ..services.chain_params import FeeOracle
+from ..services.receipt_poller import ReceiptPoller
+from ..tools.chain_standin import ChainStandIn
+
+DEV_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+RECIPIENT = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+TIERS = {"economy": (20, 1.25), "standard": (50, 2), "urgent": (90, 3)}
+
+def make_oracle(w3):
+    return FeeOracle(w3, TIERS, history_blocks=10, min_priority_fee=10 ** 8, ttl=60)
+
+def test_fee_history_is_fetched_once_per_block():
+    with ChainStandIn(latency=0, base_fee=10 ** 9) as standin:
+        async def run():
+            oracle = make_oracle(AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url)))
+            calls_before = standin.rpc_call_count
+            fees = await asyncio.gather(*(oracle.fees(name) for name in TIERS for _ in range(20)))
+            calls = standin.rpc_call_count - calls_before
+            oracle.on_new_block(standin.block_number)
+            await oracle.fees("urgent")
+            refreshes_same_block = oracle.refreshes
+            standin.mine_block()
+            oracle.on_new_block(standin.block_number)
+            await oracle.fees("urgent")
+            return fees, calls, refreshes_same_block, oracle.refreshes
+
+        fees, calls, refreshes_same_block, refreshes = asyncio.run(run())
+
+    assert calls == 1 and refreshes_same_block == 1 and refreshes == 2
+    economy, standard, urgent = fees[0], fees[20], fees[40]
+    assert economy["maxFeePerGas"] < standard["maxFeePerGas"] < urgent["maxFeePerGas"]
+    assert all(tier["maxPriorityFeePerGas"] >= 10 ** 8 for tier in (economy, standard, urgent))
+
+def test_legacy_node_falls_back_to_gas_price():
+    with ChainStandIn(latency=0) as standin:
+        async def run():
+            oracle = make_oracle(AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url)))
+            return await oracle.fees("standard"), oracle.stats()
+
+        fees, stats = asyncio.run(run())
+    assert fees is None and stats["legacy"]
+
+def test_paid_fees_are_compared_with_the_estimate():
+    # Blocos de 4 transações: com 12 pendentes a base fee sobe e o nível economy paga menos gorjeta
+    with ChainStandIn(latency=0, block_time=0.2, max_txs_per_block=4, base_fee=10 ** 9) as standin:
+        async def run():
+            w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url))
+            oracle = make_oracle(w3)
+            poller = ReceiptPoller(w3, poll_interval=0.05, timeout=10)
+            poller.add_block_listener(oracle.on_new_block)
+            poller.add_listener(oracle.observe_receipt)
+            account = Account.from_key(DEV_PRIVATE_KEY)
+            hashes = []
+            for nonce in range(12):
+                urgency = list(TIERS)[nonce % 3]
+                fees = await oracle.fees(urgency)
+                tx = {"to": RECIPIENT, "value": 1, "gas": 21000, "nonce": nonce, "chainId": 31337, **fees}
+                tx_hash = await w3.eth.send_raw_transaction(account.sign_transaction(tx).raw_transaction)
+                oracle.track(tx_hash, urgency, fees)
+                hashes.append(tx_hash)
+            await asyncio.gather(*(poller.wait(tx_hash) for tx_hash in hashes))
+            await poller.stop()
+            return oracle.stats()
+
+        stats = asyncio.run(run())
+
+    for name, tier in stats["tiers"].items():
+        assert tier["transactions"] == tier["confirmed"] == 4
+        assert tier["avgEffectiveGasPrice"] <= tier["avgMaxFeePerGas"]
+        assert tier["paidToMaxFeeRatio"] <= 1
+    assert stats["tiers"]["economy"]["paidToMaxFeeRatio"] > stats["tiers"]["urgent"]["paidToMaxFeeRatio"]
@@ -0,0 +1,44 @@
+import json
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from ..utils.http_encoding import EncodedResponseCache, choose_encoding, etag_matches, brotli
+
+def make_client(cache, payload, etag='W/"1700000000-abc"'):
+    app = FastAPI()
+    built = []
+
+    @app.get("/weather")
+    async def weather(request: Request):
+        return cache.respond(request, etag, lambda: built.append(1) or payload)
+
+    return TestClient(app), built
+
+def test_choose_encoding_and_etag_matching():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding(None) is None
+    assert choose_encoding("br, gzip") == ("br" if brotli is not None else "gzip")
+    assert etag_matches('"x", W/"1700000000-abc"', 'W/"1700000000-abc"')
+    assert etag_matches("*", 'W/"1"')
+    assert not etag_matches('W/"1699999999-abc"', 'W/"1700000000-abc"')
+
+def test_large_bodies_are_compressed_once_per_version():
+    payload = {"region": "Salvador,BR", "rawData": {"values": list(range(500))}}
+    client, built = make_client(EncodedResponseCache(min_size=100), payload)
+
+    for _ in range(3):
+        response = client.get("/weather", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == payload
+    assert int(response.headers["content-length"]) < len(json.dumps(payload))
+    assert len(built) == 1
+
+def test_unchanged_version_answers_304_without_a_body():
+    cache = EncodedResponseCache(min_size=10**6)
+    client, built = make_client(cache, {"region": "Salvador,BR", "temperature": 30.5})
+
+    first = client.get("/weather", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in first.headers
+    second = client.get("/weather", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304 and second.content == b""
+    assert cache.stats()["notModified"] == 1 and len(built) == 1
@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+from ..services import indexer
+from ..services.indexer import EventIndexer
+from ..services.policy_store import PolicyStore
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class FakeEth:
+    def __init__(self, block_number):
+        self.current = block_number
+        self.down = False
+
+    async def _block_number(self):
+        if self.down:
+            raise ConnectionError("node unreachable")
+        return self.current
+
+    @property
+    def block_number(self):
+        return self._block_number()
+
+def test_is_synced_turns_false_when_the_head_stops_updating(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(indexer.time, "monotonic", clock)
+    eth = FakeEth(100)
+    store = SimpleNamespace(get_checkpoint=lambda: 100, get_policies_missing_details=lambda limit: [])
+    events = EventIndexer(SimpleNamespace(eth=eth), store, [], poll_interval=2, max_lag=5, stale_polls=5)
+    assert not events.is_synced
+
+    asyncio.run(events.sync_once())
+    assert events.is_synced
+
+    # O nó caiu: o ciclo falha antes de atualizar a cabeça, que fica congelada no bloco 100
+    eth.down = True
+    clock.now += 9
+    try:
+        asyncio.run(events.sync_once())
+    except ConnectionError:
+        pass
+    assert events.is_synced and events.head == 100
+    clock.now += 2
+    assert not events.is_synced
+
+    # O nó voltou e o store continua no checkpoint
+    eth.down = False
+    asyncio.run(events.sync_once())
+    assert events.is_synced
+
+def created_event(policy_id, block_number):
+    args = {"policyId": policy_id, "farmer": "0xFarmer", "coverageAmount": 10 ** 19, "cropType": "Soja"}
+    return {"event": "PolicyCreated", "args": args, "blockNumber": block_number, "transactionHash": None}
+
+def policy_details(policy_id):
+    policy = (policy_id, "0xFarmer", 10 ** 19, 10 ** 17, 100, 200, False, False, 0, 0, b"", "Bahia,BR", "Soja")
+    return policy, []
+
+def test_policies_without_details_are_backfilled(monkeypatch, tmp_path):
+    store = PolicyStore(str(tmp_path / "index.db"))
+    # A leitura em lote de getPolicyDetails falhou para a apólice 2 quando o bloco foi indexado
+    store.apply_events([created_event(1, 5), created_event(2, 5)], 5, {1: policy_details(1)})
+    assert store.get_policies_missing_details() == [2]
+    assert store.get_policy(2)["region"] is None
+
+    failing = {2}
+
+    async def batch_call(calls):
+        return [RuntimeError("execution reverted") if policy_id in failing else policy_details(policy_id)
+                for policy_id in calls]
+
+    monkeypatch.setattr(indexer, "batch_call", batch_call)
+    monkeypatch.setattr(indexer, "insurance_contract", SimpleNamespace(
+        functions=SimpleNamespace(getPolicyDetails=lambda policy_id: policy_id)
+    ))
+    events = EventIndexer(SimpleNamespace(eth=FakeEth(5)), store, [])
+
+    asyncio.run(events.sync_once())
+    assert store.get_policies_missing_details() == [2] and events.backfilled == 0
+
+    failing.clear()
+    asyncio.run(events.sync_once())
+    assert store.get_policies_missing_details() == [] and events.backfilled == 1
+    policy = store.get_policy(2)
+    assert (policy["region"], policy["startDate"], policy["endDate"]) == ("Bahia,BR", 100, 200)
+    assert store.top_values("region") == [("Bahia,BR", 2)]
@@ -0,0 +1,46 @@
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from ..services.log_decoder import LogDecoder
+from ..utils.abi_registry import ABIRegistry
+
+INSURANCE = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+OTHER = "0x000000000000000000000000000000000000dEaD"
+
+ABI = [{"type": "event", "name": "PolicyCancelled", "anonymous": False, "inputs": [
+    {"name": "policyId", "type": "uint256", "indexed": True},
+    {"name": "refundAmount", "type": "uint256", "indexed": False}]}]
+
+def cancelled_log(address, policy_id, refund, log_index=0):
+    return {
+        "address": address,
+        "topics": [
+            HexBytes(Web3.keccak(text="PolicyCancelled(uint256,uint256)")),
+            HexBytes(policy_id.to_bytes(32, "big"))
+        ],
+        "data": HexBytes(encode(["uint256"], [refund])),
+        "logIndex": log_index,
+        "transactionIndex": 0,
+        "transactionHash": HexBytes(b"\x01" * 32),
+        "blockHash": HexBytes(b"\x02" * 32),
+        "blockNumber": 1
+    }
+
+def decoder():
+    log_decoder = LogDecoder(Web3().codec)
+    log_decoder.register("insurance", INSURANCE, ABIRegistry({"insurance": ABI})["insurance"])
+    return log_decoder
+
+def test_decodes_only_registered_address():
+    receipt = {"logs": [cancelled_log(OTHER, 99, 1, 0), cancelled_log(INSURANCE, 7, 5, 1)]}
+    events = decoder().decode_receipt(receipt, INSURANCE, "PolicyCancelled")
+    assert len(events) == 1
+    assert events[0]["args"]["policyId"] == 7
+    assert events[0]["args"]["refundAmount"] == 5
+
+def test_unknown_log_is_ignored():
+    log_decoder = decoder()
+    assert log_decoder.decode_log(cancelled_log(OTHER, 1, 1)) is None
+    assert log_decoder.decode_receipt({"logs": []}) == []
+    assert log_decoder.contract_name(INSURANCE.lower()) == "insurance"
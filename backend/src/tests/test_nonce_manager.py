@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+from ..services.nonce_manager import NonceManager, is_nonce_error
+
+SENDER = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+OTHER = "0x3C44CdDdB6a900fa2b585dd299e03d12FA4293BC"
+
+class FakeEth:
+    """Nó falso: get_transaction_count devolve o nonce pendente configurado por remetente"""
+
+    def __init__(self, pending):
+        self.pending = dict(pending)
+        self.calls = []
+
+    async def get_transaction_count(self, sender, block_identifier):
+        assert block_identifier == "pending"
+        self.calls.append(sender)
+        # Cede o controle para que as alocações concorrentes disputem a primeira consulta
+        await asyncio.sleep(0)
+        return self.pending[sender]
+
+def make_manager(**pending):
+    eth = FakeEth({SENDER: pending.get("sender", 0), OTHER: pending.get("other", 0)})
+    return NonceManager(SimpleNamespace(eth=eth)), eth
+
+def test_concurrent_allocations_never_repeat_a_nonce():
+    manager, eth = make_manager(sender=5, other=40)
+
+    async def run():
+        return await asyncio.gather(*(manager.allocate(SENDER if i % 3 else OTHER) for i in range(60)))
+
+    nonces = asyncio.run(run())
+    sender_nonces = [nonce for i, nonce in enumerate(nonces) if i % 3]
+    other_nonces = [nonce for i, nonce in enumerate(nonces) if not i % 3]
+    assert sorted(sender_nonces) == list(range(5, 45))
+    assert sorted(other_nonces) == list(range(40, 60))
+    # Uma única consulta ao nó por remetente
+    assert sorted(eth.calls) == sorted([SENDER, OTHER])
+
+def test_release_of_the_latest_nonce_rewinds_the_counter():
+    manager, eth = make_manager(sender=7)
+
+    async def run():
+        first = await manager.allocate(SENDER)
+        second = await manager.allocate(SENDER)
+        manager.release(SENDER, second)
+        return first, second, await manager.allocate(SENDER)
+
+    assert asyncio.run(run()) == (7, 8, 8)
+    assert eth.calls == [SENDER]
+
+def test_release_of_an_earlier_nonce_refetches_from_the_node():
+    manager, eth = make_manager(sender=7)
+
+    async def run():
+        first = await manager.allocate(SENDER)
+        await manager.allocate(SENDER)
+        # O nonce 7 não foi transmitido e o 8 foi: há uma lacuna, o nó decide o próximo
+        manager.release(SENDER, first)
+        eth.pending[SENDER] = 7
+        return await manager.allocate(SENDER)
+
+    assert asyncio.run(run()) == 7
+    assert eth.calls == [SENDER, SENDER]
+
+def test_resync_after_nonce_too_low():
+    manager, eth = make_manager(sender=3)
+
+    async def run():
+        allocated = [await manager.allocate(SENDER) for _ in range(2)]
+        # Outro processo usou a mesma chave: o nó já está no nonce 10
+        eth.pending[SENDER] = 10
+        stale = await manager.allocate(SENDER)
+        error = ValueError({"code": -32000, "message": "nonce too low: next nonce 10, tx nonce 5"})
+        assert is_nonce_error(error)
+        await manager.resync(SENDER)
+        return allocated, stale, await manager.allocate(SENDER)
+
+    assert asyncio.run(run()) == ([3, 4], 5, 10)
+
+def test_reset_forces_a_new_query():
+    manager, eth = make_manager(sender=1, other=2)
+
+    async def run():
+        await manager.allocate(SENDER)
+        await manager.allocate(OTHER)
+        manager.reset(SENDER)
+        await manager.allocate(SENDER)
+        await manager.allocate(OTHER)
+        manager.reset()
+        await manager.allocate(OTHER)
+
+    asyncio.run(run())
+    assert eth.calls == [SENDER, OTHER, SENDER, OTHER]
+
+def test_is_nonce_error_matches_node_messages():
+    for message in ("nonce too low", "Nonce too high", "already known", "known transaction: 0xabc",
+                    "replacement transaction underpriced", "invalid nonce; got 3, expected 4"):
+        assert is_nonce_error(ValueError({"code": -32000, "message": message}))
+    for message in ("insufficient funds for gas * price + value", "execution reverted", "intrinsic gas too low"):
+        assert not is_nonce_error(ValueError({"code": -32000, "message": message}))
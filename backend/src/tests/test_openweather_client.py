@@ -0,0 +1,46 @@
+import asyncio
+import json
+import pytest
+from ..services.openweather import OpenWeatherClient, OpenWeatherError, build_snapshot
+from ..tools.openweather_standin import OpenWeatherStandIn
+
+def fetch(url, regions, api_key="test"):
+    async def run():
+        client = OpenWeatherClient(url, api_key)
+        try:
+            return await asyncio.gather(*(client.get_weather(region) for region in regions), return_exceptions=True)
+        finally:
+            await client.close()
+    return asyncio.run(run())
+
+def test_synthetic_responses_parse_like_the_real_api():
+    with OpenWeatherStandIn(latency=0) as standin:
+        data, missing = fetch(standin.url, ["Salvador,BR", "unknown-city"])
+    snapshot = build_snapshot("Salvador,BR", data)
+    assert snapshot["errors"] == {}
+    assert all(isinstance(value, int) for value in snapshot["values"].values())
+    assert isinstance(missing, OpenWeatherError) and missing.status == 404
+
+def test_rate_limit_and_error_rate():
+    with OpenWeatherStandIn(latency=0, rate_limit=3, rate_window=60) as standin:
+        results = fetch(standin.url, ["Salvador,BR"] * 5)
+        assert standin.responses_by_status == {200: 3, 429: 2}
+    assert sorted(getattr(r, "status", 200) for r in results) == [200, 200, 200, 429, 429]
+
+    with OpenWeatherStandIn(latency=0, error_rate=1.0) as standin:
+        (result,) = fetch(standin.url, ["Salvador,BR"])
+    assert isinstance(result, OpenWeatherError) and result.status == 500
+
+def test_replays_recorded_responses_in_rotation(tmp_path):
+    recordings = tmp_path / "recordings.json"
+    recordings.write_text(json.dumps({
+        "Belem,BR": [{"main": {"temp": 30.5}, "dt": 1}, {"main": {"temp": 31.0}, "dt": 2}]
+    }))
+    with OpenWeatherStandIn(latency=0, replay=str(recordings)) as standin:
+        results = fetch(standin.url, ["belem,br"])
+        results += fetch(standin.url, ["Belem,BR"])
+    assert [r["main"]["temp"] for r in results] == [30.5, 31.0]
+
+def test_missing_api_key_is_rejected_before_the_request():
+    with pytest.raises(ValueError):
+        asyncio.run(OpenWeatherClient("http://127.0.0.1:1", None).get_weather("Salvador,BR"))
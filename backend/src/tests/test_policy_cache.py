@@ -0,0 +1,102 @@
+import asyncio
+from ..services.policy_cache import PolicyCache
+
+def loader(value, calls):
+    async def load():
+        calls.append(value)
+        return value
+    return load
+
+def test_read_through_and_invalidation():
+    cache = PolicyCache(max_size=10, ttl=60)
+    calls = []
+
+    async def scenario():
+        assert await cache.get("details", 1, loader("a", calls)) == "a"
+        assert await cache.get("details", 1, loader("b", calls)) == "a"
+        cache.invalidate_events([{"event": "PolicyActivated", "args": {"policyId": 1, "premium": 5}}])
+        assert await cache.get("details", 1, loader("c", calls)) == "c"
+
+    asyncio.run(scenario())
+    assert calls == ["a", "c"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+
+def test_lru_eviction_and_ttl():
+    cache = PolicyCache(max_size=2, ttl=0)
+    calls = []
+
+    async def scenario():
+        for policy_id in (1, 2, 3):
+            await cache.get("status", policy_id, loader(policy_id, calls))
+        # TTL zerado: toda leitura volta ao contrato
+        await asyncio.sleep(0.01)
+        await cache.get("status", 3, loader(3, calls))
+
+    asyncio.run(scenario())
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+    assert calls == [1, 2, 3, 3]
+
+def test_invalidation_during_load_is_not_cached():
+    cache = PolicyCache()
+
+    async def scenario():
+        async def slow_load():
+            cache.invalidate(1)
+            return "stale"
+        assert await cache.get("details", 1, slow_load) == "stale"
+        assert await cache.get("details", 1, loader("fresh", [])) == "fresh"
+
+    asyncio.run(scenario())
+
+def test_invalidating_another_policy_does_not_block_caching():
+    cache = PolicyCache()
+    calls = []
+
+    async def scenario():
+        async def load_while_policy_2_changes():
+            calls.append("a")
+            cache.invalidate(2)
+            return "a"
+        assert await cache.get("details", 1, load_while_policy_2_changes) == "a"
+        assert await cache.get("details", 1, loader("b", calls)) == "a"
+
+    asyncio.run(scenario())
+    assert calls == ["a"]
+
+def test_concurrent_loads_track_invalidations_per_policy():
+    cache = PolicyCache()
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow(value):
+            await release.wait()
+            return value
+
+        loads = [
+            asyncio.create_task(cache.get("details", 1, lambda: slow("one"))),
+            asyncio.create_task(cache.get("details", 2, lambda: slow("two")))
+        ]
+        await asyncio.sleep(0)
+        cache.invalidate(2)
+        release.set()
+        await asyncio.gather(*loads)
+        return (await cache.get("details", 1, loader("reloaded", [])),
+                await cache.get("details", 2, loader("reloaded", [])))
+
+    assert asyncio.run(scenario()) == ("one", "reloaded")
+    assert cache._loading == {}
+
+def test_clear_during_load_is_not_cached():
+    cache = PolicyCache()
+
+    async def scenario():
+        async def slow_load():
+            cache.clear()
+            return "stale"
+        await cache.get("details", 1, slow_load)
+        return await cache.get("details", 1, loader("fresh", []))
+
+    assert asyncio.run(scenario()) == "fresh"
@@ -0,0 +1,61 @@
+import pytest
+from ..services.policy_store import PolicyStore
+
+FARMER = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+COVERAGE = 10000000000000000000  # 10 ETH em wei (maior que um inteiro de 64 bits)
+PREMIUM = 500000000000000000
+
+def event(name, block_number, **args):
+    return {"event": name, "args": args, "blockNumber": block_number, "transactionHash": "0x01"}
+
+@pytest.fixture
+def store(tmp_path):
+    store = PolicyStore(str(tmp_path / "index.db"))
+    yield store
+    store.close()
+
+def test_apply_events_updates_policy_and_counters(store):
+    details = {1: ((1, FARMER, COVERAGE, 0, 100, 200, False, False, 0, 0, b"\0" * 32, "Bahia,BR", "Soja"), [])}
+    store.apply_events([
+        event("PolicyCreated", 10, policyId=1, farmer=FARMER, coverageAmount=COVERAGE, cropType="Soja"),
+        event("PolicyActivated", 11, policyId=1, premium=PREMIUM),
+        event("PremiumDeposited", 11, policyId=1, amount=PREMIUM),
+        event("ClaimTriggered", 12, policyId=1, farmer=FARMER, payoutAmount=PREMIUM),
+    ], 12, details)
+
+    policy = store.get_policy(1)
+    assert policy["coverageAmount"] == COVERAGE
+    assert policy["region"] == "Bahia,BR"
+    assert policy["active"] is True
+    assert policy["claimed"] is True
+    assert policy["claimPaid"] == PREMIUM
+    assert store.get_checkpoint() == 12
+
+    counters = store.get_counters()
+    assert counters["total_policies"] == 1
+    assert counters["active_policies"] == 1
+    assert counters["total_claims"] == 1
+    assert counters["total_premiums"] == PREMIUM
+    assert store.top_values("region") == [("Bahia,BR", 1)]
+
+def test_cancel_deactivates_policy(store):
+    store.apply_events([
+        event("PolicyCreated", 1, policyId=7, farmer=FARMER, coverageAmount=COVERAGE, cropType="Milho"),
+        event("PolicyActivated", 2, policyId=7, premium=PREMIUM),
+        event("PolicyCancelled", 3, policyId=7, refundAmount=PREMIUM),
+    ], 3)
+
+    assert store.get_policy(7)["active"] is False
+    assert store.get_policy(7)["cancelled"] is True
+    assert store.get_counters()["active_policies"] == 0
+    assert [p["id"] for p in store.get_farmer_policies(FARMER.lower())] == [7]
+
+def test_checkpoint_survives_reopen(tmp_path):
+    path = str(tmp_path / "index.db")
+    store = PolicyStore(path)
+    store.apply_events([], 42)
+    store.close()
+
+    reopened = PolicyStore(path)
+    assert reopened.get_checkpoint() == 42
+    reopened.close()
@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from eth_account import Account
+from web3 import AsyncWeb3
+from web3.exceptions import TimeExhausted
+from ..services.receipt_poller import ReceiptPoller
+from ..tools.chain_standin import ChainStandIn
+
+DEV_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+RECIPIENT = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+
+def signed_transfers(count):
+    account = Account.from_key(DEV_PRIVATE_KEY)
+    return [
+        account.sign_transaction({
+            "to": RECIPIENT, "value": 1, "gas": 21000, "gasPrice": 10 ** 9, "nonce": nonce, "chainId": 31337
+        }).raw_transaction
+        for nonce in range(count)
+    ]
+
+def test_pending_receipts_are_fetched_once_per_block():
+    with ChainStandIn(latency=0, block_time=0.3) as standin:
+        async def run():
+            w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url))
+            poller = ReceiptPoller(w3, poll_interval=0.05, timeout=5)
+            hashes = [await w3.eth.send_raw_transaction(raw) for raw in signed_transfers(30)]
+            requests_before = standin.request_count
+            receipts = await asyncio.gather(*(poller.wait(tx_hash) for tx_hash in hashes), poller.wait(hashes[0]))
+            await poller.stop()
+            return hashes, receipts, standin.request_count - requests_before, poller.stats()
+
+        hashes, receipts, requests, stats = asyncio.run(run())
+
+    assert [r["transactionHash"] for r in receipts[:30]] == hashes
+    assert all(r["status"] == 1 and isinstance(r["blockNumber"], int) for r in receipts)
+    assert receipts[-1] is receipts[0]
+    # Um eth_blockNumber por volta e um batch de recibos por bloco, independente das 30 transações
+    assert stats["receiptsRequested"] <= 30 * (stats["blocksSeen"] + 1)
+    assert requests == stats["rpcRequests"] and requests < 30
+    assert stats["pending"] == 0 and stats["resolved"] == 30
+
+def test_wait_times_out_like_web3():
+    with ChainStandIn(latency=0) as standin:
+        async def run():
+            poller = ReceiptPoller(AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url)), poll_interval=0.01)
+            try:
+                with pytest.raises(TimeExhausted):
+                    await poller.wait("0x" + "ab" * 32, timeout=0.1)
+            finally:
+                await poller.stop()
+            return poller.stats()
+
+        stats = asyncio.run(run())
+    assert stats["timeouts"] == 1 and stats["pending"] == 0
+
+def test_rejected_batch_falls_back_to_one_request_per_hash():
+    with ChainStandIn(latency=0, max_batch_size=4) as standin:
+        async def run():
+            w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url))
+            poller = ReceiptPoller(w3, poll_interval=0.01, timeout=5, chunk_size=10)
+            hashes = [await w3.eth.send_raw_transaction(raw) for raw in signed_transfers(10)]
+            receipts = await asyncio.gather(*(poller.wait(tx_hash) for tx_hash in hashes))
+            await poller.stop()
+            return hashes, receipts, poller.stats()
+
+        hashes, receipts, stats = asyncio.run(run())
+
+    assert [r["transactionHash"] for r in receipts] == hashes
+    assert stats["batchFallbacks"] >= 1 and stats["errors"] == 0 and stats["resolved"] == 10
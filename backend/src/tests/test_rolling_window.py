@@ -0,0 +1,79 @@
+import random
+from ..services.climate_store import ClimateSeriesStore
+from ..services import openweather
+from ..services.rolling_window import RollingWindow, RollingAggregates, DAY, HOUR
+
+def test_window_matches_naive_recompute():
+    rng = random.Random(1)
+    window = RollingWindow(length=50)
+    observations = []
+    for t in range(0, 1000, 3):
+        value = rng.randint(-100, 100)
+        observations.append((t, value))
+        window.push(t, value)
+        window.expire(t)
+        inside = [v for ts, v in observations if ts > t - 50]
+        stats = window.stats()
+        assert (stats["count"], stats["sum"], stats["min"], stats["max"]) == (len(inside), sum(inside), min(inside), max(inside))
+
+def test_windows_are_seeded_from_history_and_updated_incrementally(tmp_path):
+    store = ClimateSeriesStore(str(tmp_path))
+    now = 100 * DAY
+    store.append_many("Salvador,BR", "rainfall", [now - d * DAY for d in range(10, 0, -1)], [1000] * 10)
+
+    aggregates = RollingAggregates(store)
+    assert aggregates.window("salvador,br", "rainfall", 7, now)["sum"] == 6000
+    assert aggregates.window("Salvador,BR", "rainfall", 30, now)["count"] == 10
+
+    aggregates.observe("Salvador,BR", "rainfall", now, 500)
+    assert not aggregates.observe("Salvador,BR", "rainfall", now, 500)
+    assert aggregates.window("Salvador,BR", "rainfall", 7, now)["sum"] == 6500
+    # Outro worker gravou uma observação no histórico compartilhado, na mesma hora: as duas
+    # leituras da hora contam como uma só (a média)
+    store.append("Salvador,BR", "rainfall", now + 60, 250)
+    stats = aggregates.window("Salvador,BR", "rainfall", 30, now + 60)
+    assert (stats["count"], stats["sum"], stats["max"]) == (11, 10375, 1000)
+
+def test_repeated_readings_within_an_hour_count_once(tmp_path):
+    store = ClimateSeriesStore(str(tmp_path))
+    start = 100 * DAY
+    # rain.1h repetido a cada 10 minutos durante 3 horas: 3 mm por hora, não 18
+    timestamps = [start + hour * HOUR + minute * 60 for hour in range(3) for minute in range(0, 60, 10)]
+    store.append_many("Salvador,BR", "rainfall", timestamps, [3000] * len(timestamps))
+
+    stats = RollingAggregates(store).window("Salvador,BR", "rainfall", 1, timestamps[-1])
+    assert (stats["count"], stats["sum"], stats["mean"]) == (3, 9000, 3000)
+    assert stats["coverage"] == 3 / 24
+
+def test_sparse_window_is_partial(tmp_path, monkeypatch):
+    store = ClimateSeriesStore(str(tmp_path))
+    monkeypatch.setattr(openweather, "rolling_aggregates", RollingAggregates(store))
+    start = 100 * DAY
+    store.append("Salvador,BR", "rainfall", start, 20000)
+    # Uma leitura isolada não é o acumulado de 7 dias
+    value, stats = openweather.windowed_value("Salvador,BR", "rainfall", 7, start + 60)
+    assert value is None and stats["partial"] and stats["count"] == 1
+
+    # Leituras horárias em todo o período: janela completa
+    timestamps = list(range(start + HOUR, start + 2 * DAY + 1, HOUR))
+    store.append_many("Salvador,BR", "rainfall", timestamps, [100] * len(timestamps))
+    value, stats = openweather.windowed_value("Salvador,BR", "rainfall", 2, start + 2 * DAY)
+    assert not stats["partial"] and stats["coverage"] == 1.0
+    assert value == 100 * 48
+
+def test_windows_no_longer_in_use_are_dropped(tmp_path):
+    store = ClimateSeriesStore(str(tmp_path))
+    now = 100 * DAY
+    store.append_many("Salvador,BR", "rainfall", [now - d * DAY for d in range(10, 0, -1)], [1000] * 10)
+    aggregates = RollingAggregates(store)
+    for period_days in (7, 30):
+        aggregates.window("Salvador,BR", "rainfall", period_days, now)
+    aggregates.window("Recife,BR", "temperature", 3, now)
+
+    assert aggregates.retain([("salvador, br", "rainfall", 30)]) == 2
+    stats = aggregates.stats()
+    assert (stats["windows"], stats["evicted"]) == (1, 2)
+    # A janela mantida continua incremental; uma descartada é refeita a partir do histórico
+    assert aggregates.window("Salvador,BR", "rainfall", 30, now)["count"] == 10
+    assert aggregates.window("Salvador,BR", "rainfall", 7, now)["sum"] == 6000
+    assert aggregates.stats()["seeded"] == 4
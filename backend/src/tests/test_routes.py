@@ -394,6 +394,12 @@ async def test_get_current_weather(client, mocker):
     data = response.json()
     assert "region" in data
     assert "rainfall" in data
+    assert "rawData" not in data
+
+    projected = await client.get(f"/api/weather/{REGION}", params={"fields": "temperature,rawData"})
+    assert set(projected.json()) == {"region", "temperature", "rawData"}
+    unchanged = await client.get(f"/api/weather/{REGION}", headers={"If-None-Match": response.headers["etag"]})
+    assert unchanged.status_code == 304
 
 # 26. Teste para status geral da API e contratos
 @pytest.mark.asyncio
@@ -404,4 +410,70 @@ async def test_get_api_status(client):
     assert "api" in data
     assert "blockchain" in data
     assert "contracts" in data
-    assert data["api"]["status"] == "online"
\ No newline at end of file
+    assert data["api"]["status"] == "online"
+
+# 27. Teste para acompanhar transação submetida no modo assíncrono
+@pytest.mark.asyncio
+async def test_activate_policy_async_mode(client, setup_policy):
+    response = await client.post(f"/api/policies/{POLICY_ID}/activate?wait=false", json={"premium": AMOUNT})
+    assert response.status_code == 202
+    data = response.json()
+    assert "trackingId" in data
+    assert "transactionHash" in data
+    assert data["status"] == "pending"
+
+    response = await client.get(f"/api/transactions/{data['trackingId']}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] in ("pending", "mined", "reverted", "failed")
+    assert "events" in data
+    assert "result" in data
+
+# 27b. Repetições com a mesma Idempotency-Key não transmitem outra transação
+@pytest.mark.asyncio
+async def test_activate_policy_idempotency_key(client, setup_policy):
+    headers = {"Idempotency-Key": f"activate-{POLICY_ID}-{time.time()}"}
+    first = await client.post(f"/api/policies/{POLICY_ID}/activate?wait=false", json={"premium": AMOUNT}, headers=headers)
+    retry = await client.post(f"/api/policies/{POLICY_ID}/activate?wait=false", json={"premium": AMOUNT}, headers=headers)
+    assert first.status_code == retry.status_code == 202
+    assert first.json()["transactionHash"] == retry.json()["transactionHash"]
+
+    conflict = await client.post(f"/api/policies/{POLICY_ID}/activate", json={"premium": AMOUNT + 1}, headers=headers)
+    assert conflict.status_code == 422
+
+@pytest.mark.asyncio
+async def test_get_transaction_status_not_found(client):
+    response = await client.get("/api/transactions/unknown-tracking-id")
+    assert response.status_code == 404
+    data = response.json()
+    assert "detail" in data
+
+# 29. Teste para o clima de várias regiões
+@pytest.mark.asyncio
+async def test_get_bulk_weather(client):
+    before = (await client.get("/api/metrics")).json()["weatherQuota"]["granted"]
+    # A mesma região escrita de dois jeitos e repetida: uma única consulta à OpenWeather
+    regions = [REGION, " bahia , br ", "RegiaoInexistente123", REGION]
+    response = await client.post("/api/weather/bulk", json={"regions": regions, "parameterTypes": ["rainfall", "temperature"]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [result["region"] for result in data["results"]] == regions
+    assert (data["succeeded"], data["failed"]) == (3, 1)
+
+    found = [data["results"][i] for i in (0, 1, 3)]
+    for result in found:
+        assert isinstance(result["values"], dict) and set(result["values"]) == {"rainfall", "temperature"}
+        assert result["error"] is None
+        assert (result["values"], result["timestamp"]) == (found[0]["values"], found[0]["timestamp"])
+    missing = data["results"][2]
+    assert missing["values"] is None and missing["timestamp"] is None
+    assert isinstance(missing["error"], str) and missing["error"]
+
+    # No máximo uma consulta por região distinta (nenhuma se Bahia,BR já estava em cache)
+    after = (await client.get("/api/metrics")).json()["weatherQuota"]["granted"]
+    assert after - before <= 2
+
+@pytest.mark.asyncio
+async def test_get_bulk_weather_invalid_parameter(client):
+    response = await client.post("/api/weather/bulk", json={"regions": [REGION], "parameterTypes": ["snow"]})
+    assert response.status_code == 400
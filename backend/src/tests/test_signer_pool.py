@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from ..services.signer_pool import SignerPool
+
+OWNER = ("0xowner", "owner-key")
+SIGNERS = [("0xa", "key-a"), ("0xb", "key-b"), ("0xc", "key-c")]
+
+def tx_hash(n):
+    return "0x" + f"{n:064x}"
+
+def test_owner_only_functions_stay_pinned():
+    pool = SignerPool(SIGNERS, OWNER, ["createPolicy"])
+
+    async def run():
+        return [
+            (await pool.acquire("addSupportedRegion")).address,
+            (await pool.acquire("processClaim")).address,
+            # Transações com valor saem do saldo do owner, mesmo em funções liberadas
+            (await pool.acquire("createPolicy", value=1)).address,
+            (await pool.acquire("createPolicy")).address
+        ]
+
+    assert asyncio.run(run()) == ["0xowner", "0xowner", "0xowner", "0xa"]
+    assert pool.stats()["pinned"] == 3
+
+def test_round_robin_and_least_loaded_routing():
+    round_robin = SignerPool(SIGNERS, OWNER, ["createPolicy"], strategy="round-robin")
+    least_loaded = SignerPool(SIGNERS, OWNER, ["createPolicy"])
+
+    async def run():
+        rotation = [(await round_robin.acquire("createPolicy")).address for _ in range(6)]
+        leases = [await least_loaded.acquire("createPolicy") for _ in range(3)]
+        for n, lease in enumerate(leases):
+            least_loaded.bind(lease, tx_hash(n))
+        # Só a transação de 0xb foi minerada: ela passa a ser a chave menos ocupada
+        least_loaded.observe_receipt({"transactionHash": tx_hash(1)})
+        return rotation, (await least_loaded.acquire("createPolicy")).address
+
+    rotation, next_address = asyncio.run(run())
+    assert rotation == ["0xa", "0xb", "0xc", "0xa", "0xb", "0xc"]
+    assert next_address == "0xb"
+
+def test_acquire_waits_for_a_free_slot():
+    pool = SignerPool(SIGNERS[:2], OWNER, ["createPolicy"], max_pending=1)
+
+    async def run():
+        first, second = await pool.acquire("createPolicy"), await pool.acquire("createPolicy")
+        pool.bind(first, tx_hash(1))
+        pool.bind(second, tx_hash(2))
+        waiting = asyncio.create_task(pool.acquire("createPolicy"))
+        await asyncio.sleep(0.05)
+        blocked = not waiting.done()
+        pool.observe_receipt({"transactionHash": tx_hash(2)})
+        return blocked, (await asyncio.wait_for(waiting, 1)).address
+
+    blocked, address = asyncio.run(run())
+    assert blocked and address == "0xb"
+    assert pool.stats()["waits"] == 1
+    assert pool.sender_of(tx_hash(1)) == "0xa" and pool.sender_of(tx_hash(2)) is None
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        SignerPool(SIGNERS, OWNER, ["createPolicy"], strategy="random")
@@ -0,0 +1,139 @@
+import asyncio
+from types import SimpleNamespace
+from eth_abi import encode
+from eth_account import Account
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from ..services import blockchain, transaction_tracker as tracker_module
+from ..services.log_decoder import LogDecoder
+from ..services.receipt_poller import ReceiptPoller
+from ..services.transaction_tracker import TransactionTracker
+from ..tools.chain_standin import ChainStandIn
+from ..utils.abi_registry import ContractCapabilities
+
+DEV_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+CONTRACT_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+REVERT_INPUT = b"\xde\xad"
+RECORDED_ABI = {
+    "type": "event", "name": "Recorded", "anonymous": False,
+    "inputs": [
+        {"name": "id", "type": "uint256", "indexed": True},
+        {"name": "dataHash", "type": "bytes32", "indexed": False},
+        {"name": "values", "type": "uint256[]", "indexed": False}
+    ]
+}
+
+class EventChain(ChainStandIn):
+    """Nó local em que cada transação emite Recorded, exceto as marcadas para reverter"""
+
+    def build_logs(self, tx, tx_hash):
+        if self.transaction_status(tx) != 1:
+            return []
+        topics = ["0x" + event_abi_to_log_topic(RECORDED_ABI).hex(), "0x" + (tx["nonce"] + 1).to_bytes(32, "big").hex()]
+        data = encode(["bytes32", "uint256[]"], [b"\x07" * 32, [tx["nonce"], 42]])
+        return [{"address": CONTRACT_ADDRESS, "topics": topics, "data": "0x" + data.hex()}]
+
+    def transaction_status(self, tx):
+        return 0 if tx["input"] == "0x" + REVERT_INPUT.hex() else 1
+
+def use_chain(monkeypatch, standin):
+    """Liga o tracker ao nó local: envio assinado pela chave de desenvolvimento e recibos pelo poller"""
+    w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url))
+    account = Account.from_key(DEV_PRIVATE_KEY)
+    nonces = iter(range(1000))
+    invalidated = []
+
+    async def broadcaster(contract_function, value=0, sender_address=None, private_key=None, urgency="standard"):
+        tx = {"to": CONTRACT_ADDRESS, "value": value, "gas": 50000, "gasPrice": 10 ** 9, "nonce": next(nonces),
+              "chainId": 31337, "data": contract_function.data}
+        return HexBytes(await w3.eth.send_raw_transaction(account.sign_transaction(tx).raw_transaction))
+
+    decoder = LogDecoder(w3.codec)
+    decoder.register("recorder", CONTRACT_ADDRESS, ContractCapabilities([RECORDED_ABI]))
+    poller = ReceiptPoller(w3, poll_interval=0.01, timeout=5)
+    monkeypatch.setattr(tracker_module, "broadcast_transaction", broadcaster)
+    monkeypatch.setattr(tracker_module, "receipt_poller", poller)
+    monkeypatch.setattr(tracker_module, "gas_estimator", SimpleNamespace(invalidate=invalidated.append))
+    monkeypatch.setattr(blockchain, "log_decoder", decoder)
+    contract = SimpleNamespace(address=CONTRACT_ADDRESS)
+    return poller, contract, invalidated
+
+async def settle(tracker, poller):
+    await asyncio.gather(*tracker._tasks)
+    await poller.stop()
+
+def test_submitted_transaction_is_tracked_until_mined(monkeypatch):
+    with EventChain(latency=0) as standin:
+        poller, contract, invalidated = use_chain(monkeypatch, standin)
+        tracker = TransactionTracker()
+
+        async def build_result(receipt):
+            return {"success": True, "block": receipt["blockNumber"]}
+
+        async def run():
+            record = await tracker.submit(SimpleNamespace(data=b"\x01"), result_builder=build_result,
+                                          events=[(contract, "Recorded")])
+            assert record["status"] == "pending" and record["result"] is None
+            await settle(tracker, poller)
+            return record, tracker.get(record["trackingId"])
+
+        submitted, record = asyncio.run(run())
+
+    assert record["status"] == "mined" and record["transactionHash"] == submitted["transactionHash"]
+    assert record["result"] == {"success": True, "block": record["blockNumber"]} and record["gasUsed"] == 21000
+    assert record["events"] == [{
+        "event": "Recorded", "address": CONTRACT_ADDRESS, "logIndex": 0,
+        "args": {"id": 1, "dataHash": "0x" + "07" * 32, "values": [0, 42]}
+    }]
+    assert invalidated == [] and record["error"] is None
+
+def test_reverted_transaction_invalidates_the_gas_estimate(monkeypatch):
+    with EventChain(latency=0) as standin:
+        poller, contract, invalidated = use_chain(monkeypatch, standin)
+        tracker = TransactionTracker()
+        contract_function = SimpleNamespace(data=REVERT_INPUT)
+
+        async def run():
+            record = await tracker.submit(contract_function, result_builder=lambda receipt: {"success": True},
+                                          events=[(contract, "Recorded")])
+            await settle(tracker, poller)
+            return tracker.get(record["trackingId"])
+
+        record = asyncio.run(run())
+
+    assert record["status"] == "reverted" and record["result"] is None and record["events"] == []
+    assert isinstance(record["blockNumber"], int) and invalidated == [contract_function]
+
+def test_result_builder_error_marks_the_record_failed(monkeypatch):
+    with EventChain(latency=0) as standin:
+        poller, contract, invalidated = use_chain(monkeypatch, standin)
+        tracker = TransactionTracker()
+
+        def build_result(receipt):
+            raise KeyError("policyId")
+
+        async def run():
+            record = await tracker.submit(SimpleNamespace(data=b"\x01"), result_builder=build_result)
+            await settle(tracker, poller)
+            return tracker.get(record["trackingId"])
+
+        record = asyncio.run(run())
+
+    assert record["status"] == "failed" and "policyId" in record["error"]
+    assert record["transactionHash"] and isinstance(record["blockNumber"], int)
+
+def test_eviction_keeps_pending_records():
+    tracker = TransactionTracker(max_records=3)
+    for tracking_id, status in (("a", "pending"), ("b", "mined"), ("c", "pending"), ("d", "mined"), ("e", "reverted")):
+        tracker._store({"trackingId": tracking_id, "status": status})
+
+    # Os finalizados mais antigos saem primeiro; os pendentes continuam consultáveis
+    assert tracker.get("b") is None and tracker.get("d") is None
+    assert [tracker.get(tracking_id)["status"] for tracking_id in ("a", "c", "e")] == ["pending", "pending", "reverted"]
+
+    # Só pendentes: nada é descartado
+    only_pending = TransactionTracker(max_records=2)
+    for tracking_id in "xyz":
+        only_pending._store({"trackingId": tracking_id, "status": "pending"})
+    assert all(only_pending.get(tracking_id) is not None for tracking_id in "xyz")
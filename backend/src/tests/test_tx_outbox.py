@@ -0,0 +1,161 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from ..services import blockchain
+from ..services.tx_outbox import TransactionOutbox
+
+def test_keys_are_reserved_once_and_survive_a_restart(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    outbox = TransactionOutbox(path)
+    assert outbox.reserve("k1", "activatePolicy", "abc", {"policyId": 1, "premium": 10})
+    assert not outbox.reserve("k1", "activatePolicy", "other", {"policyId": 2, "premium": 10})
+    outbox.mark_signed("k1", "0xadmin", 7, "0xf86b", "0xhash1")
+    outbox.mark_broadcast("k1")
+    assert outbox.reserve("k2", "createPolicy", "def", {"farmer": "0xfarmer"})
+    outbox.close()
+
+    reopened = TransactionOutbox(path)
+    record = reopened.get("k1")
+    assert (record["status"], record["fingerprint"], record["nonce"]) == ("broadcast", "abc", 7)
+    assert record["params"] == {"policyId": 1, "premium": 10}
+    # k2 nunca assinou uma transação: é liberada na retomada; k1 volta a ser acompanhada
+    assert reopened.release_abandoned() == 1
+    assert [r["idempotency_key"] for r in reopened.in_flight()] == ["k1"]
+
+    reopened.complete("k1", "mined", 12, 50000, {"success": True, "transactionHash": "hash1"})
+    assert reopened.get("k1")["result"] == {"success": True, "transactionHash": "hash1"}
+    assert reopened.in_flight() == [] and reopened.stats()["mined"] == 1
+
+def test_release_never_drops_a_broadcast_transaction(tmp_path):
+    outbox = TransactionOutbox(str(tmp_path / "outbox.db"))
+    outbox.reserve("signed", "activatePolicy", "a", {})
+    outbox.mark_signed("signed", "0xadmin", 1, "0x01", "0xhash")
+    # Falha ambígua: a transação assinada pode ter chegado ao nó e continua gravada
+    outbox.release("signed")
+    assert outbox.get("signed")["status"] == "signed"
+    outbox.release("signed", rejected=True)
+    assert outbox.get("signed") is None
+
+    outbox.reserve("sent", "activatePolicy", "b", {})
+    outbox.mark_signed("sent", "0xadmin", 2, "0x02", "0xhash2")
+    outbox.mark_broadcast("sent")
+    outbox.release("sent")
+    assert outbox.get("sent")["status"] == "broadcast"
+
+class FakeBroadcaster:
+    """Assina (chama on_signed) e falha no envio com o erro configurado"""
+
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self, contract_function, value=0, on_signed=None, **kwargs):
+        self.calls += 1
+        on_signed("0xadmin", 3, SimpleNamespace(raw_transaction=b"\x02\x01", hash=bytes([self.calls]) * 32))
+        raise self.error
+
+def use_outbox(monkeypatch, tmp_path, broadcaster):
+    outbox = TransactionOutbox(str(tmp_path / "outbox.db"))
+    tracked = []
+    monkeypatch.setattr(blockchain, "transaction_outbox", outbox)
+    monkeypatch.setattr(blockchain, "broadcast_transaction", broadcaster)
+    monkeypatch.setattr(blockchain, "_track_outbox_entry",
+                        lambda key, contract_function=None, rebroadcast=True: tracked.append(rebroadcast))
+    return outbox, tracked
+
+def test_ambiguous_broadcast_failure_keeps_the_signed_transaction(monkeypatch, tmp_path):
+    broadcaster = FakeBroadcaster(asyncio.TimeoutError())
+    outbox, tracked = use_outbox(monkeypatch, tmp_path, broadcaster)
+
+    async def run():
+        first = await blockchain.send_idempotent("k1", "activatePolicy", {"policyId": 1}, object())
+        retry = await blockchain.send_idempotent("k1", "activatePolicy", {"policyId": 1}, object())
+        return first, retry
+
+    first, retry = asyncio.run(run())
+    # O nó pode ter aceitado a transação: a repetição acompanha a mesma, sem assinar outra
+    assert broadcaster.calls == 1
+    assert first["status"] == retry["status"] == "signed"
+    assert retry["transaction_hash"] == "0x" + "01" * 32
+    assert tracked == [True, True]
+
+def test_rejected_broadcast_releases_the_key(monkeypatch, tmp_path):
+    broadcaster = FakeBroadcaster(ValueError({"code": -32000, "message": "insufficient funds for gas * price + value"}))
+    outbox, tracked = use_outbox(monkeypatch, tmp_path, broadcaster)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await blockchain.send_idempotent("k1", "activatePolicy", {"policyId": 1}, object())
+
+    asyncio.run(run())
+    assert broadcaster.calls == 2 and outbox.get("k1") is None and tracked == []
+
+def test_entry_fails_when_its_nonce_was_used_by_another_transaction(monkeypatch, tmp_path):
+    outbox = TransactionOutbox(str(tmp_path / "outbox.db"))
+    outbox.reserve("k1", "activatePolicy", "abc", {"policyId": 1})
+    outbox.mark_signed("k1", "0xadmin", 3, "0x0201", "0x" + "ab" * 32)
+    outbox.mark_broadcast("k1")
+
+    async def send_raw_transaction(raw):
+        raise ValueError({"code": -32000, "message": "nonce too low"})
+
+    async def get_transaction_count(sender, block):
+        return 5
+
+    async def get_transaction_receipt(tx_hash):
+        raise TransactionNotFound(f"Transaction with hash: '{tx_hash}' not found.")
+
+    async def wait(tx_hash, timeout=None):
+        raise TimeExhausted(f"Transaction {tx_hash} is not in the chain after {timeout} seconds")
+
+    monkeypatch.setattr(blockchain, "transaction_outbox", outbox)
+    monkeypatch.setattr(blockchain, "receipt_poller", SimpleNamespace(wait=wait))
+    monkeypatch.setattr(blockchain, "async_w3", SimpleNamespace(eth=SimpleNamespace(
+        send_raw_transaction=send_raw_transaction, get_transaction_count=get_transaction_count,
+        get_transaction_receipt=get_transaction_receipt
+    )))
+    asyncio.run(blockchain._track_outbox("k1", None, rebroadcast=True))
+
+    record = outbox.get("k1")
+    assert record["status"] == "failed" and "nonce 3" in record["error"]
+    assert outbox.in_flight() == []
+
+class RacingOutbox(TransactionOutbox):
+    """Outro worker (outra conexão ao mesmo arquivo) reserva a chave logo depois do primeiro get"""
+
+    def __init__(self, path, other_worker, fingerprint):
+        super().__init__(path)
+        self.other_worker = other_worker
+        self.fingerprint = fingerprint
+        self.raced = False
+
+    def get(self, key):
+        record = super().get(key)
+        if not self.raced:
+            self.raced = True
+            self.other_worker.reserve(key, "activatePolicy", self.fingerprint, {"policyId": 1})
+        return record
+
+def test_key_reserved_by_another_worker_is_not_broadcast_again(monkeypatch, tmp_path):
+    from ..api import routes
+    path = str(tmp_path / "outbox.db")
+    fingerprint = blockchain._fingerprint("activatePolicy", {"policyId": 1}, 0)
+    broadcaster = FakeBroadcaster(AssertionError("a second transaction was signed"))
+    outbox = RacingOutbox(path, TransactionOutbox(path), fingerprint)
+    tracked = []
+    monkeypatch.setattr(blockchain, "transaction_outbox", outbox)
+    monkeypatch.setattr(blockchain, "broadcast_transaction", broadcaster)
+    monkeypatch.setattr(blockchain, "_track_outbox_entry",
+                        lambda key, contract_function=None, rebroadcast=True: tracked.append(rebroadcast))
+    monkeypatch.setattr(routes, "send_idempotent", blockchain.send_idempotent)
+
+    async def run():
+        for wait in (True, False):
+            with pytest.raises(routes.HTTPException) as error:
+                await routes._send_idempotent("k1", "activatePolicy", {"policyId": 1}, object(), wait=wait)
+            assert error.value.status_code == 409 and "still being processed" in error.value.detail
+
+    asyncio.run(run())
+    assert broadcaster.calls == 0 and outbox.get("k1")["status"] == "reserved"
@@ -0,0 +1,58 @@
+import asyncio
+import time
+from ..services.weather_cache import WeatherCache, SingleFlight, normalize_region
+
+def test_normalize_region():
+    assert normalize_region("  São  Paulo , BR ") == "são paulo,br"
+    assert normalize_region("Salvador,BR") == normalize_region("salvador, br")
+
+def test_expiry_follows_provider_update_interval():
+    cache = WeatherCache(update_interval=600, min_ttl=60)
+    now = time.time()
+    cache.put("a", {"dt": now - 100})
+    cache.put("b", {"dt": now - 700})
+    assert cache._entries["a"][1] == now - 100 + 600
+    # Observação atrasada: vale só min_ttl
+    assert abs(cache._entries["b"][1] - (now + 60)) < 1
+    assert cache.get("a") is not None
+
+def test_lru_eviction_and_metrics():
+    cache = WeatherCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"dt": time.time()})
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1, 1)
+
+def test_single_flight_shares_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "snapshot"
+
+    async def scenario():
+        results = await asyncio.gather(*(flights.do("salvador,br", fetch) for _ in range(50)))
+        assert results == ["snapshot"] * 50
+        # Terminada a execução, a próxima chamada busca de novo
+        await flights.do("salvador,br", fetch)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert flights.stats() == {"executions": 2, "coalesced": 49, "inFlight": 0}
+
+def test_single_flight_propagates_errors_to_all_waiters():
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("x", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
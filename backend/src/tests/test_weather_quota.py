@@ -0,0 +1,76 @@
+import asyncio
+import time
+import pytest
+from ..services.weather_quota import SlidingWindowLimit, QuotaScheduler, QuotaExceeded
+
+def test_queued_lookups_are_released_by_priority():
+    async def run():
+        scheduler = QuotaScheduler([SlidingWindowLimit("perSecond", 1, 0.05)])
+        order = []
+
+        async def lookup(key):
+            await scheduler.acquire(scheduler.priority(key))
+            order.append(key)
+
+        scheduler.update_priorities({"far": 0.9, "near": 0.01, "middle": 0.3})
+        await lookup("first")  # Consome a única vaga
+        await asyncio.gather(*(lookup(key) for key in ("far", "middle", "unknown", "near")))
+        return order, scheduler.stats()
+
+    order, stats = asyncio.run(run())
+    assert order == ["first", "near", "middle", "far", "unknown"]
+    assert stats["granted"] == 5 and stats["queued"] == 4 and stats["queueDepth"] == 0
+
+def test_waiters_past_max_wait_get_quota_exceeded():
+    async def run():
+        scheduler = QuotaScheduler([SlidingWindowLimit("perMinute", 1, 60)], max_wait=0.05)
+        await scheduler.acquire()
+        with pytest.raises(QuotaExceeded):
+            await scheduler.acquire()
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["expired"] == 1 and stats["budget"]["perMinute"] == {"limit": 1, "remaining": 0}
+
+def test_pause_holds_every_release():
+    async def run():
+        scheduler = QuotaScheduler([SlidingWindowLimit("perMinute", 100, 60)])
+        scheduler.pause(0.1)
+        start = time.monotonic()
+        await scheduler.acquire()
+        return time.monotonic() - start, scheduler.stats()
+
+    elapsed, stats = asyncio.run(run())
+    assert elapsed >= 0.09
+    assert stats["rateLimited"] == 1 and stats["queued"] == 1
+
+def test_limit_never_grants_more_than_capacity_per_period():
+    limit = SlidingWindowLimit("perMinute", 60, 60)
+    start = 1000.0
+    grants = []
+    # Tenta uma chamada a cada 100 ms durante duas janelas simuladas
+    for step in range(1200):
+        now = start + step * 0.1
+        if limit.wait_time(now) <= 0:
+            limit.take(now)
+            grants.append(now)
+
+    assert sum(1 for t in grants if t < start + 60) == 60
+    # Qualquer intervalo de 60 s, alinhado ou não com o início, tem no máximo 60 liberações
+    for first in grants:
+        assert sum(1 for t in grants if first <= t < first + 60) <= 60
+    # A vaga volta quando o bucket (1 s) da 60ª liberação mais recente sai da janela
+    now = start + 120
+    assert grants[-60] + 60 - now <= limit.wait_time(now) <= grants[-60] + 61 - now
+
+def test_limit_memory_does_not_grow_with_capacity():
+    limit = SlidingWindowLimit("perDay", 1_000_000, 86400, buckets=24)
+    grants = [1000.0 + step for step in range(100_000)]
+    for now in grants:
+        limit.take(now)
+
+    assert len(limit._buckets) <= 25
+    # Conta ao menos as liberações do último dia e no máximo uma hora (um bucket) a mais
+    now = grants[-1] + 1
+    used = limit.capacity - limit.remaining(now)
+    assert sum(1 for t in grants if t > now - 86400) <= used <= sum(1 for t in grants if t > now - 90000)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark da verificação de funções disponíveis: reflexão com dir() sobre
+contract.functions (como as rotas faziam a cada requisição) vs consulta ao ABIRegistry.
+Não precisa de nó; usa apenas o ABI compilado.
+Execute com: python -m src.tools.benchmark_abi_registry --iterations 2000
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+
+from web3 import AsyncWeb3
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.abi_registry import ABIRegistry
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+DEFAULT_ARTIFACT = os.path.join(
+    BASE_DIR, "smart-contracts", "seguroagrochain", "out", "AgroChainInsurance.sol", "AgroChainInsurance.json"
+)
+DUMMY_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+# Verificações feitas por /dashboard/stats, a rota que mais consulta funções
+CHECKED_FUNCTIONS = ["getTotalPolicies", "getActivePolicies", "getTotalPremiums",
+                     "getTotalPayouts", "getTotalClaims", "getPolicyDetails"]
+
+def reflection_lookup(contract):
+    available_functions = [fn for fn in dir(contract.functions)
+                           if callable(getattr(contract.functions, fn))
+                           and not fn.startswith('__')]
+    return [name in available_functions for name in CHECKED_FUNCTIONS]
+
+def registry_lookup(capabilities):
+    return [capabilities.has_function(name) for name in CHECKED_FUNCTIONS]
+
+def measure(function, argument, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function(argument)
+    return (time.perf_counter() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dir() vs ABIRegistry")
+    parser.add_argument("--artifact", default=DEFAULT_ARTIFACT, help="Artefato JSON do contrato")
+    parser.add_argument("--iterations", type=int, default=2000, help="Requisições simuladas")
+    args = parser.parse_args()
+
+    with open(args.artifact) as f:
+        abi = json.load(f)["abi"]
+
+    contract = AsyncWeb3().eth.contract(address=DUMMY_ADDRESS, abi=abi)
+
+    start = time.perf_counter()
+    capabilities = ABIRegistry({"insurance": abi})["insurance"]
+    build_time = time.perf_counter() - start
+
+    assert reflection_lookup(contract) == registry_lookup(capabilities)
+
+    reflection = measure(reflection_lookup, contract, args.iterations)
+    registry = measure(registry_lookup, capabilities, args.iterations)
+
+    print(f"ABI: {len(capabilities.function_names)} funções, {len(capabilities.event_names)} eventos")
+    print(f"Construção do registro (uma vez):  {build_time * 1e6:10.1f} µs")
+    print(f"dir() por requisição:              {reflection * 1e6:10.1f} µs")
+    print(f"ABIRegistry por requisição:        {registry * 1e6:10.1f} µs")
+    print(f"Ganho: {reflection / registry:.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Benchmark de throughput de leituras concorrentes: cliente Web3 síncrono vs AsyncWeb3.
+Simula handlers `async def` do FastAPI contra um nó local com latência artificial.
+Execute com: python -m src.tools.benchmark_async_client --requests 50 --latency 0.05
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+from web3 import Web3, AsyncWeb3
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.chain_standin import ChainStandIn
+
+# ABI mínimo com a função de leitura usada por /treasury/balance
+TREASURY_ABI = [{
+    "type": "function",
+    "name": "getTreasuryBalance",
+    "stateMutability": "view",
+    "inputs": [],
+    "outputs": [{"name": "", "type": "uint256"}]
+}]
+CONTRACT_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+
+async def run_sync_client(url, concurrency):
+    """Handlers assíncronos chamando o cliente síncrono (comportamento anterior)"""
+    contract = Web3(Web3.HTTPProvider(url)).eth.contract(address=CONTRACT_ADDRESS, abi=TREASURY_ABI)
+
+    async def handler():
+        return contract.functions.getTreasuryBalance().call()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def run_async_client(url, concurrency):
+    """Handlers assíncronos aguardando o cliente AsyncWeb3"""
+    contract = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url)).eth.contract(address=CONTRACT_ADDRESS, abi=TREASURY_ABI)
+
+    async def handler():
+        return await contract.functions.getTreasuryBalance().call()
+
+    # Aquece a sessão HTTP para não medir a criação do pool de conexões
+    await handler()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cliente assíncrono da blockchain")
+    parser.add_argument("--requests", type=int, nargs="+", default=[1, 10, 50], help="Níveis de concorrência")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência artificial do nó (segundos)")
+    args = parser.parse_args()
+
+    with ChainStandIn(latency=args.latency) as standin:
+        print(f"Nó local em {standin.url} (latência {args.latency}s)\n")
+        print(f"{'concorrência':>12} | {'síncrono (req/s)':>17} | {'assíncrono (req/s)':>18} | {'ganho':>6}")
+        print("-" * 64)
+        for concurrency in args.requests:
+            sync_elapsed = asyncio.run(run_sync_client(standin.url, concurrency))
+            async_elapsed = asyncio.run(run_async_client(standin.url, concurrency))
+            sync_rps = concurrency / sync_elapsed
+            async_rps = concurrency / async_elapsed
+            print(f"{concurrency:>12} | {sync_rps:>17.1f} | {async_rps:>18.1f} | {async_rps / sync_rps:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
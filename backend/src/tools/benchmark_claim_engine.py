@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Benchmark da avaliação de sinistros da carteira: apólices sintéticas espalhadas por várias
+regiões, avaliadas com o laço por apólice (como na rota de um único sinistro) e com a
+passada vetorizada do ClaimRuleTable. O clima vem do servidor local que imita a OpenWeather.
+Execute com: python -m src.tools.benchmark_claim_engine --policies 10000 50000 --regions 200
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import random
+import time
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.openweather_standin import OpenWeatherStandIn
+from src.services import openweather
+from src.services.claim_engine import ClaimEvaluationJob, fetch_region_snapshots
+from src.services.openweather import PARAMETER_MAPPINGS
+from src.services.weather_cache import normalize_region
+
+THRESHOLDS = {
+    "rainfall": (0, 5000), "temperature": (15000, 35000), "humidity": (4000, 10000),
+    "wind_speed": (0, 15000), "pressure": (10000, 10300), "clouds": (0, 10000)
+}
+
+
+def synthetic_portfolio(count, regions, seed=42):
+    """Apólices ativas com um a três parâmetros cada, como getPolicyDetails as retorna"""
+    rng = random.Random(seed)
+    now = int(time.time())
+    parameter_types = list(PARAMETER_MAPPINGS)
+    policies = []
+    for policy_id in range(1, count + 1):
+        parameters = []
+        for parameter_type in rng.sample(parameter_types, rng.randint(1, 3)):
+            # Limiares nos extremos da faixa do servidor local: poucas apólices são acionadas
+            low, high = THRESHOLDS[parameter_type]
+            trigger_above = rng.random() < 0.5
+            position = rng.uniform(0.9, 1.0) if trigger_above else rng.uniform(0.0, 0.1)
+            threshold = int(low + (high - low) * position)
+            parameters.append((parameter_type, threshold, 30, trigger_above, rng.choice((2500, 5000, 10000))))
+        policy = (policy_id, "0x0", 10**18, 10**16, now - 86400, now + 86400, True, False, 0, 0, b"", regions[policy_id % len(regions)], "soja")
+        policies.append((policy, parameters))
+    return policies
+
+
+def evaluate_loop(policies, snapshots):
+    """Referência: o laço por apólice e parâmetro da rota /policies/{id}/openweather-data"""
+    claims = []
+    for policy, parameters in policies:
+        snapshot = snapshots.get(normalize_region(policy[11]))
+        best = None
+        seen = set()
+        for param in parameters:
+            if param[0] in seen or snapshot is None:
+                continue
+            seen.add(param[0])
+            value = snapshot["values"].get(param[0])
+            if value is None:
+                continue
+            if (value < param[1] and not param[3]) or (value > param[1] and param[3]):
+                if best is None or param[4] > best[4]:
+                    best = param
+        if best is not None:
+            claims.append((policy[0], policy[2] * best[4] // 10000))
+    return claims
+
+
+async def run(policies, snapshots_cache):
+    async def policy_loader():
+        return policies
+
+    async def weather_loader(regions):
+        snapshots, errors = await fetch_region_snapshots(regions)
+        snapshots_cache.update(snapshots)
+        return snapshots, errors
+
+    # Sem janelas móveis: o laço de referência compara a leitura atual
+    job = ClaimEvaluationJob(policy_loader=policy_loader, weather_loader=weather_loader, window_reader=None)
+    try:
+        return await job.run_once()
+    finally:
+        await openweather.openweather_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da avaliação de sinistros da carteira")
+    parser.add_argument("--policies", type=int, nargs="+", default=[1000, 10000, 50000], help="Tamanhos da carteira")
+    parser.add_argument("--regions", type=int, default=200, help="Número de regiões distintas")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência artificial da OpenWeather (segundos)")
+    args = parser.parse_args()
+
+    regions = [f"Cidade{i},BR" for i in range(args.regions)]
+    with OpenWeatherStandIn(latency=args.latency) as standin:
+        openweather.openweather_client.base_url = standin.url
+        # O servidor local não tem cota; o agendador da cota ficaria no caminho da medição
+        openweather.weather_quota.limits = []
+        openweather.openweather_client.api_key = openweather.openweather_client.api_key or "bench"
+
+        for count in args.policies:
+            policies = synthetic_portfolio(count, regions)
+            openweather.weather_cache.clear()
+            before = standin.request_count
+            snapshots = {}
+            report = asyncio.run(run(policies, snapshots))
+            calls = standin.request_count - before
+
+            start = time.perf_counter()
+            reference = evaluate_loop(policies, snapshots)
+            loop_ms = (time.perf_counter() - start) * 1000
+
+            vectorized = sorted((c["policyId"], c["payoutAmount"]) for c in report["triggered"])
+            assert vectorized == sorted(reference), "Resultados divergentes entre o laço e a avaliação vetorizada"
+
+            stages = " | ".join(f"{name} {ms:8.1f} ms" for name, ms in report["stagesMs"].items())
+            print(f"{count:>7} apólices, {report['rules']:>7} regras, {calls:>4} consultas de clima | {stages} | "
+                  f"total {report['totalMs']:8.1f} ms | laço por apólice {loop_ms:8.1f} ms | "
+                  f"{len(reference)} sinistros")
+
+
+if __name__ == "__main__":
+    main()
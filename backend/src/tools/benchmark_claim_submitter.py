@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Benchmark do pagamento de sinistros de uma região inteira: processClaim enviado um a um com
+send_transaction (esperando cada recibo) vs ClaimBatchSubmitter (transmissão em sequência
+com recibos em paralelo). Usa o nó local com mineração por blocos, que não executa o EVM:
+a restrição onlyOracle de processClaim não se aplica e só o envio em pipeline é medido.
+Execute com: python -m src.tools.benchmark_claim_submitter --claims 100 --block-time 1
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.chain_standin import ChainStandIn
+
+# Primeira chave de desenvolvimento do Anvil
+DEV_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+CONTRACT_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+# ABI mínimo com a função usada no pagamento de sinistros (IAgroChainInsurance.processClaim)
+PROCESS_CLAIM_ABI = [{
+    "type": "function",
+    "name": "processClaim",
+    "stateMutability": "nonpayable",
+    "inputs": [
+        {"name": "_policyId", "type": "uint256"},
+        {"name": "_climateData", "type": "tuple", "components": [
+            {"name": "requestId", "type": "bytes32"},
+            {"name": "parameterType", "type": "string"},
+            {"name": "measuredValue", "type": "uint256"},
+            {"name": "timestamp", "type": "uint256"},
+            {"name": "dataSource", "type": "string"},
+            {"name": "signature", "type": "bytes"}
+        ]}
+    ],
+    "outputs": [{"name": "success", "type": "bool"}, {"name": "amount", "type": "uint256"}]
+}]
+
+
+async def run_serial(claims, claim_function):
+    """Referência: um send_transaction por sinistro, como a rota de um único sinistro"""
+    from src.services.blockchain import send_transaction
+
+    start = time.perf_counter()
+    mined = 0
+    for policy_id, _, climate_data in claims:
+        receipt = await send_transaction(claim_function(policy_id, climate_data))
+        mined += receipt["status"] == 1
+    return mined, time.perf_counter() - start
+
+
+async def run_batch(claims, claim_function, window):
+    from src.services.claim_submitter import ClaimBatchSubmitter
+
+    report = await ClaimBatchSubmitter(window=window, claim_function=claim_function).submit(claims)
+    return report["mined"], report["elapsedMs"] / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pagamento de sinistros em lote")
+    parser.add_argument("--claims", type=int, default=100, help="Sinistros da região")
+    parser.add_argument("--windows", type=int, nargs="+", default=[10, 50], help="Janelas de transações em voo")
+    parser.add_argument("--latency", type=float, default=0.02, help="Latência artificial do nó (segundos)")
+    parser.add_argument("--block-time", type=float, default=1.0, help="Intervalo entre blocos (segundos)")
+    parser.add_argument("--skip-serial", action="store_true", help="Não medir o envio um a um")
+    args = parser.parse_args()
+
+    with ChainStandIn(latency=args.latency, block_time=args.block_time) as standin:
+        # O backend lê o nó e a conta de admin do ambiente ao importar a configuração
+        os.environ["WEB3_PROVIDER_URL"] = standin.url
+        os.environ["ADMIN_PRIVATE_KEY"] = DEV_PRIVATE_KEY
+        from src.utils.config import async_w3
+        from src.services.blockchain import nonce_manager
+        from src.services.claim_submitter import climate_data_tuple
+
+        contract = async_w3.eth.contract(address=CONTRACT_ADDRESS, abi=PROCESS_CLAIM_ABI)
+        claim_function = lambda policy_id, climate_data: contract.functions.processClaim(
+            policy_id, climate_data_tuple(climate_data)
+        )
+        claims = [
+            (policy_id, 10 ** 17, {
+                "requestId": policy_id.to_bytes(32, "big"), "parameterType": "rainfall", "measuredValue": 1000,
+                "timestamp": int(time.time()), "dataSource": "OpenWeather", "signature": b""
+            })
+            for policy_id in range(1, args.claims + 1)
+        ]
+
+        async def run():
+            rows = []
+            if not args.skip_serial:
+                rows.append(("um a um", *await run_serial(claims, claim_function)))
+            for window in args.windows:
+                nonce_manager.reset()
+                rows.append((f"lote, janela {window}", *await run_batch(claims, claim_function, window)))
+            return rows
+
+        blocks_before = standin.block_number
+        rows = asyncio.run(run())
+        print(f"{args.claims} sinistros, blocos a cada {args.block_time}s ({standin.block_number - blocks_before} blocos)")
+        for label, mined, elapsed in rows:
+            print(f"  {label:<18} {mined:5d} confirmados em {elapsed:7.2f}s ({mined / elapsed:6.1f} tx/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Benchmark do histórico local de clima: grava anos de observações horárias para várias
+regiões e mede consultas do tipo "soma da chuva nos últimos N dias", comparando com a
+leitura completa de cada série para a memória.
+Execute com: python -m src.tools.benchmark_climate_store --regions 300 --years 5
+"""
+
+import sys
+import os
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.services.climate_store import ClimateSeriesStore, RECORD_DTYPE
+
+HOUR = 3600
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do histórico local de clima")
+    parser.add_argument("--regions", type=int, default=300, help="Número de regiões")
+    parser.add_argument("--years", type=float, default=5, help="Anos de observações horárias por região")
+    parser.add_argument("--queries", type=int, default=2000, help="Consultas de intervalo")
+    parser.add_argument("--days", type=int, default=30, help="Tamanho da janela consultada (dias)")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="climate_store_")
+    try:
+        store = ClimateSeriesStore(root)
+        hours = int(args.years * 365 * 24)
+        end = int(time.time()) // HOUR * HOUR
+        timestamps = np.arange(end - (hours - 1) * HOUR, end + 1, HOUR, dtype=np.int64)
+        regions = [f"Cidade{i},BR" for i in range(args.regions)]
+
+        start = time.perf_counter()
+        for i, region in enumerate(regions):
+            values = np.random.default_rng(i).integers(0, 5000, size=hours)
+            store.append_many(region, "rainfall", timestamps, values)
+        write_time = time.perf_counter() - start
+        stats = store.stats()
+        print(f"{args.regions} regiões x {hours} horas: {stats['observations']} observações, "
+              f"{stats['bytes'] / 2**20:.1f} MiB, gravadas em {write_time:.2f}s")
+
+        # Reabre como depois de uma reinicialização
+        store = ClimateSeriesStore(root)
+        rng = random.Random(0)
+        window = args.days * 24 * HOUR
+        picks = [rng.choice(regions) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        windowed = [store.aggregate(region, "rainfall", end - window, end)["sum"] for region in picks]
+        mapped_time = time.perf_counter() - start
+        window_bytes = len(store._series_for(picks[0], "rainfall").window(end - window, end)) * RECORD_DTYPE.itemsize
+        series_bytes = hours * RECORD_DTYPE.itemsize
+
+        start = time.perf_counter()
+        naive = []
+        for region in picks:
+            records = np.fromfile(store._series_for(region, "rainfall").path, dtype=RECORD_DTYPE)
+            naive.append(int(records["v"][records["t"] >= end - window].sum()))
+        naive_time = time.perf_counter() - start
+        assert windowed == naive
+
+        print(f"Soma dos últimos {args.days} dias, {args.queries} consultas:")
+        print(f"  memmap + busca binária   {mapped_time / args.queries * 1e6:8.1f} µs/consulta "
+              f"({window_bytes / 1024:.0f} KiB somados por consulta)")
+        print(f"  leitura da série inteira {naive_time / args.queries * 1e6:8.1f} µs/consulta "
+              f"({series_bytes / 1024:.0f} KiB lidos por consulta)")
+        print(f"  ganho: {naive_time / mapped_time:.1f}x")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Benchmark de escritas concorrentes de um mesmo remetente: nonce consultado no nó a cada
+transação vs NonceManager local. Usa o nó local com mineração por blocos.
+Execute com: python -m src.tools.benchmark_nonce_manager --transactions 50 --block-time 0.5
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+from eth_account import Account
+from web3 import AsyncWeb3
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.chain_standin import ChainStandIn
+from src.services.nonce_manager import NonceManager
+
+# Primeira chave de desenvolvimento do Anvil
+DEV_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+RECIPIENT = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+
+
+async def run_writes(url, transactions, nonce_manager=None):
+    """Envia transações concorrentes e espera todos os recibos"""
+    w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url))
+    account = Account.from_key(DEV_PRIVATE_KEY)
+
+    async def write():
+        if nonce_manager is None:
+            nonce = await w3.eth.get_transaction_count(account.address)
+        else:
+            nonce = await nonce_manager.allocate(account.address)
+        tx = {"to": RECIPIENT, "value": 1, "gas": 21000, "gasPrice": 10 ** 9, "nonce": nonce, "chainId": 31337}
+        signed = account.sign_transaction(tx)
+        tx_hash = await w3.eth.send_raw_transaction(signed.raw_transaction)
+        return await w3.eth.wait_for_transaction_receipt(tx_hash, poll_latency=0.05)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(write() for _ in range(transactions)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    succeeded = sum(1 for r in results if not isinstance(r, Exception))
+    return succeeded, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do alocador local de nonces")
+    parser.add_argument("--transactions", type=int, default=50, help="Transações concorrentes")
+    parser.add_argument("--latency", type=float, default=0.02, help="Latência artificial do nó (segundos)")
+    parser.add_argument("--block-time", type=float, default=0.5, help="Intervalo entre blocos (segundos)")
+    args = parser.parse_args()
+
+    for label, use_manager in (("nonce do nó", False), ("NonceManager", True)):
+        with ChainStandIn(latency=args.latency, block_time=args.block_time) as standin:
+            manager = NonceManager(AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url))) if use_manager else None
+            succeeded, elapsed = asyncio.run(run_writes(standin.url, args.transactions, manager))
+            print(f"{label:>14}: {succeeded}/{args.transactions} confirmadas em {elapsed:.2f}s "
+                  f"({succeeded / elapsed:.1f} tx/s, {standin.block_number - 1} blocos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Benchmark das consultas à OpenWeather feitas pelas rotas assíncronas: requests.get sem
+sessão (bloqueia o event loop e abre uma conexão por consulta) vs OpenWeatherClient
+(aiohttp com pool de conexões). Usa o servidor local que imita a OpenWeather.
+Execute com: python -m src.tools.benchmark_openweather_client --lookups 100 --concurrency 20
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import statistics
+import time
+
+import requests
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.openweather_standin import OpenWeatherStandIn
+from src.services.openweather import OpenWeatherClient
+
+REGIONS = ["Salvador,BR", "Cuiaba,BR", "Londrina,BR", "Goiania,BR", "Campinas,BR"]
+
+
+# As consultas chegam todas juntas; a latência de cada uma é medida desde a chegada do lote,
+# como a perceberia um cliente da API
+
+async def run_blocking(url, lookups, concurrency):
+    """Como as rotas faziam antes: requests.get direto dentro de uma corrotina"""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def lookup(i):
+        async with semaphore:
+            response = requests.get(url, params={"q": REGIONS[i % len(REGIONS)], "appid": "bench", "units": "metric"})
+            response.raise_for_status()
+            response.json()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(lookup(i) for i in range(lookups)))
+    return time.perf_counter() - start, latencies
+
+
+async def run_pooled(url, lookups, concurrency):
+    """OpenWeatherClient compartilhado, com o limite de concorrência do próprio cliente"""
+    client = OpenWeatherClient(url, "bench", max_connections=concurrency, max_concurrency=concurrency)
+    latencies = []
+
+    async def lookup(i):
+        await client.get_weather(REGIONS[i % len(REGIONS)])
+        latencies.append(time.perf_counter() - start)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(lookup(i) for i in range(lookups)))
+        return time.perf_counter() - start, latencies
+    finally:
+        await client.close()
+
+
+def report(name, elapsed, latencies, connections):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<28} total {elapsed:7.3f}s | média {statistics.mean(latencies) * 1000:7.1f} ms | "
+          f"p95 {p95 * 1000:7.1f} ms | {len(latencies) / elapsed:7.1f} consultas/s | {connections} conexões TCP")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark requests.get vs OpenWeatherClient")
+    parser.add_argument("--lookups", type=int, default=100, help="Número de consultas")
+    parser.add_argument("--concurrency", type=int, default=20, help="Consultas simultâneas")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência artificial do servidor (segundos)")
+    args = parser.parse_args()
+
+    with OpenWeatherStandIn(latency=args.latency) as standin:
+        print(f"{args.lookups} consultas, concorrência {args.concurrency}, latência do servidor {args.latency * 1000:.0f} ms\n")
+
+        before = standin.connection_count
+        elapsed, latencies = asyncio.run(run_blocking(standin.url, args.lookups, args.concurrency))
+        report("requests.get (bloqueante)", elapsed, latencies, standin.connection_count - before)
+        blocking_elapsed = elapsed
+
+        before = standin.connection_count
+        elapsed, latencies = asyncio.run(run_pooled(standin.url, args.lookups, args.concurrency))
+        report("OpenWeatherClient (pool)", elapsed, latencies, standin.connection_count - before)
+
+        print(f"\nGanho de vazão: {blocking_elapsed / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Benchmark da carga de RPC ao esperar recibos de muitas transações pendentes: um laço
+wait_for_transaction_receipt por transação vs o ReceiptPoller compartilhado. Usa o nó local
+com mineração por blocos e conta as requisições HTTP recebidas durante a espera.
+Execute com: python -m src.tools.benchmark_receipt_poller --transactions 10 100 500 --block-time 1
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+from eth_account import Account
+from web3 import AsyncWeb3
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.chain_standin import ChainStandIn
+
+# Primeira chave de desenvolvimento do Anvil
+DEV_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+RECIPIENT = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+
+
+async def wait_all(standin, transactions, shared):
+    """Transmite as transações e mede requisições e tempo até o último recibo"""
+    from src.services.receipt_poller import ReceiptPoller
+
+    w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url))
+    account = Account.from_key(DEV_PRIVATE_KEY)
+    start_nonce = await w3.eth.get_transaction_count(account.address, "pending")
+    hashes = []
+    for nonce in range(start_nonce, start_nonce + transactions):
+        tx = {"to": RECIPIENT, "value": 1, "gas": 21000, "gasPrice": 10 ** 9, "nonce": nonce, "chainId": 31337}
+        hashes.append(await w3.eth.send_raw_transaction(account.sign_transaction(tx).raw_transaction))
+
+    requests_before = standin.request_count
+    start = time.perf_counter()
+    if shared:
+        poller = ReceiptPoller(w3)
+        await asyncio.gather(*(poller.wait(tx_hash) for tx_hash in hashes))
+        await poller.stop()
+    else:
+        await asyncio.gather(*(w3.eth.wait_for_transaction_receipt(tx_hash) for tx_hash in hashes))
+    return standin.request_count - requests_before, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do acompanhamento compartilhado de recibos")
+    parser.add_argument("--transactions", type=int, nargs="+", default=[10, 100, 500], help="Transações pendentes")
+    parser.add_argument("--latency", type=float, default=0.01, help="Latência artificial do nó (segundos)")
+    parser.add_argument("--block-time", type=float, default=1.0, help="Intervalo entre blocos (segundos)")
+    args = parser.parse_args()
+
+    print(f"{'pendentes':>10} | {'um laço por transação':>30} | {'ReceiptPoller':>30}")
+    for transactions in args.transactions:
+        row = []
+        for shared in (False, True):
+            with ChainStandIn(latency=args.latency, block_time=args.block_time) as standin:
+                requests, elapsed = asyncio.run(wait_all(standin, transactions, shared))
+            row.append(f"{requests:6d} requisições em {elapsed:5.2f}s")
+        print(f"{transactions:>10} | {row[0]:>30} | {row[1]:>30}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Benchmark da vazão de escrita com o SignerPool: as mesmas transações enviadas com 1, 2, 4...
+chaves. Usa o nó local com mineração por blocos e limite de transações pendentes por conta
+(como o txpool dos nós), que é o que prende uma única chave numa fila de nonces.
+Com o backend puro-Python do eth-keys, assinar e recuperar o remetente custa dezenas de ms
+por transação e passa a dominar a medida; com coincurve instalado o tempo medido é o da rede.
+Execute com: python -m src.tools.benchmark_signer_pool --keys 1 2 4 8 --transactions 256
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+from eth_account import Account
+from eth_utils import keccak
+from web3 import AsyncWeb3
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.chain_standin import ChainStandIn
+
+RECIPIENT = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+
+
+def dev_accounts(count):
+    """Chaves determinísticas só para o nó local (que não verifica saldo)"""
+    accounts = [Account.from_key(keccak(text=f"agrochain-signer-{i}")) for i in range(count + 1)]
+    return [(account.address, account.key) for account in accounts]
+
+
+async def submit_all(standin, keys, transactions, strategy, max_pending):
+    """Envia as transações pelo pool e mede o tempo até o último recibo"""
+    from src.services.nonce_manager import NonceManager
+    from src.services.receipt_poller import ReceiptPoller
+    from src.services.signer_pool import SignerPool
+
+    w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(standin.url))
+    owner, *signers = dev_accounts(keys)
+    pool = SignerPool(signers, owner, ["createPolicy"], strategy, max_pending)
+    poller = ReceiptPoller(w3, poll_interval=0.05)
+    poller.add_listener(pool.observe_receipt)
+    nonces = NonceManager(w3)
+
+    async def send_one():
+        lease = await pool.acquire("createPolicy")
+        nonce = await nonces.allocate(lease.address)
+        tx = {"to": RECIPIENT, "value": 0, "gas": 21000, "gasPrice": 10 ** 9, "nonce": nonce, "chainId": 31337}
+        tx_hash = await w3.eth.send_raw_transaction(Account.sign_transaction(tx, lease.private_key).raw_transaction)
+        pool.bind(lease, tx_hash)
+        await poller.wait(tx_hash)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send_one() for _ in range(transactions)))
+    elapsed = time.perf_counter() - start
+    await poller.stop()
+    return elapsed, pool.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da vazão de escrita com várias chaves")
+    parser.add_argument("--keys", type=int, nargs="+", default=[1, 2, 4, 8], help="Chaves no pool")
+    parser.add_argument("--transactions", type=int, default=256, help="Transações por execução")
+    parser.add_argument("--strategy", default="least-loaded", help="least-loaded ou round-robin")
+    parser.add_argument("--max-pending", type=int, default=16, help="Pendências por conta aceitas pelo nó")
+    parser.add_argument("--latency", type=float, default=0.01, help="Latência artificial do nó (segundos)")
+    parser.add_argument("--block-time", type=float, default=0.5, help="Intervalo entre blocos (segundos)")
+    args = parser.parse_args()
+
+    print(f"{'chaves':>7} | {'tempo':>8} | {'tx/s':>8} | {'ganho':>6} | por chave")
+    baseline = None
+    for keys in args.keys:
+        with ChainStandIn(latency=args.latency, block_time=args.block_time,
+                          max_pending_per_sender=args.max_pending) as standin:
+            elapsed, stats = asyncio.run(submit_all(standin, keys, args.transactions, args.strategy, args.max_pending))
+        throughput = args.transactions / elapsed
+        baseline = baseline or throughput
+        per_key = " ".join(str(signer["sent"]) for signer in stats["signers"])
+        print(f"{keys:>7} | {elapsed:7.2f}s | {throughput:8.1f} | {throughput / baseline:5.2f}x | {per_key}")
+
+
+if __name__ == "__main__":
+    main()
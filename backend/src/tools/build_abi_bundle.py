@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""
+Gera o bundle de ABIs usado na inicialização da API.
+
+Extrai apenas o campo "abi" dos artefatos do Foundry (smart-contracts/seguroagrochain/out)
+e grava todos os contratos num único JSON compacto, lido de uma só vez por config.py.
+Rode novamente sempre que os contratos forem recompilados.
+Execute com: python -m src.tools.build_abi_bundle
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.config import CONTRACT_ARTIFACTS, ABI_BUNDLE_PATH, load_contract_abi
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o bundle de ABIs dos contratos")
+    parser.add_argument("--output", default=ABI_BUNDLE_PATH, help="Arquivo de saída")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bundle = {name: load_contract_abi(artifact) for name, artifact in CONTRACT_ARTIFACTS.items()}
+    artifacts_time = time.perf_counter() - start
+
+    with open(args.output, "w") as f:
+        json.dump(bundle, f, separators=(",", ":"))
+
+    start = time.perf_counter()
+    with open(args.output) as f:
+        json.load(f)
+    bundle_time = time.perf_counter() - start
+
+    for name, abi in bundle.items():
+        print(f"  {name:<12} {CONTRACT_ARTIFACTS[name]:<30} {len(abi)} entradas")
+    print(f"Bundle gravado em {args.output} ({os.path.getsize(args.output)} bytes)")
+    print(f"Leitura dos artefatos: {artifacts_time * 1000:.1f} ms | leitura do bundle: {bundle_time * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
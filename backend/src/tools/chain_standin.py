@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+"""
+Nó JSON-RPC local mínimo que imita uma blockchain para benchmarks e testes offline.
+Responde apenas aos métodos usados pelo backend, com latência artificial configurável.
+Execute com: python -m src.tools.chain_standin --port 8545 --latency 0.05
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import rlp
+from eth_account import Account
+from eth_utils import keccak, to_checksum_address
+
+# Valor retornado por qualquer eth_call (uint256 = 1 ether)
+DEFAULT_CALL_RESULT = "0x" + hex(10 ** 18)[2:].rjust(64, "0")
+
+
+class RPCError(Exception):
+    """Erro devolvido ao cliente como objeto `error` do JSON-RPC"""
+
+    def __init__(self, message, code=-32000):
+        super().__init__(message)
+        self.code = code
+
+
+class ChainStandIn:
+    """Servidor JSON-RPC em thread própria que simula um nó Ethereum.
+
+    Transações assinadas entram num mempool com validação de nonce por remetente.
+    Com block_time=None cada transação é minerada na hora (como o automine do Anvil);
+    caso contrário um minerador inclui até max_txs_per_block transações a cada bloco.
+    Com base_fee definido o nó segue a EIP-1559: transações com maxFeePerGas abaixo da
+    base fee esperam no mempool, a base fee varia até 12,5% por bloco conforme a ocupação
+    (max_txs_per_block transações = bloco cheio) e eth_feeHistory fica disponível.
+    max_pending_per_sender imita o limite de pendências por conta do txpool dos nós: além
+    dele, novas transações do remetente são rejeitadas até as anteriores serem mineradas.
+    max_batch_size imita os provedores que limitam (ou, com 0, recusam) batches JSON-RPC:
+    um batch maior recebe um único objeto de erro em vez da lista de respostas.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.05, chain_id=31337,
+                 block_time=None, max_txs_per_block=None, base_fee=None, max_pending_per_sender=None,
+                 max_batch_size=None):
+        self.latency = latency
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.max_txs_per_block = max_txs_per_block
+        self.base_fee = base_fee
+        self.max_pending_per_sender = max_pending_per_sender
+        self.max_batch_size = max_batch_size
+        self.block_number = 1
+        self.blocks = {}
+        self.request_count = 0
+        self.rpc_call_count = 0
+        self.mined_nonces = {}
+        self.pending_nonces = {}
+        self.queued = {}
+        self.mempool = []
+        self.receipts = {}
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+        self._miner = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        if self.block_time:
+            self._miner = threading.Thread(target=self._mine_forever, daemon=True)
+            self._miner.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle_rpc(self, request):
+        """Processa uma única chamada JSON-RPC e devolve o objeto de resposta"""
+        with self._lock:
+            self.rpc_call_count += 1
+        method = request.get("method")
+        handler = getattr(self, f"rpc_{method}", None)
+        if handler is None:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": f"Method {method} not supported"}}
+        try:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "result": handler(request.get("params", []))}
+        except RPCError as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": e.code, "message": str(e)}}
+
+    # Mempool e mineração
+    def build_logs(self, tx, tx_hash):
+        """Logs emitidos por uma transação minerada (sobrescreva para simular eventos)"""
+        return []
+
+    def transaction_status(self, tx):
+        """Status do recibo de uma transação minerada (sobrescreva para simular reverts)"""
+        return 1
+
+    def _promote_queued(self, sender):
+        queued = self.queued.get(sender, {})
+        while self.pending_nonces[sender] in queued:
+            self.mempool.append(queued.pop(self.pending_nonces[sender]))
+            self.pending_nonces[sender] += 1
+
+    def _effective_gas_price(self, tx):
+        if tx["maxFeePerGas"] is None:
+            return tx["gasPrice"]
+        return min(tx["maxFeePerGas"], (self.base_fee or 0) + tx["maxPriorityFeePerGas"])
+
+    def _select_transactions(self):
+        """Retira do mempool as transações do próximo bloco, na ordem de chegada"""
+        limit = self.max_txs_per_block or len(self.mempool)
+        if self.base_fee is None:
+            included, self.mempool = self.mempool[:limit], self.mempool[limit:]
+            return included
+        included, waiting, blocked = [], [], set()
+        for tx in self.mempool:
+            # Uma transação com taxa insuficiente segura as de nonce maior do mesmo remetente
+            fee_cap = tx["maxFeePerGas"] if tx["maxFeePerGas"] is not None else tx["gasPrice"]
+            if len(included) < limit and tx["from"] not in blocked and fee_cap >= self.base_fee:
+                included.append(tx)
+            else:
+                blocked.add(tx["from"])
+                waiting.append(tx)
+        self.mempool = waiting
+        return included
+
+    def mine_block(self):
+        """Inclui transações do mempool num novo bloco e gera os recibos"""
+        with self._lock:
+            included = self._select_transactions()
+            self.block_number += 1
+            block_hash = "0x" + keccak(self.block_number.to_bytes(32, "big")).hex()
+            self.blocks[self.block_number] = {
+                "baseFeePerGas": self.base_fee or 0,
+                "gasUsedRatio": len(included) / self.max_txs_per_block if self.max_txs_per_block else 0.0,
+                "tips": sorted(self._effective_gas_price(tx) - (self.base_fee or 0) for tx in included)
+            }
+            for index, tx in enumerate(included):
+                self.mined_nonces[tx["from"]] = tx["nonce"] + 1
+                self.receipts[tx["hash"]] = {
+                    "transactionHash": tx["hash"],
+                    "transactionIndex": hex(index),
+                    "blockHash": block_hash,
+                    "blockNumber": hex(self.block_number),
+                    "from": tx["from"],
+                    "to": tx["to"],
+                    "cumulativeGasUsed": hex(21000 * (index + 1)),
+                    "gasUsed": hex(21000),
+                    "effectiveGasPrice": hex(self._effective_gas_price(tx)),
+                    "contractAddress": None,
+                    "logs": [
+                        dict(log, transactionHash=tx["hash"], blockHash=block_hash,
+                             blockNumber=hex(self.block_number), transactionIndex=hex(index),
+                             logIndex=hex(i), removed=False)
+                        for i, log in enumerate(self.build_logs(tx, tx["hash"]))
+                    ],
+                    "logsBloom": "0x" + "00" * 256,
+                    "status": hex(self.transaction_status(tx)),
+                    "type": hex(tx["type"])
+                }
+            if self.base_fee is not None and self.max_txs_per_block:
+                # Alvo de meio bloco, como na EIP-1559
+                target = self.max_txs_per_block / 2
+                self.base_fee = max(self.base_fee + int(self.base_fee * (len(included) - target) / target / 8), 7)
+            return included
+
+    def _mine_forever(self):
+        while not self._stopped.wait(self.block_time):
+            self.mine_block()
+
+    # Métodos suportados
+    def rpc_web3_clientVersion(self, params):
+        return "AgroChainStandIn/v1"
+
+    def rpc_eth_chainId(self, params):
+        return hex(self.chain_id)
+
+    def rpc_net_version(self, params):
+        return str(self.chain_id)
+
+    def rpc_eth_blockNumber(self, params):
+        return hex(self.block_number)
+
+    def rpc_eth_gasPrice(self, params):
+        return hex(10 ** 9 if self.base_fee is None else self.base_fee + 10 ** 9)
+
+    def rpc_eth_feeHistory(self, params):
+        if self.base_fee is None:
+            raise RPCError("Method eth_feeHistory not supported", -32601)
+        block_count = params[0] if isinstance(params[0], int) else int(params[0], 16)
+        percentiles = params[2] if len(params) > 2 else []
+        with self._lock:
+            newest = self.block_number
+            oldest = max(newest - block_count + 1, 1)
+            blocks = [self.blocks.get(number, {"baseFeePerGas": self.base_fee, "gasUsedRatio": 0.0, "tips": []})
+                      for number in range(oldest, newest + 1)]
+            next_base_fee = self.base_fee
+        history = {
+            "oldestBlock": hex(oldest),
+            "baseFeePerGas": [hex(block["baseFeePerGas"]) for block in blocks] + [hex(next_base_fee)],
+            "gasUsedRatio": [block["gasUsedRatio"] for block in blocks]
+        }
+        if percentiles:
+            history["reward"] = [
+                [hex(block["tips"][min(int(len(block["tips"]) * p / 100), len(block["tips"]) - 1)] if block["tips"] else 0)
+                 for p in percentiles]
+                for block in blocks
+            ]
+        return history
+
+    def rpc_eth_getTransactionCount(self, params):
+        address = to_checksum_address(params[0])
+        block = params[1] if len(params) > 1 else "latest"
+        with self._lock:
+            nonces = self.pending_nonces if block == "pending" else self.mined_nonces
+            return hex(nonces.get(address, 0))
+
+    def rpc_eth_sendRawTransaction(self, params):
+        raw = bytes.fromhex(params[0][2:])
+        typed = raw[0] <= 0x7f
+        fields = rlp.decode(raw[1:] if typed else raw)
+        nonce = int.from_bytes(fields[1] if typed else fields[0], "big")
+        as_int = lambda value: int.from_bytes(value, "big")
+        tx_type = raw[0] if typed else 0
+        # Taxas: gasPrice (legado e EIP-2930) ou maxPriorityFeePerGas/maxFeePerGas (EIP-1559)
+        if tx_type == 0x02:
+            fees = {"gasPrice": None, "maxPriorityFeePerGas": as_int(fields[2]), "maxFeePerGas": as_int(fields[3])}
+        else:
+            fees = {"gasPrice": as_int(fields[2] if typed else fields[1]), "maxPriorityFeePerGas": None, "maxFeePerGas": None}
+        # Posição de "to" e "data": legado, EIP-2930 (0x01) ou EIP-1559 (0x02)
+        to_index = 5 if typed and raw[0] == 0x02 else 4 if typed else 3
+        to, data = fields[to_index], fields[to_index + 2]
+        sender = Account.recover_transaction(raw)
+        tx_hash = "0x" + keccak(raw).hex()
+
+        with self._lock:
+            expected = self.pending_nonces.setdefault(sender, self.mined_nonces.get(sender, 0))
+            if nonce < expected or nonce in self.queued.get(sender, {}):
+                raise RPCError(f"nonce too low: next nonce {expected}, tx nonce {nonce}")
+            if self.max_pending_per_sender is not None:
+                pending = sum(1 for tx in self.mempool if tx["from"] == sender) + len(self.queued.get(sender, {}))
+                if pending >= self.max_pending_per_sender:
+                    raise RPCError(f"txpool is full: {pending} pending transactions for {sender}")
+            tx = {"hash": tx_hash, "from": sender, "to": to_checksum_address(to) if to else None, "nonce": nonce,
+                  "input": "0x" + data.hex(), "raw": raw, "type": tx_type, **fees}
+            self.queued.setdefault(sender, {})[nonce] = tx
+            self._promote_queued(sender)
+
+        if not self.block_time:
+            self.mine_block()
+        return tx_hash
+
+    def rpc_eth_getTransactionReceipt(self, params):
+        with self._lock:
+            return self.receipts.get(params[0])
+
+    def rpc_eth_getLogs(self, params):
+        criteria = params[0]
+        from_block = int(criteria.get("fromBlock", "0x0"), 16)
+        to_block = self.block_number if criteria.get("toBlock", "latest") == "latest" else int(criteria["toBlock"], 16)
+        addresses = criteria.get("address") or []
+        addresses = {a.lower() for a in ([addresses] if isinstance(addresses, str) else addresses)}
+        topics = (criteria.get("topics") or [None])[0]
+        topics = {topics} if isinstance(topics, str) else set(topics or [])
+
+        with self._lock:
+            receipts = sorted(self.receipts.values(), key=lambda r: (int(r["blockNumber"], 16), int(r["transactionIndex"], 16)))
+        return [
+            log for receipt in receipts if from_block <= int(receipt["blockNumber"], 16) <= to_block
+            for log in receipt["logs"]
+            if (not addresses or log["address"].lower() in addresses) and (not topics or log["topics"][0] in topics)
+        ]
+
+    def rpc_eth_estimateGas(self, params):
+        return hex(50000)
+
+    def rpc_eth_call(self, params):
+        return DEFAULT_CALL_RESULT
+
+    def _make_handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+                with standin._lock:
+                    standin.request_count += 1
+
+                # A latência é paga uma vez por requisição HTTP, como num nó remoto
+                if standin.latency:
+                    time.sleep(standin.latency)
+
+                if isinstance(payload, list) and standin.max_batch_size is not None \
+                        and len(payload) > standin.max_batch_size:
+                    response = {"jsonrpc": "2.0", "id": None,
+                                "error": {"code": -32600, "message": f"batch too large: limit is {standin.max_batch_size}"}}
+                elif isinstance(payload, list):
+                    response = [standin.handle_rpc(item) for item in payload]
+                else:
+                    response = standin.handle_rpc(payload)
+
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nó JSON-RPC local para benchmarks do AgroChain")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Endereço de escuta")
+    parser.add_argument("--port", type=int, default=8545, help="Porta de escuta")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência artificial por requisição (segundos)")
+    args = parser.parse_args()
+
+    standin = ChainStandIn(host=args.host, port=args.port, latency=args.latency)
+    print(f"Nó local escutando em {standin.url} (latência {args.latency}s)")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        standin.stop()
@@ -14,10 +14,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 # Importar as configurações
 from src.utils.config import (
-    w3, admin_address, insurance_contract, oracle_contract, 
+    w3, admin_account, insurance_contract, oracle_contract, 
     treasury_contract, governance_contract, token_contract, nft_contract
 )
 
+admin_address = admin_account.address
+
 def print_header(title):
     print("\n" + "=" * 60)
     print(f" {title}")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Teste de carga do agrupamento de consultas de clima (single-flight): N consultas
+simultâneas da mesma região, com o cache vazio, contra o servidor local da OpenWeather.
+Mostra quantas requisições chegam ao provedor com e sem o agrupamento.
+Execute com: python -m src.tools.loadtest_weather_coalescing --callers 1 10 100 500
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Garantir que o diretório do projeto esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.openweather_standin import OpenWeatherStandIn
+from src.services import openweather
+
+REGION = "Salvador,BR"
+
+
+async def burst(callers, coalesce):
+    """Dispara as consultas simultâneas e devolve o tempo total"""
+    openweather.weather_cache.clear()
+    if coalesce:
+        lookup = lambda: openweather.get_weather_snapshot(REGION)
+    else:
+        lookup = lambda: openweather.openweather_client.get_weather(REGION)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(lookup() for _ in range(callers)))
+    finally:
+        await openweather.openweather_client.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do single-flight de clima")
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 10, 50, 100, 500],
+                        help="Quantidades de consultas simultâneas")
+    parser.add_argument("--latency", type=float, default=0.2, help="Latência artificial do provedor (segundos)")
+    args = parser.parse_args()
+
+    with OpenWeatherStandIn(latency=args.latency) as standin:
+        openweather.openweather_client.base_url = standin.url
+        # O servidor local não tem cota; o agendador da cota ficaria no caminho da medição
+        openweather.weather_quota.limits = []
+        openweather.openweather_client.api_key = openweather.openweather_client.api_key or "loadtest"
+
+        print(f"{'consultas':>10} | {'sem agrupamento':>28} | {'com agrupamento':>28}")
+        for callers in args.callers:
+            row = []
+            for coalesce in (False, True):
+                before = standin.request_count
+                elapsed = asyncio.run(burst(callers, coalesce))
+                row.append(f"{standin.request_count - before:5d} chamadas em {elapsed:6.2f}s")
+            print(f"{callers:>10} | {row[0]:>28} | {row[1]:>28}")
+
+
+if __name__ == "__main__":
+    main()
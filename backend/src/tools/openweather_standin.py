@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+"""
+Servidor local que imita o endpoint /data/2.5/weather da OpenWeather para benchmarks e
+testes offline. Responde com um clima sintético e determinístico por região ou com respostas
+gravadas da API real, com latência, taxa de erros e limite de requisições (429) configuráveis.
+
+Para apontar a API para ele, inicie-a com OPENWEATHER_BASE_URL=http://127.0.0.1:8081/data/2.5/weather.
+Para gravar respostas reais: --upstream https://api.openweathermap.org/data/2.5/weather --record respostas.json
+(as regiões ainda não gravadas são buscadas na API real com a appid do cliente); depois
+sirva-as com --replay respostas.json.
+Execute com: python -m src.tools.openweather_standin --port 8081 --latency 0.08
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+WEATHER_PATH = "/data/2.5/weather"
+
+
+class OpenWeatherStandIn:
+    """Servidor HTTP/1.1 (com keep-alive) em thread própria que simula a OpenWeather.
+
+    Conta as requisições e as conexões TCP abertas, para medir o reaproveitamento de
+    conexões do cliente, o número de requisições por região e as respostas por status.
+
+    Args:
+        latency: Latência artificial por requisição (segundos)
+        jitter: Variação aleatória somada à latência, entre 0 e jitter segundos
+        error_rate: Fração das requisições respondidas com 500
+        rate_limit: Máximo de requisições aceitas por rate_window segundos; as excedentes
+            recebem 429 com Retry-After, como a API real quando a cota da chave acaba
+        replay: Arquivo JSON região -> resposta (ou lista de respostas, servidas em rodízio)
+        upstream: URL da API real consultada para as regiões que não estão no replay
+        record: Arquivo onde as respostas obtidas do upstream são gravadas
+        seed: Semente do gerador aleatório, para erros e latências reproduzíveis
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.08, update_interval=600, jitter=0.0,
+                 error_rate=0.0, rate_limit=None, rate_window=60.0, replay=None, upstream=None,
+                 record=None, seed=None):
+        self.latency = latency
+        self.update_interval = update_interval
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.upstream = upstream
+        self.record = record
+        self.request_count = 0
+        self.connection_count = 0
+        self.requests_by_region = {}
+        self.responses_by_status = {}
+        self.recordings = {}
+        if replay:
+            with open(replay) as f:
+                self.recordings = {region.lower(): responses for region, responses in json.load(f).items()}
+        self._replay_index = {}
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{WEATHER_PATH}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def weather(self, region):
+        """Clima sintético de uma região; muda a cada update_interval segundos, como a API real"""
+        dt = int(time.time()) // self.update_interval * self.update_interval
+        seed = zlib.crc32(f"{region.lower()}:{dt}".encode())
+        city = region.split(",")[0].strip()
+        return {
+            "coord": {"lon": -38.5, "lat": -12.9},
+            "weather": [{"id": 500, "main": "Rain", "description": "light rain", "icon": "10d"}],
+            "main": {
+                "temp": round(15 + seed % 2000 / 100, 2),
+                "pressure": 1000 + seed % 30,
+                "humidity": 40 + seed % 60
+            },
+            "wind": {"speed": round(seed % 1500 / 100, 2)},
+            "clouds": {"all": seed % 100},
+            "rain": {"1h": round(seed % 500 / 100, 2)},
+            "dt": dt,
+            "name": city,
+            "cod": 200
+        }
+
+    def _rate_limited(self):
+        """Janela fixa de rate_window segundos; retorna os segundos até a próxima janela ou None"""
+        if self.rate_limit is None:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.rate_window:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count >= self.rate_limit:
+                return self.rate_window - (now - self._window_start)
+            self._window_count += 1
+            return None
+
+    def _replayed(self, region):
+        """Próxima resposta gravada da região (em rodízio) ou None"""
+        responses = self.recordings.get(region.lower())
+        if responses is None:
+            return None
+        if isinstance(responses, dict):
+            return responses
+        with self._lock:
+            index = self._replay_index.get(region.lower(), 0)
+            self._replay_index[region.lower()] = index + 1
+        return responses[index % len(responses)]
+
+    def _fetch_upstream(self, query):
+        """Busca a região na API real e grava a resposta para replay"""
+        response = requests.get(self.upstream, params={k: v[0] for k, v in query.items()}, timeout=10)
+        body = response.json()
+        if response.status_code == 200 and self.record:
+            with self._lock:
+                self.recordings[query["q"][0].lower()] = body
+                with open(self.record, "w") as f:
+                    json.dump(self.recordings, f, indent=2)
+        return response.status_code, body
+
+    def handle_request(self, query):
+        """Devolve (status, corpo, cabeçalhos extras) para uma consulta"""
+        region = query.get("q", [""])[0]
+        if not query.get("appid", [""])[0]:
+            return 401, {"cod": 401, "message": "Invalid API key"}, {}
+        retry_after = self._rate_limited()
+        if retry_after is not None:
+            return 429, {
+                "cod": 429,
+                "message": "Your account is temporary blocked due to exceeding of requests limitation of your subscription type."
+            }, {"Retry-After": str(max(1, int(retry_after + 0.999)))}
+        if self.error_rate and self._random.random() < self.error_rate:
+            return 500, {"cod": "500", "message": "Internal error"}, {}
+        if not region:
+            return 400, {"cod": "400", "message": "Nothing to geocode"}, {}
+        with self._lock:
+            self.requests_by_region[region] = self.requests_by_region.get(region, 0) + 1
+
+        recorded = self._replayed(region)
+        if recorded is not None:
+            return 200, recorded, {}
+        if self.upstream:
+            status, body = self._fetch_upstream(query)
+            return status, body, {}
+        if region.lower().startswith("unknown"):
+            return 404, {"cod": "404", "message": "city not found"}, {}
+        return 200, self.weather(region), {}
+
+    def _make_handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with standin._lock:
+                    standin.connection_count += 1
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                with standin._lock:
+                    standin.request_count += 1
+
+                delay = standin.latency
+                if standin.jitter:
+                    with standin._lock:
+                        delay += standin._random.uniform(0, standin.jitter)
+                if delay:
+                    time.sleep(delay)
+
+                if parsed.path != WEATHER_PATH:
+                    status, response, headers = 404, {"cod": "404", "message": "Internal error"}, {}
+                else:
+                    status, response, headers = standin.handle_request(parse_qs(parsed.query))
+                with standin._lock:
+                    standin.responses_by_status[status] = standin.responses_by_status.get(status, 0) + 1
+
+                body = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenWeather local para benchmarks do AgroChain")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Endereço de escuta")
+    parser.add_argument("--port", type=int, default=8081, help="Porta de escuta")
+    parser.add_argument("--latency", type=float, default=0.08, help="Latência artificial por requisição (segundos)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variação aleatória da latência (segundos)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração das requisições respondidas com 500")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Requisições aceitas por janela; as demais recebem 429")
+    parser.add_argument("--rate-window", type=float, default=60.0, help="Tamanho da janela do limite (segundos)")
+    parser.add_argument("--replay", type=str, default=None, help="Arquivo JSON com respostas gravadas por região")
+    parser.add_argument("--upstream", type=str, default=None, help="URL da API real para as regiões não gravadas")
+    parser.add_argument("--record", type=str, default=None, help="Arquivo onde gravar as respostas do upstream")
+    parser.add_argument("--seed", type=int, default=None, help="Semente para erros e latências reproduzíveis")
+    args = parser.parse_args()
+
+    replay = args.replay
+    if args.record and replay is None and os.path.exists(args.record):
+        replay = args.record
+    standin = OpenWeatherStandIn(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, rate_window=args.rate_window, replay=replay, upstream=args.upstream,
+        record=args.record, seed=args.seed
+    )
+    print(f"OpenWeather local escutando em {standin.url} (latência {args.latency}s, erros {args.error_rate:.0%}, "
+          f"limite {args.rate_limit or '-'}/{args.rate_window:.0f}s, {len(standin.recordings)} regiões gravadas)")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        standin.stop()
@@ -0,0 +1,66 @@
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector
+
+class ContractCapabilities:
+    """
+    Funções e eventos de um contrato, extraídos do ABI uma única vez.
+
+    Substitui a reflexão com dir() sobre contract.functions a cada requisição: as
+    consultas de existência são buscas em dicionário e os seletores (4 bytes) e tópicos
+    de evento (topic0) já ficam calculados.
+    """
+
+    def __init__(self, abi):
+        self.abi = abi
+        # Nome -> lista de entradas do ABI (mais de uma em caso de sobrecarga)
+        self.functions = {}
+        self.events = {}
+        self.selectors = {}
+        self.topics = {}
+        self.events_by_topic = {}
+
+        for entry in abi:
+            if entry.get("type") == "function":
+                self.functions.setdefault(entry["name"], []).append(entry)
+                self.selectors.setdefault(entry["name"], function_abi_to_4byte_selector(entry))
+            elif entry.get("type") == "event":
+                topic = event_abi_to_log_topic(entry)
+                self.events[entry["name"]] = entry
+                self.topics[entry["name"]] = topic
+                self.events_by_topic[topic] = entry
+
+        self.function_names = tuple(self.functions)
+        self.event_names = tuple(self.events)
+        # Funções de leitura sem argumentos, úteis para testar a conexão com o contrato
+        self.view_functions = tuple(
+            name for name, entries in self.functions.items()
+            if any(not e.get("inputs") and e.get("stateMutability") in ("view", "pure") for e in entries)
+        )
+
+    def has_function(self, name):
+        return name in self.functions
+
+    def has_event(self, name):
+        return name in self.events
+
+    def selector(self, name):
+        """Retorna o seletor de 4 bytes da função (a primeira, em caso de sobrecarga)"""
+        return self.selectors[name]
+
+    def topic(self, name):
+        """Retorna o topic0 do evento"""
+        return self.topics[name]
+
+class ABIRegistry:
+    """Capacidades de todos os contratos da aplicação, indexadas pelo nome usado em config"""
+
+    def __init__(self, contract_abis):
+        self._contracts = {name: ContractCapabilities(abi) for name, abi in contract_abis.items()}
+
+    def __getitem__(self, name):
+        return self._contracts[name]
+
+    def __contains__(self, name):
+        return name in self._contracts
+
+    def items(self):
+        return self._contracts.items()
@@ -1,28 +1,45 @@
 #src/utils/config.py
 import os
 import json
+import logging
 from dotenv import load_dotenv
-from web3 import Web3
+from web3 import Web3, AsyncWeb3
+from .abi_registry import ABIRegistry
+from .lazy import LazyObject
+from .startup import startup_timer
 
 current_dir = os.getcwd()
 env_path = os.path.join(current_dir, '.env')
 
 load_dotenv(env_path)
 
-# Configuração de Web3
+logger = logging.getLogger(__name__)
+
+# Configuração de Web3 (os clientes não abrem conexão ao serem criados)
 WEB3_PROVIDER_URL = os.getenv("WEB3_PROVIDER_URL", "http://127.0.0.1:8545")
 w3 = Web3(Web3.HTTPProvider(WEB3_PROVIDER_URL))
 
+# Cliente assíncrono usado pelas rotas e serviços para não bloquear o event loop
+async_w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(WEB3_PROVIDER_URL))
+
 # Removido o middleware geth_poa_middleware, pois o Anvil não requer PoA
 # Se necessário para Sepolia, adicione com: w3.middleware_onion.add(construct_geth_poa_middleware())
 
-# Verifica a conexão com a blockchain
-if not w3.is_connected():
-    raise ConnectionError(f"Não foi possível conectar à blockchain em {WEB3_PROVIDER_URL}. Verifique o WEB3_PROVIDER_URL no arquivo .env")
-
-# Configura a conta de admin
+# Configura a conta de admin (derivada da chave no primeiro uso: admin_account.address / .key)
 admin_private_key = os.getenv("ADMIN_PRIVATE_KEY")
-admin_address = w3.eth.account.from_key(admin_private_key).address
+admin_account = LazyObject(lambda: w3.eth.account.from_key(admin_private_key))
+
+# Pool de chaves "quentes" (separadas por vírgula) que dividem as escritas que não dependem do
+# remetente, cada uma com seus nonces; precisam ter saldo para o gas. Sem chaves, tudo usa o admin
+SIGNER_PRIVATE_KEYS = [key.strip() for key in os.getenv("SIGNER_PRIVATE_KEYS", "").split(",") if key.strip()]
+signer_accounts = LazyObject(lambda: [(w3.eth.account.from_key(key).address, key) for key in SIGNER_PRIVATE_KEYS])
+SIGNER_POOL_STRATEGY = os.getenv("SIGNER_POOL_STRATEGY", "least-loaded")
+# Transações aguardando recibo por chave (limite de pendências por conta do txpool do nó)
+SIGNER_MAX_PENDING = int(os.getenv("SIGNER_MAX_PENDING", "16"))
+# Funções assinadas pelo pool; as demais (onlyOwner, onlyOracle, votos, cancelamentos) ficam com o admin
+SIGNER_POOL_FUNCTIONS = [
+    name.strip() for name in os.getenv("SIGNER_POOL_FUNCTIONS", "createPolicy").split(",") if name.strip()
+]
 
 # Endereços dos contratos
 INSURANCE_CONTRACT_ADDRESS = os.getenv("INSURANCE_CONTRACT_ADDRESS")
@@ -32,6 +49,65 @@ GOVERNANCE_CONTRACT_ADDRESS = os.getenv("GOVERNANCE_CONTRACT_ADDRESS")
 TOKEN_CONTRACT_ADDRESS = os.getenv("TOKEN_CONTRACT_ADDRESS")
 POLICY_NFT_ADDRESS = os.getenv("NFT_ADDRESS")  # Alinhado com o .env original
 
+# Leituras em lote: Multicall3 é opcional (ex.: 0xcA11bde05977b3631167028862bE2a173976CA11);
+# sem ele, as chamadas são agrupadas num único batch JSON-RPC
+MULTICALL3_ADDRESS = os.getenv("MULTICALL3_ADDRESS")
+BATCH_CALL_CHUNK_SIZE = int(os.getenv("BATCH_CALL_CHUNK_SIZE", "100"))
+
+# Cache de parâmetros de transação: gas price (segundos) e estimativas de gas por função
+FEE_CACHE_TTL = float(os.getenv("FEE_CACHE_TTL", "2"))
+GAS_ESTIMATE_TTL = float(os.getenv("GAS_ESTIMATE_TTL", "600"))
+GAS_ESTIMATE_MARGIN = float(os.getenv("GAS_ESTIMATE_MARGIN", "1.2"))
+DEFAULT_GAS_LIMIT = int(os.getenv("DEFAULT_GAS_LIMIT", "2000000"))
+
+# Taxas EIP-1559: blocos consultados em eth_feeHistory, gorjeta mínima (wei) e níveis de urgência
+# no formato nome=percentil:multiplicador da base fee (sinistros usam urgent, operações de admin economy)
+FEE_HISTORY_BLOCKS = int(os.getenv("FEE_HISTORY_BLOCKS", "10"))
+FEE_MIN_PRIORITY_FEE = int(os.getenv("FEE_MIN_PRIORITY_FEE", "100000000"))
+FEE_TIERS = {
+    name.strip(): (float(percentile), float(multiplier))
+    for name, _, spec in (
+        item.partition("=") for item in os.getenv("FEE_TIERS", "economy=20:1.25,standard=50:2,urgent=90:3").split(",")
+    )
+    for percentile, _, multiplier in [spec.partition(":")]
+}
+
+# Recibos de todas as transações pendentes consultados juntos a cada novo bloco
+RECEIPT_POLL_INTERVAL = float(os.getenv("RECEIPT_POLL_INTERVAL", "0.1"))
+RECEIPT_TIMEOUT = float(os.getenv("RECEIPT_TIMEOUT", "120"))
+
+# Outbox durável das escritas enviadas com o cabeçalho Idempotency-Key
+TX_OUTBOX_DB_PATH = os.getenv("TX_OUTBOX_DB_PATH", "agrochain_outbox.db")
+# Segundos sem recibo após os quais o outbox verifica se o nonce da transação já foi usado por outra
+TX_OUTBOX_CHECK_INTERVAL = float(os.getenv("TX_OUTBOX_CHECK_INTERVAL", "15"))
+
+# Indexador de eventos: acompanha a blockchain e mantém as apólices num SQLite local
+INDEXER_ENABLED = os.getenv("INDEXER_ENABLED", "false").lower() in ("1", "true", "yes")
+INDEXER_DB_PATH = os.getenv("INDEXER_DB_PATH", "agrochain_index.db")
+INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", "0"))
+INDEXER_BLOCK_CHUNK = int(os.getenv("INDEXER_BLOCK_CHUNK", "2000"))
+INDEXER_CONFIRMATIONS = int(os.getenv("INDEXER_CONFIRMATIONS", "0"))
+INDEXER_POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", "2"))
+INDEXER_MAX_LAG = int(os.getenv("INDEXER_MAX_LAG", "5"))
+# Intervalos de polling sem atualizar a cabeça da cadeia após os quais o store deixa de ser usado
+INDEXER_STALE_POLLS = float(os.getenv("INDEXER_STALE_POLLS", "5"))
+
+# Cache de leitura das apólices (LRU com invalidação por eventos e TTL de segurança)
+POLICY_CACHE_SIZE = int(os.getenv("POLICY_CACHE_SIZE", "10000"))
+POLICY_CACHE_TTL = float(os.getenv("POLICY_CACHE_TTL", "60"))
+POLICY_CACHE_POLL_INTERVAL = float(os.getenv("POLICY_CACHE_POLL_INTERVAL", "2"))
+
+# Avaliação periódica de sinistros de toda a carteira (segundos entre execuções; 0 desliga)
+CLAIM_EVALUATION_INTERVAL = float(os.getenv("CLAIM_EVALUATION_INTERVAL", "0"))
+
+# Pagamento de sinistros em lote: transações aguardando recibo ao mesmo tempo e espera máxima por recibo
+CLAIM_SUBMIT_WINDOW = int(os.getenv("CLAIM_SUBMIT_WINDOW", "50"))
+CLAIM_RECEIPT_TIMEOUT = float(os.getenv("CLAIM_RECEIPT_TIMEOUT", "120"))
+
+# Bundle com apenas os ABIs dos contratos, gerado por: python -m src.tools.build_abi_bundle
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ABI_BUNDLE_PATH = os.getenv("ABI_BUNDLE_PATH", os.path.join(BACKEND_DIR, "abi_bundle.json"))
+
 # Função para validar endereços
 def validate_ethereum_address(address, name):
     """Valida um endereço Ethereum"""
@@ -39,13 +115,6 @@ def validate_ethereum_address(address, name):
         raise ValueError(f"Endereço inválido para {name}: {address}")
     return address
 
-# Validar todos os endereços
-validate_ethereum_address(INSURANCE_CONTRACT_ADDRESS, "Insurance Contract")
-validate_ethereum_address(ORACLE_CONTRACT_ADDRESS, "Oracle Contract")
-validate_ethereum_address(TREASURY_CONTRACT_ADDRESS, "Treasury Contract")
-validate_ethereum_address(GOVERNANCE_CONTRACT_ADDRESS, "Governance Contract")
-validate_ethereum_address(TOKEN_CONTRACT_ADDRESS, "Token Contract")
-validate_ethereum_address(POLICY_NFT_ADDRESS, "PolicyNFT Contract")
 
 # Função para carregar ABIs
 def load_contract_abi(file_path):
@@ -76,36 +145,91 @@ def load_contract_abi(file_path):
     
     raise FileNotFoundError(f"Não foi possível encontrar ou carregar o ABI para {file_path}. Caminhos tentados: {possible_paths}")
 
-# Inicializa os contratos
-try:
-    insurance_contract = w3.eth.contract(
-        address=INSURANCE_CONTRACT_ADDRESS,
-        abi=load_contract_abi("AgroChainInsurance")
-    )
-    oracle_contract = w3.eth.contract(
-        address=ORACLE_CONTRACT_ADDRESS,
-        abi=load_contract_abi("AgroChainOracle")
-    )
-    treasury_contract = w3.eth.contract(
-        address=TREASURY_CONTRACT_ADDRESS,
-        abi=load_contract_abi("AgroChainTreasury")
-    )
-    governance_contract = w3.eth.contract(
-        address=GOVERNANCE_CONTRACT_ADDRESS,
-        abi=load_contract_abi("ConcreteAgroChainGovernance")
-    )
-    token_contract = w3.eth.contract(
-        address=TOKEN_CONTRACT_ADDRESS,
-        abi=load_contract_abi("AgroChainToken")
-    )
-    nft_contract = w3.eth.contract(
-        address=POLICY_NFT_ADDRESS,
-        abi=load_contract_abi("PolicyNFT")
-    )
-    
-    print(f"Conectado à blockchain em {WEB3_PROVIDER_URL}")
-    print(f"Conta de admin: {admin_address}")
-    print("Contratos inicializados com sucesso!")
-except Exception as e:
-    print(f"Erro ao inicializar contratos: {e}")
-    raise
\ No newline at end of file
+# Nomes dos artefatos de compilação de cada contrato
+CONTRACT_ARTIFACTS = {
+    "insurance": "AgroChainInsurance",
+    "oracle": "AgroChainOracle",
+    "treasury": "AgroChainTreasury",
+    "governance": "ConcreteAgroChainGovernance",
+    "token": "AgroChainToken",
+    "nft": "PolicyNFT"
+}
+
+def load_contract_abis():
+    """
+    Carrega os ABIs de todos os contratos.
+
+    Usa o bundle de ABI_BUNDLE_PATH (uma única leitura) quando ele existe e cobre todos os
+    contratos; caso contrário, lê os artefatos completos da compilação.
+    """
+    with startup_timer.stage("abi_load"):
+        try:
+            with open(ABI_BUNDLE_PATH) as f:
+                bundle = json.load(f)
+            missing = [name for name in CONTRACT_ARTIFACTS if name not in bundle]
+            if not missing:
+                return {name: bundle[name] for name in CONTRACT_ARTIFACTS}
+            logger.warning(f"ABI bundle {ABI_BUNDLE_PATH} is missing {', '.join(missing)}; loading the build artifacts")
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError as e:
+            logger.warning(f"Invalid ABI bundle {ABI_BUNDLE_PATH} ({e}); loading the build artifacts")
+        return {name: load_contract_abi(artifact) for name, artifact in CONTRACT_ARTIFACTS.items()}
+
+async def check_connection():
+    """Verifica a conexão com a blockchain; chamada na inicialização da aplicação, não na importação"""
+    with startup_timer.stage("web3_connect"):
+        connected = await async_w3.is_connected()
+    if not connected:
+        raise ConnectionError(f"Não foi possível conectar à blockchain em {WEB3_PROVIDER_URL}. Verifique o WEB3_PROVIDER_URL no arquivo .env")
+    logger.info(f"Connected to the blockchain at {WEB3_PROVIDER_URL} (admin account {admin_account.address})")
+
+# Nome de cada contrato nas mensagens de validação de endereço
+CONTRACT_LABELS = {
+    "insurance": "Insurance Contract",
+    "oracle": "Oracle Contract",
+    "treasury": "Treasury Contract",
+    "governance": "Governance Contract",
+    "token": "Token Contract",
+    "nft": "PolicyNFT Contract"
+}
+
+def _lazy_contract(client, address, name):
+    # O endereço é validado ao criar o contrato (initialize_contracts na inicialização), não na importação
+    return LazyObject(lambda: client.eth.contract(
+        address=validate_ethereum_address(address, CONTRACT_LABELS[name]), abi=contract_abis[name]
+    ))
+
+# Os ABIs e os contratos são criados no primeiro acesso: importar este módulo não lê
+# arquivos nem depende do nó. Cada ABI é carregado uma única vez e compartilhado entre
+# os clientes síncrono e assíncrono.
+contract_abis = LazyObject(load_contract_abis)
+# Funções, eventos, seletores e tópicos de cada contrato, consultados pelas rotas
+abi_registry = LazyObject(lambda: ABIRegistry(contract_abis))
+
+insurance_contract = _lazy_contract(w3, INSURANCE_CONTRACT_ADDRESS, "insurance")
+oracle_contract = _lazy_contract(w3, ORACLE_CONTRACT_ADDRESS, "oracle")
+treasury_contract = _lazy_contract(w3, TREASURY_CONTRACT_ADDRESS, "treasury")
+governance_contract = _lazy_contract(w3, GOVERNANCE_CONTRACT_ADDRESS, "governance")
+token_contract = _lazy_contract(w3, TOKEN_CONTRACT_ADDRESS, "token")
+nft_contract = _lazy_contract(w3, POLICY_NFT_ADDRESS, "nft")
+
+# Contratos assíncronos (AsyncWeb3) usados pela API
+async_insurance_contract = _lazy_contract(async_w3, INSURANCE_CONTRACT_ADDRESS, "insurance")
+async_oracle_contract = _lazy_contract(async_w3, ORACLE_CONTRACT_ADDRESS, "oracle")
+async_treasury_contract = _lazy_contract(async_w3, TREASURY_CONTRACT_ADDRESS, "treasury")
+async_governance_contract = _lazy_contract(async_w3, GOVERNANCE_CONTRACT_ADDRESS, "governance")
+async_token_contract = _lazy_contract(async_w3, TOKEN_CONTRACT_ADDRESS, "token")
+async_nft_contract = _lazy_contract(async_w3, POLICY_NFT_ADDRESS, "nft")
+
+def initialize_contracts():
+    """Cria de imediato os ABIs e todos os contratos (usado na inicialização da aplicação)"""
+    with startup_timer.stage("contracts_init"):
+        for lazy in (
+            admin_account, signer_accounts, contract_abis, abi_registry,
+            insurance_contract, oracle_contract, treasury_contract, governance_contract, token_contract, nft_contract,
+            async_insurance_contract, async_oracle_contract, async_treasury_contract,
+            async_governance_contract, async_token_contract, async_nft_contract
+        ):
+            lazy._resolve()
+    logger.info("Contracts initialized")
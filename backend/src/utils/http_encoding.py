@@ -0,0 +1,130 @@
+import gzip
+import json
+import os
+from collections import OrderedDict
+from fastapi.responses import Response
+
+# Brotli é opcional: sem o pacote, as respostas são comprimidas apenas com gzip
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Corpos menores que isto não compensam a compressão
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+
+def choose_encoding(accept_encoding):
+    """
+    Escolhe a compressão a partir do cabeçalho Accept-Encoding.
+
+    Args:
+        accept_encoding: Valor do cabeçalho (pode ser None)
+
+    Returns:
+        "br", "gzip" ou None (sem compressão)
+    """
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+def etag_matches(if_none_match, etag):
+    """Comparação fraca (RFC 9110) entre If-None-Match e o ETag atual"""
+    if not if_none_match or etag is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+class EncodedResponseCache:
+    """
+    Guarda o corpo já serializado (e comprimido) de cada versão de uma resposta.
+
+    A chave é o ETag mais a compressão escolhida; enquanto o ETag não muda, as consultas
+    repetidas reaproveitam os bytes em vez de serializar e comprimir o payload de novo.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, min_size=RESPONSE_COMPRESSION_MIN_SIZE):
+        self.max_entries = max_entries
+        self.min_size = min_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    def _encode(self, payload, encoding):
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        if encoding is None or len(body) < self.min_size:
+            return body, None
+        compressed = brotli.compress(body) if encoding == "br" else gzip.compress(body, compresslevel=6)
+        self.bytes_saved += len(body) - len(compressed)
+        return compressed, encoding
+
+    def respond(self, request, etag, build_payload):
+        """
+        Monta a resposta JSON de uma versão identificada por etag.
+
+        Args:
+            request: Requisição (cabeçalhos If-None-Match e Accept-Encoding)
+            etag: ETag da versão atual, ou None quando não há como identificá-la
+            build_payload: Função que monta o payload; só é chamada quando o corpo não está em cache
+
+        Returns:
+            304 sem corpo se o cliente já tem esta versão; senão o JSON, comprimido se compensar
+        """
+        headers = {"Vary": "Accept-Encoding"}
+        if etag is not None:
+            headers["ETag"] = etag
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                self.not_modified += 1
+                return Response(status_code=304, headers=headers)
+
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+        key = (etag, encoding)
+        cached = self._entries.get(key) if etag is not None else None
+        if cached is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            cached = self._encode(build_payload(), encoding)
+            if etag is not None:
+                self._entries[key] = cached
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        body, content_encoding = cached
+        if content_encoding is not None:
+            headers["Content-Encoding"] = content_encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self):
+        requests = self.hits + self.misses + self.not_modified
+        return {
+            "size": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "notModified": self.not_modified,
+            "bytesSaved": self.bytes_saved,
+            "brotli": brotli is not None,
+            "hitRate": round((self.hits + self.not_modified) / requests, 4) if requests else 0.0
+        }
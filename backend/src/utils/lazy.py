@@ -0,0 +1,62 @@
+import threading
+
+_EMPTY = object()
+
+class LazyObject:
+    """
+    Proxy que só cria o objeto real no primeiro acesso.
+
+    Permite que os módulos continuem importando os contratos e o registro de ABIs
+    diretamente de config, sem que a importação leia arquivos ou dependa do nó.
+    """
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_wrapped", _EMPTY)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _resolve(self):
+        wrapped = object.__getattribute__(self, "_wrapped")
+        if wrapped is _EMPTY:
+            with object.__getattribute__(self, "_lock"):
+                wrapped = object.__getattribute__(self, "_wrapped")
+                if wrapped is _EMPTY:
+                    wrapped = object.__getattribute__(self, "_factory")()
+                    object.__setattr__(self, "_wrapped", wrapped)
+        return wrapped
+
+    @property
+    def is_initialized(self):
+        return object.__getattribute__(self, "_wrapped") is not _EMPTY
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
+
+    def __getitem__(self, key):
+        return self._resolve()[key]
+
+    def __contains__(self, key):
+        return key in self._resolve()
+
+    def __iter__(self):
+        return iter(self._resolve())
+
+    def __len__(self):
+        return len(self._resolve())
+
+    def __bool__(self):
+        return bool(self._resolve())
+
+    def __eq__(self, other):
+        return self._resolve() == other
+
+    def __hash__(self):
+        return hash(self._resolve())
+
+    def __repr__(self):
+        if not self.is_initialized:
+            return "<LazyObject (not initialized)>"
+        return repr(self._resolve())
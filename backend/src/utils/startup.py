@@ -0,0 +1,44 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class StartupTimer:
+    """
+    Registra a duração de cada etapa da inicialização de um worker (ou de qualquer
+    execução dividida em etapas, como a avaliação de sinistros).
+
+    O relógio começa na primeira importação deste módulo; etapas preguiçosas (carga dos
+    ABIs, verificação da conexão) são registradas quando de fato acontecem.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = time.perf_counter() - start
+
+    def mark(self, name):
+        """Registra o tempo decorrido desde o início do processo até agora"""
+        self.stages[name] = time.perf_counter() - self.started_at
+
+    def summary(self):
+        return {
+            "pid": os.getpid(),
+            "stagesMs": {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()}
+        }
+
+    def log_summary(self):
+        stages = ", ".join(f"{name}={ms}ms" for name, ms in self.summary()["stagesMs"].items())
+        logger.info(f"Worker {os.getpid()} startup: {stages}")
+
+# Instância do processo
+startup_timer = StartupTimer()
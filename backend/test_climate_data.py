@@ -1,6 +1,9 @@
 #!/usr/bin/env python
 """
 Script de teste para o endpoint de dados climáticos da API AgroChain.
+Para rodar sem a OpenWeather real (e sem gastar cota), inicie o servidor local com
+python -m src.tools.openweather_standin --port 8081 e a API com
+OPENWEATHER_BASE_URL=http://127.0.0.1:8081/data/2.5/weather.
 Execute com: python test_climate_data.py
 """
 